@@ -1,20 +1,108 @@
+import asyncio
+import json
 import os
+import re
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from langchain.agents import initialize_agent, AgentType
+from langchain.callbacks.base import AsyncCallbackHandler
 from langchain.chat_models import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
 from dotenv import load_dotenv
-from .tools import get_tools
+from .memory_store import SessionMemoryStore, make_llm_summarizer
+from .tools import get_tools, tool_turn
 
 load_dotenv()
 
-class BenefitStationAgent:
+# 에이전트 응답에 붙일 최대 상품 수 (카탈로그 응답과 같음)
+MAX_RESPONSE_PRODUCTS = 5
+
+def _unique_products(products: List[Dict]) -> List[Dict]:
+    """도구가 찾은 상품을 찾은 순서대로 중복 없이 최대 MAX_RESPONSE_PRODUCTS개"""
+    unique = {}
+    for product in products:
+        unique.setdefault(product.get("id"), product)
+    return list(unique.values())[:MAX_RESPONSE_PRODUCTS]
+
+class _FinalAnswerFilter:
+    """
+    ReAct 에이전트의 JSON 출력 토큰 중 최종 답변(action_input) 문자열만 골라냄
+    도구 호출 단계의 생각/행동 JSON은 사용자에게 흘려보내지 않음
+    """
+    MARKER = re.compile(r'"action"\s*:\s*"Final Answer"\s*,\s*"action_input"\s*:\s*"')
+    ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
     def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.buffer = ""
+        self.streaming = False
+        self.escape = False
+        self.done = False
+
+    def feed(self, token: str) -> str:
+        if self.done:
+            return ""
+        if not self.streaming:
+            self.buffer += token
+            match = self.MARKER.search(self.buffer)
+            if not match:
+                return ""
+            self.streaming = True
+            token = self.buffer[match.end():]
+
+        text = []
+        for ch in token:
+            if self.escape:
+                text.append(self.ESCAPES.get(ch, ch))
+                self.escape = False
+            elif ch == "\\":
+                self.escape = True
+            elif ch == '"':
+                self.done = True
+                break
+            else:
+                text.append(ch)
+        return "".join(text)
+
+class _StreamingCallbackHandler(AsyncCallbackHandler):
+    """LLM 토큰과 도구 실행 진행 상황을 큐에 이벤트로 넣음"""
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+        self.answer_filter = _FinalAnswerFilter()
+
+    async def on_llm_start(self, serialized, prompts, **kwargs):
+        self.answer_filter.reset()
+
+    async def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.answer_filter.reset()
+
+    async def on_llm_new_token(self, token: str, **kwargs):
+        text = self.answer_filter.feed(token)
+        if text:
+            await self.queue.put({"event": "token", "data": {"token": text}})
+
+    async def on_tool_start(self, serialized, input_str: str, **kwargs):
+        await self.queue.put({"event": "tool_start", "data": {"tool": (serialized or {}).get("name"), "input": input_str}})
+
+    async def on_tool_end(self, output, **kwargs):
+        await self.queue.put({"event": "tool_end", "data": {"output": str(output)}})
+
+class BenefitStationAgent:
+    def __init__(self, llm=None):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.llm = None
+        # llm을 넘기면 API 키 대신 그 모델 사용 (로컬 가짜 LLM 테스트용)
+        self.llm = llm
         self.agent = None
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
+        # 사용자별 대화 기록 (토큰 예산 안의 최근 대화만 프롬프트에 포함)
+        self.memory = SessionMemoryStore(
+            token_budget=int(os.getenv("AGENT_MEMORY_TOKEN_BUDGET", "2000")),
+            max_sessions=int(os.getenv("AGENT_MEMORY_MAX_SESSIONS", "1000")),
+            idle_ttl=float(os.getenv("AGENT_MEMORY_IDLE_TTL", "3600")),
+            max_total_tokens=int(os.getenv("AGENT_MEMORY_MAX_TOKENS", "2000000")),
+            persist_dir=os.getenv("AGENT_MEMORY_DIR", "sessions") or None
         )
         self._initialize_agent()
     
@@ -24,7 +112,15 @@ class BenefitStationAgent:
             # Gemini API 키 확인
             gemini_key = os.getenv("GEMINI_API_KEY")
             
-            if gemini_key:
+            fake_responses = os.getenv("AGENT_FAKE_LLM_RESPONSES")
+            
+            if self.llm is not None:
+                print("✅ 주입된 LLM 사용")
+            elif fake_responses:
+                print("✅ 가짜 LLM 사용 (AGENT_FAKE_LLM_RESPONSES)")
+                from langchain.chat_models.fake import FakeListChatModel
+                self.llm = FakeListChatModel(responses=json.loads(fake_responses))
+            elif gemini_key:
                 print("✅ Gemini API 키 발견, Gemini 모델 사용")
                 # Gemini 모델 사용 (향후 구현)
                 from langchain_google_genai import ChatGoogleGenerativeAI
@@ -39,21 +135,25 @@ class BenefitStationAgent:
                 self.llm = ChatOpenAI(
                     model_name="gpt-4o",
                     temperature=0.7,
-                    openai_api_key=self.openai_api_key
+                    openai_api_key=self.openai_api_key,
+                    streaming=True
                 )
             else:
                 print("❌ AI API 키가 설정되지 않았습니다 (OpenAI 또는 Gemini 필요)")
                 return
             
+            # 창에서 밀려난 대화를 LLM으로 요약 (선택사항)
+            if os.getenv("AGENT_MEMORY_SUMMARIZE", "false").lower() == "true":
+                self.memory.summarizer = make_llm_summarizer(self.llm)
+            
             # 도구 가져오기
             tools = get_tools()
             
-            # 에이전트 초기화
+            # 에이전트 초기화 (대화 기록은 호출할 때 사용자별로 전달)
             self.agent = initialize_agent(
                 tools=tools,
                 llm=self.llm,
                 agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-                memory=self.memory,
                 verbose=True,
                 max_iterations=3,
                 early_stopping_method="generate"
@@ -66,12 +166,70 @@ class BenefitStationAgent:
     
     async def chat(self, message: str, user_id: str = "demo-user") -> str:
         """사용자 메시지에 대한 AI 응답 생성"""
+        response, _ = await self.chat_with_products(message, user_id)
+        return response
+    
+    async def chat_with_products(self, message: str, user_id: str = "demo-user") -> Tuple[str, List[Dict]]:
+        """AI 응답과 이번 턴에 도구가 찾은 상품 목록(중복 제거, 최대 5개)을 함께 반환"""
         try:
             if not self.agent:
-                return "죄송합니다. AI 에이전트가 초기화되지 않았습니다. OpenAI API 키를 확인해주세요."
+                return "죄송합니다. AI 에이전트가 초기화되지 않았습니다. OpenAI API 키를 확인해주세요.", []
             
-            # 시스템 프롬프트 포함한 메시지 구성
-            full_message = f"""
+            # 비동기 실행으로 이벤트 루프를 막지 않고, 이번 턴의 도구 결과는 메모하여 재사용
+            with tool_turn() as found_products:
+                response = await self.agent.arun(
+                    input=self._build_prompt(message, user_id),
+                    chat_history=await self._chat_history(user_id)
+                )
+            
+            await self.memory.append_turn(user_id, message, response)
+            return response, _unique_products(found_products)
+            
+        except Exception as e:
+            return f"죄송합니다. 처리 중 오류가 발생했습니다: {str(e)}", []
+    
+    async def stream_chat(self, message: str, user_id: str = "demo-user") -> AsyncIterator[Dict]:
+        """
+        응답을 이벤트로 흘려보냄
+        token(최종 답변 조각), tool_start/tool_end(도구 진행 상황), done(전체 응답) 또는 error 순서로 생성하고,
+        소비하는 쪽이 중간에 닫으면(클라이언트 연결 끊김) 실행 중인 에이전트 작업을 취소
+        """
+        if not self.agent:
+            yield {"event": "error", "data": {"message": "AI 에이전트가 초기화되지 않았습니다"}}
+            return
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        handler = _StreamingCallbackHandler(queue)
+        
+        async def run():
+            try:
+                with tool_turn() as found_products:
+                    response = await self.agent.arun(
+                        input=self._build_prompt(message, user_id),
+                        chat_history=await self._chat_history(user_id),
+                        callbacks=[handler]
+                    )
+                await self.memory.append_turn(user_id, message, response)
+                await queue.put({"event": "done", "data": {"response": response, "products": _unique_products(found_products)}})
+            except Exception as e:
+                await queue.put({"event": "error", "data": {"message": str(e)}})
+            finally:
+                queue.put_nowait(None)
+        
+        task = asyncio.get_running_loop().create_task(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    def _build_prompt(self, message: str, user_id: str) -> str:
+        """시스템 프롬프트 포함한 메시지 구성"""
+        return f"""
 사용자 ID: {user_id}
 사용자 메시지: {message}
 
@@ -88,23 +246,32 @@ class BenefitStationAgent:
 사용자의 요청을 분석하여 적절한 도구를 사용해 상품을 찾아 추천해주세요.
 응답은 친근하고 도움이 되는 톤으로 작성해주세요.
             """
-            
-            response = self.agent.run(full_message)
-            return response
-            
-        except Exception as e:
-            return f"죄송합니다. 처리 중 오류가 발생했습니다: {str(e)}"
     
-    def reset_memory(self):
-        """대화 기록 초기화"""
-        self.memory.clear()
+    async def _chat_history(self, user_id: str) -> list:
+        """사용자의 대화 요약과 최근 대화를 LangChain 메시지 목록으로 변환"""
+        summary, messages = await self.memory.get(user_id)
+        history = [SystemMessage(content=f"이전 대화 요약: {summary}")] if summary else []
+        for role, content in messages:
+            history.append(HumanMessage(content=content) if role == "human" else AIMessage(content=content))
+        return history
+    
+    def reset_memory(self, user_id: str = None):
+        """대화 기록 초기화 (user_id가 없으면 전체)"""
+        self.memory.clear(user_id)
+    
+    async def close(self):
+        """대화 기록을 디스크에 저장 (종료 시 호출)"""
+        await self.memory.save_all()
 
-# 전역 에이전트 인스턴스
+# 전역 에이전트 인스턴스 (백그라운드 준비 스레드와 요청이 동시에 만들지 않도록 잠금)
 agent_instance = None
+_agent_lock = threading.Lock()
 
 def get_agent():
     """에이전트 인스턴스 반환"""
     global agent_instance
     if agent_instance is None:
-        agent_instance = BenefitStationAgent()
+        with _agent_lock:
+            if agent_instance is None:
+                agent_instance = BenefitStationAgent()
     return agent_instance 
\ No newline at end of file
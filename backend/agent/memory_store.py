@@ -0,0 +1,269 @@
+"""
+사용자별 대화 기록 저장소
+사용자마다 토큰 예산 안의 최근 대화만 유지하고(넘치는 오래된 대화는 선택적으로 요약),
+오래 쉬었거나 전체 용량을 넘으면 가장 오래 사용하지 않은 세션부터 디스크로 내보냄
+디스크 읽기/쓰기는 이벤트 루프를 막지 않도록 스레드에서 실행
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# (역할, 내용) - 역할은 "human" 또는 "ai"
+Message = Tuple[str, str]
+
+# (기존 요약, 창에서 밀려난 메시지들) -> 새 요약
+Summarizer = Callable[[str, List[Message]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한글은 1~2글자당 1토큰 정도이므로 2글자당 1토큰으로 계산)"""
+    return max(1, (len(text) + 1) // 2)
+
+
+@dataclass
+class Session:
+    user_id: str
+    messages: List[Message] = field(default_factory=list)
+    summary: str = ""
+    tokens: int = 0
+    last_active: float = 0.0
+
+
+class SessionMemoryStore:
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        max_sessions: int = 1000,
+        idle_ttl: float = 3600.0,
+        max_total_tokens: int = 2_000_000,
+        summarizer: Optional[Summarizer] = None,
+        persist_dir: Optional[str] = None,
+        token_counter: Callable[[str], int] = estimate_tokens,
+        clock: Callable[[], float] = time.time
+    ):
+        self.token_budget = token_budget
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_total_tokens = max_total_tokens
+        self.summarizer = summarizer
+        self.persist_dir = persist_dir
+        self._count_tokens = token_counter
+        self._clock = clock
+        # 최근 사용 순서 (맨 뒤가 가장 최근)
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        # 내보내서 디스크에 쓰는 중인 세션 (쓰기가 끝나기 전에 다시 사용하면 디스크 대신 이 세션을 씀)
+        self._saving: Dict[str, Session] = {}
+        # 같은 세션 파일을 두 스레드가 동시에 쓰지 않도록 저장을 한 번에 하나씩 실행
+        self._save_lock = threading.Lock()
+        self._total_tokens = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.summaries = 0
+
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    def _path(self, user_id: str) -> str:
+        name = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.persist_dir, f"{name}.json")
+
+    def _load(self, user_id: str) -> Optional[Session]:
+        if not self.persist_dir or not os.path.exists(self._path(user_id)):
+            return None
+        try:
+            with open(self._path(user_id), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"대화 기록 로드 오류 ({user_id}): {e}")
+            return None
+        messages = [tuple(m) for m in data.get("messages", [])]
+        summary = data.get("summary", "")
+        return Session(
+            user_id=user_id,
+            messages=messages,
+            summary=summary,
+            tokens=(self._count_tokens(summary) if summary else 0) + sum(self._count_tokens(c) for _, c in messages),
+            last_active=data.get("last_active", self._clock())
+        )
+
+    def _save(self, session: Session):
+        """세션을 디스크에 기록 (임시 파일에 쓴 뒤 교체)"""
+        if not self.persist_dir:
+            return
+        path = self._path(session.user_id)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "user_id": session.user_id,
+                "messages": session.messages,
+                "summary": session.summary,
+                "last_active": session.last_active
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def _save_sessions(self, sessions: List[Session]):
+        with self._save_lock:
+            for session in sessions:
+                try:
+                    self._save(session)
+                except OSError as e:
+                    print(f"대화 기록 저장 오류 ({session.user_id}): {e}")
+                finally:
+                    with self._lock:
+                        if self._saving.get(session.user_id) is session:
+                            del self._saving[session.user_id]
+
+    def _insert(self, session: Session):
+        self._sessions[session.user_id] = session
+        self._total_tokens += session.tokens
+
+    async def _ensure_loaded(self, user_id: str):
+        """메모리에 없는 세션을 다시 올림 (디스크에 쓰는 중인 세션이면 그대로, 아니면 스레드에서 디스크로부터 읽음)"""
+        with self._lock:
+            if user_id in self._sessions:
+                return
+            saving = self._saving.get(user_id)
+            if saving is not None:
+                self._insert(saving)
+                return
+        if not self.persist_dir:
+            return
+        session = await asyncio.to_thread(self._load, user_id)
+        if session is None:
+            return
+        with self._lock:
+            if user_id not in self._sessions:
+                self._insert(session)
+
+    def _session(self, user_id: str) -> Session:
+        """메모리에 있는 세션을 최근 사용으로 옮겨 반환 (없으면 새로 만듦, 디스크 세션은 _ensure_loaded로 먼저 올림)"""
+        session = self._sessions.get(user_id)
+        if session is None:
+            session = Session(user_id=user_id, last_active=self._clock())
+            self._insert(session)
+        self._sessions.move_to_end(user_id)
+        return session
+
+    async def get(self, user_id: str) -> Tuple[str, List[Message]]:
+        """(요약, 창 안의 메시지 목록) 반환"""
+        await self._ensure_loaded(user_id)
+        with self._lock:
+            session = self._session(user_id)
+            return session.summary, list(session.messages)
+
+    async def append_turn(self, user_id: str, user_message: str, ai_message: str):
+        """대화 한 턴을 추가하고 토큰 예산을 넘는 오래된 메시지를 창에서 밀어냄"""
+        await self._ensure_loaded(user_id)
+        with self._lock:
+            session = self._session(user_id)
+            for role, content in (("human", user_message), ("ai", ai_message)):
+                session.messages.append((role, content))
+                tokens = self._count_tokens(content)
+                session.tokens += tokens
+                self._total_tokens += tokens
+            session.last_active = self._clock()
+
+            # 최근 한 턴(사용자 + AI)은 예산을 넘더라도 남김
+            evicted: List[Message] = []
+            while session.tokens > self.token_budget and len(session.messages) > 2:
+                role, content = session.messages.pop(0)
+                tokens = self._count_tokens(content)
+                session.tokens -= tokens
+                self._total_tokens -= tokens
+                evicted.append((role, content))
+            previous_summary = session.summary
+
+        if evicted and self.summarizer:
+            try:
+                summary = await self.summarizer(previous_summary, evicted)
+            except Exception as e:
+                print(f"대화 요약 오류 ({user_id}): {e}")
+            else:
+                with self._lock:
+                    delta = self._count_tokens(summary) - (self._count_tokens(previous_summary) if previous_summary else 0)
+                    session.summary = summary
+                    session.tokens += delta
+                    # 요약하는 동안 내보내진 세션이면 전체 토큰 수에는 반영하지 않음
+                    if self._sessions.get(user_id) is session:
+                        self._total_tokens += delta
+                    self.summaries += 1
+
+        await self._enforce_limits()
+
+    async def _enforce_limits(self):
+        """오래 쉰 세션과 용량을 넘는 세션을 가장 오래 사용하지 않은 순서로 내보냄 (스레드에서 디스크에 저장)"""
+        with self._lock:
+            now = self._clock()
+            to_save = []
+            while self._sessions:
+                user_id, oldest = next(iter(self._sessions.items()))
+                over_capacity = len(self._sessions) > self.max_sessions or self._total_tokens > self.max_total_tokens
+                if not over_capacity and now - oldest.last_active <= self.idle_ttl:
+                    break
+                del self._sessions[user_id]
+                self._total_tokens -= oldest.tokens
+                self.evictions += 1
+                if self.persist_dir:
+                    self._saving[user_id] = oldest
+                    to_save.append(oldest)
+
+        if to_save:
+            await asyncio.to_thread(self._save_sessions, to_save)
+
+    def clear(self, user_id: Optional[str] = None):
+        """사용자 한 명(또는 전체)의 대화 기록 삭제 (디스크 포함)"""
+        with self._lock:
+            if user_id is None:
+                self._sessions.clear()
+                self._saving.clear()
+                self._total_tokens = 0
+                if self.persist_dir:
+                    for name in os.listdir(self.persist_dir):
+                        if name.endswith(".json"):
+                            os.remove(os.path.join(self.persist_dir, name))
+                return
+
+            self._saving.pop(user_id, None)
+            session = self._sessions.pop(user_id, None)
+            if session:
+                self._total_tokens -= session.tokens
+            if self.persist_dir and os.path.exists(self._path(user_id)):
+                os.remove(self._path(user_id))
+
+    async def save_all(self):
+        """메모리에 있는 모든 세션을 스레드에서 디스크에 저장 (종료 시 호출)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        await asyncio.to_thread(self._save_sessions, sessions)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "total_tokens": self._total_tokens,
+                "max_total_tokens": self.max_total_tokens,
+                "token_budget": self.token_budget,
+                "evictions": self.evictions,
+                "summaries": self.summaries
+            }
+
+
+def make_llm_summarizer(llm) -> Summarizer:
+    """LLM으로 밀려난 대화를 기존 요약에 합쳐 짧게 요약하는 함수 생성"""
+    async def summarize(summary: str, messages: List[Message]) -> str:
+        conversation = "\n".join(f"{'사용자' if role == 'human' else 'AI'}: {content}" for role, content in messages)
+        prompt = (
+            "다음은 지금까지의 대화 요약과 이어지는 대화입니다. "
+            "사용자의 관심 카테고리, 예산, 이미 추천받은 상품 위주로 3문장 이내로 다시 요약해주세요.\n\n"
+            f"요약: {summary or '(없음)'}\n\n대화:\n{conversation}"
+        )
+        return (await llm.apredict(prompt)).strip()
+    return summarize
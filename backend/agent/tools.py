@@ -1,12 +1,16 @@
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Type, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Type
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
 import sys
 import os
 
 # 백엔드 모듈 경로 추가
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from db import get_products, search_products, get_user_preferences
+from repository import get_repository
+from recommendation import get_recommendation_engine
 
 # 도구 입력 스키마 정의
 class SearchProductsInput(BaseModel):
@@ -20,6 +24,72 @@ class GetRecommendationsInput(BaseModel):
     user_id: str = Field(description="사용자 ID")
     limit: int = Field(default=5, description="추천할 상품 개수")
 
+# 에이전트 한 턴 동안의 도구 결과 메모 ((도구 이름, 인자) -> 결과 문자열)
+# ReAct 단계마다 같은 도구를 같은 인자로 다시 부르면 저장소를 다시 조회하지 않음
+_turn_memo: ContextVar[Optional[Dict[tuple, str]]] = ContextVar("agent_tool_memo", default=None)
+# 에이전트 한 턴 동안 도구가 찾은 상품 (응답의 products 목록으로 사용)
+_turn_products: ContextVar[Optional[List[Dict]]] = ContextVar("agent_tool_products", default=None)
+# 도구의 비동기 구현을 실행할 서버 이벤트 루프 (공유 httpx 클라이언트와 캐시 조회 작업이 이 루프에 묶여 있음)
+_server_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def bind_event_loop(loop: Optional[asyncio.AbstractEventLoop] = None):
+    """동기 도구 호출을 넘길 서버 이벤트 루프 등록 (없으면 현재 실행 중인 루프)"""
+    global _server_loop
+    _server_loop = loop or asyncio.get_running_loop()
+
+@contextmanager
+def tool_turn():
+    """에이전트 한 턴의 도구 결과 메모 범위 (턴이 끝나면 버림), 도구가 찾은 상품 목록을 반환"""
+    products: List[Dict] = []
+    # 에이전트 턴은 서버 이벤트 루프에서 시작하므로 그 루프를 동기 도구 호출 대상으로 등록
+    try:
+        bind_event_loop()
+    except RuntimeError:
+        pass
+    memo_token = _turn_memo.set({})
+    products_token = _turn_products.set(products)
+    try:
+        yield products
+    finally:
+        _turn_products.reset(products_token)
+        _turn_memo.reset(memo_token)
+
+def _collect(products: List[Dict]):
+    """도구가 찾은 상품을 현재 턴의 상품 목록에 추가"""
+    found = _turn_products.get()
+    if found is not None:
+        found.extend(products)
+
+async def _memoized(key: tuple, compute: Callable[[], Awaitable[str]]) -> str:
+    """현재 턴에서 같은 호출 결과가 있으면 재사용"""
+    memo = _turn_memo.get()
+    if memo is None:
+        return await compute()
+    if key not in memo:
+        memo[key] = await compute()
+    return memo[key]
+
+def _run_sync(coroutine) -> str:
+    """
+    동기 실행 경로 (LangChain이 작업 스레드에서 도구를 동기로 부를 때)
+    새 루프에서 실행하면 서버 루프에 묶인 공유 클라이언트/캐시를 쓸 수 없으므로 서버 루프에 넘겨 결과를 기다림.
+    서버 루프가 없으면(스크립트 실행 등) 새 루프에서 실행
+    """
+    loop = _server_loop
+    if loop is None or not loop.is_running():
+        return asyncio.run(coroutine)
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coroutine.close()
+        raise RuntimeError("서버 이벤트 루프에서는 도구를 동기로 호출할 수 없습니다 (_arun 사용)")
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+def _format_product(product: Dict[str, Any]) -> str:
+    return f"{product['name']} ({product['price']}원, 평점: {product.get('rating', 0)}, 카테고리: {product['category']})"
+
 # LangChain 도구 구현
 class SearchProductsTool(BaseTool):
     name = "search_products"
@@ -27,22 +97,22 @@ class SearchProductsTool(BaseTool):
     args_schema: Type[BaseModel] = SearchProductsInput
 
     async def _arun(self, query: str) -> str:
-        """비동기 실행"""
-        return await self._run(query)
+        """키워드로 상품 검색 (카탈로그 색인 조회)"""
+        return await _memoized((self.name, query), lambda: self._search(query))
     
     def _run(self, query: str) -> str:
-        """키워드로 상품 검색"""
+        return _run_sync(self._arun(query))
+
+    async def _search(self, query: str) -> str:
         try:
-            # 실제 구현에서는 비동기 함수를 동기적으로 호출
-            # 임시로 샘플 데이터 반환
-            sample_results = [
-                {"name": "스타벅스 아메리카노", "price": 4500, "rating": 4.8, "category": "food"},
-                {"name": "배달의민족 2만원권", "price": 20000, "rating": 4.6, "category": "food"}
-            ]
+            products = await get_repository().search_products(query, limit=5)
+            if not products:
+                return f"'{query}' 검색 결과가 없습니다."
+            _collect(products)
             
             result = f"'{query}' 검색 결과:\n"
-            for product in sample_results:
-                result += f"- {product['name']} ({product['price']}원, 평점: {product['rating']}, 카테고리: {product['category']})\n"
+            for product in products:
+                result += f"- {_format_product(product)}\n"
                 
             return result
         except Exception as e:
@@ -54,46 +124,29 @@ class FilterByCategoryTool(BaseTool):
     args_schema: Type[BaseModel] = FilterByCategoryInput
 
     async def _arun(self, category: str, max_price: int = None) -> str:
-        """비동기 실행"""
-        return await self._run(category, max_price)
+        """카테고리별 상품 필터링 (평점 높은 순 상위 5개)"""
+        return await _memoized((self.name, category, max_price), lambda: self._filter(category, max_price))
     
     def _run(self, category: str, max_price: int = None) -> str:
-        """카테고리별 상품 필터링"""
+        return _run_sync(self._arun(category, max_price))
+
+    async def _filter(self, category: str, max_price: int = None) -> str:
         try:
-            # 임시 샘플 데이터
-            category_products = {
-                "food": [
-                    {"name": "스타벅스 아메리카노", "price": 4500, "rating": 4.8},
-                    {"name": "배달의민족 2만원권", "price": 20000, "rating": 4.6},
-                    {"name": "점심식사 지원권", "price": 10000, "rating": 4.5}
-                ],
-                "health": [
-                    {"name": "헬스장 1개월 이용권", "price": 50000, "rating": 4.5},
-                    {"name": "홈트레이닝 세트", "price": 35000, "rating": 4.2},
-                    {"name": "건강검진 패키지", "price": 120000, "rating": 4.7}
-                ],
-                "life": [
-                    {"name": "넷플릭스 1개월 구독권", "price": 17000, "rating": 4.7},
-                    {"name": "생활용품 할인권", "price": 15000, "rating": 4.1}
-                ]
-            }
-            
-            products = category_products.get(category, [])
-            
-            # 가격 필터링
-            if max_price:
-                products = [p for p in products if p["price"] <= max_price]
+            products = await get_repository().get_products(category=category, max_price=max_price)
             
             if not products:
                 return f"'{category}' 카테고리에서 조건에 맞는 상품을 찾을 수 없습니다."
             
+            products = sorted(products, key=lambda p: -(p.get('rating') or 0))[:5]
+            _collect(products)
+            
             result = f"{category} 카테고리 상품"
             if max_price:
                 result += f" ({max_price}원 이하)"
             result += ":\n"
             
             for product in products:
-                result += f"- {product['name']} ({product['price']}원, 평점: {product['rating']})\n"
+                result += f"- {product['name']} ({product['price']}원, 평점: {product.get('rating', 0)})\n"
                 
             return result
         except Exception as e:
@@ -105,27 +158,22 @@ class GetRecommendationsTool(BaseTool):
     args_schema: Type[BaseModel] = GetRecommendationsInput
 
     async def _arun(self, user_id: str, limit: int = 5) -> str:
-        """비동기 실행"""
-        return await self._run(user_id, limit)
+        """사용자 기반 개인 맞춤 추천 (RecommendationEngine 직접 호출)"""
+        return await _memoized((self.name, user_id, limit), lambda: self._recommend(user_id, limit))
     
     def _run(self, user_id: str, limit: int = 5) -> str:
-        """사용자 기반 개인 맞춤 추천"""
+        return _run_sync(self._arun(user_id, limit))
+
+    async def _recommend(self, user_id: str, limit: int = 5) -> str:
         try:
-            # 임시 추천 로직 - 실제로는 사용자 선호도와 상품 데이터를 기반으로 추천
-            recommended_products = [
-                {"name": "스타벅스 아메리카노", "price": 4500, "rating": 4.8, "reason": "식음료 선호도 기반"},
-                {"name": "넷플릭스 1개월 구독권", "price": 17000, "rating": 4.7, "reason": "생활 편의 선호도 기반"},
-                {"name": "온라인 강의 수강권", "price": 25000, "rating": 4.3, "reason": "자기계발 관심 기반"},
-                {"name": "헬스장 1개월 이용권", "price": 50000, "rating": 4.5, "reason": "건강 관심 기반"},
-                {"name": "점심식사 지원권", "price": 10000, "rating": 4.5, "reason": "실용성 기반"}
-            ]
-            
-            # 제한된 개수만큼 반환
-            limited_products = recommended_products[:limit]
+            products = await get_recommendation_engine().get_personalized_recommendations(user_id, limit=limit)
+            if not products:
+                return f"{user_id}님을 위한 추천 상품을 찾을 수 없습니다."
+            _collect(products)
             
             result = f"{user_id}님을 위한 개인 맞춤 추천:\n"
-            for i, product in enumerate(limited_products, 1):
-                result += f"{i}. {product['name']} ({product['price']}원, 평점: {product['rating']}) - {product['reason']}\n"
+            for i, product in enumerate(products, 1):
+                result += f"{i}. {_format_product(product)} - 추천 점수 {product.get('recommendation_score')}\n"
                 
             return result
         except Exception as e:
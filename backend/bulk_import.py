@@ -0,0 +1,216 @@
+"""
+상품 대량 등록
+스트리밍으로 받은 NDJSON/CSV를 행 단위로 검증하고 배치 단위로 저장소(repository.Repository)에 반영
+"""
+
+import csv
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# products 테이블 스키마 (database_setup.sql 기준)
+REQUIRED_FIELDS = ("id", "name", "category", "price")
+OPTIONAL_FIELDS = ("rating", "description", "image_url", "is_active")
+
+# 응답에 포함할 최대 오류 개수
+MAX_REPORTED_ERRORS = 1000
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "y"):
+        return True
+    if text in ("false", "0", "no", "n"):
+        return False
+    raise ValueError(f"is_active 값이 올바르지 않습니다: {value}")
+
+
+def validate_product(row: Dict) -> Dict:
+    """products 스키마에 맞게 행을 검증하고 정규화된 상품 반환 (실패 시 ValueError)"""
+    if not isinstance(row, dict):
+        raise ValueError("행은 JSON 객체여야 합니다")
+
+    unknown = set(row) - set(REQUIRED_FIELDS) - set(OPTIONAL_FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+
+    for field in REQUIRED_FIELDS:
+        if row.get(field) in (None, ""):
+            raise ValueError(f"필수 필드 누락: {field}")
+
+    product = {
+        "id": str(row["id"]).strip(),
+        "name": str(row["name"]).strip(),
+        "category": str(row["category"]).strip(),
+    }
+
+    price = row["price"]
+    if isinstance(price, bool):
+        raise ValueError(f"price 값이 올바르지 않습니다: {price}")
+    try:
+        product["price"] = int(str(price).strip())
+    except ValueError:
+        raise ValueError(f"price는 정수여야 합니다: {price}")
+    if product["price"] < 0:
+        raise ValueError(f"price는 0 이상이어야 합니다: {price}")
+
+    rating = row.get("rating")
+    if rating in (None, ""):
+        product["rating"] = 0.0
+    else:
+        try:
+            product["rating"] = float(rating)
+        except (TypeError, ValueError):
+            raise ValueError(f"rating은 숫자여야 합니다: {rating}")
+        if not 0 <= product["rating"] <= 5:
+            raise ValueError(f"rating은 0~5 범위여야 합니다: {rating}")
+
+    for field in ("description", "image_url"):
+        if row.get(field) not in (None, ""):
+            product[field] = str(row[field])
+
+    if row.get("is_active") not in (None, ""):
+        product["is_active"] = _parse_bool(row["is_active"])
+
+    return product
+
+
+def _decode_line(line: bytes, first: bool) -> Tuple[str, Optional[str]]:
+    """
+    한 줄을 UTF-8로 디코딩하여 (문자열, 디코딩 오류) 반환
+    잘못된 바이트가 있으면 대체 문자로 바꾼 문자열과 오류 메시지를 함께 반환
+    """
+    encoding = "utf-8-sig" if first else "utf-8"
+    try:
+        return line.decode(encoding).rstrip("\r"), None
+    except UnicodeDecodeError as e:
+        return line.decode(encoding, errors="replace").rstrip("\r"), f"UTF-8 디코딩 오류: {e.start}번째 바이트"
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, Optional[str]]]:
+    """바이트 스트림을 줄 단위 (문자열, 디코딩 오류)로 변환"""
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode_line(line, first)
+            first = False
+
+    if buffer:
+        yield _decode_line(buffer, first)
+
+
+async def iter_ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """NDJSON 스트림을 (행 번호, 행, 파싱 오류) 튜플로 반환"""
+    row_num = 0
+    async for line, decode_error in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_num += 1
+        if decode_error:
+            yield row_num, None, decode_error
+            continue
+        try:
+            yield row_num, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield row_num, None, f"JSON 파싱 오류: {e.msg}"
+
+
+async def iter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    CSV 스트림(첫 줄은 헤더)을 (행 번호, 행, 파싱 오류) 튜플로 반환
+    줄 단위로 스트리밍하므로 따옴표 안의 줄바꿈은 지원하지 않음
+    헤더의 잘못된 바이트는 대체 문자로 바뀌어 해당 열이 알 수 없는 필드 오류로 보고됨
+    """
+    header: Optional[List[str]] = None
+    row_num = 0
+    async for line, decode_error in iter_lines(chunks):
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+
+        row_num += 1
+        if decode_error:
+            yield row_num, None, decode_error
+            continue
+        if len(values) != len(header):
+            yield row_num, None, f"열 개수가 헤더와 다릅니다 ({len(values)} != {len(header)})"
+            continue
+        yield row_num, {k: v for k, v in zip(header, values) if v != ""}, None
+
+
+async def import_products(rows: AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]], repository, batch_size: int = 1000) -> Dict:
+    """
+    행 스트림을 검증하여 batch_size 단위로 repository.add_products에 반영
+    이미 저장소에 있는 ID는 배치마다 한 번에 조회하여 걸러냄
+    행별 오류와 처리량 통계를 반환
+    """
+    start_time = time.perf_counter()
+    stats = {
+        "received": 0,
+        "imported": 0,
+        "failed": 0,
+        "batches": 0,
+        "errors": [],
+    }
+    batch: List[Tuple[int, Dict]] = []
+    batch_ids = set()
+
+    def record_error(row_num: int, error: str, product_id=None):
+        stats["failed"] += 1
+        if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+            stats["errors"].append({"row": row_num, "id": product_id, "error": error})
+
+    async def flush():
+        existing = await repository.get_products_by_ids(list(batch_ids))
+        products = []
+        for row_num, product in batch:
+            if product["id"] in existing:
+                record_error(row_num, f"이미 존재하는 상품 ID입니다: {product['id']}", product["id"])
+            else:
+                products.append(product)
+        if products:
+            await repository.add_products(products)
+            stats["imported"] += len(products)
+            stats["batches"] += 1
+        batch.clear()
+        batch_ids.clear()
+
+    async for row_num, row, parse_error in rows:
+        stats["received"] += 1
+        if parse_error:
+            record_error(row_num, parse_error)
+            continue
+
+        try:
+            product = validate_product(row)
+        except ValueError as e:
+            record_error(row_num, str(e), row.get("id") if isinstance(row, dict) else None)
+            continue
+
+        if product["id"] in batch_ids:
+            record_error(row_num, f"이미 존재하는 상품 ID입니다: {product['id']}", product["id"])
+            continue
+
+        batch.append((row_num, product))
+        batch_ids.add(product["id"])
+        if len(batch) >= batch_size:
+            await flush()
+
+    if batch:
+        await flush()
+
+    elapsed = time.perf_counter() - start_time
+    stats["elapsed_seconds"] = round(elapsed, 4)
+    stats["rows_per_second"] = round(stats["received"] / elapsed, 1) if elapsed > 0 else None
+    # 중복 ID 오류는 배치를 반영할 때 기록되므로 행 번호순으로 정렬
+    stats["errors"].sort(key=lambda error: error["row"])
+    stats["errors_truncated"] = stats["failed"] > len(stats["errors"])
+    return stats
@@ -0,0 +1,109 @@
+"""
+채팅 요청 라우터
+의도 매칭 결과로 확신도를 매겨, 단순한 카테고리/가격 질문은 카탈로그 색인에서 바로 답하고
+애매한 요청만 LLM 에이전트(ReAct)로 넘김
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from intent_matcher import Intent, IntentMatcher
+
+CATALOG = "catalog"
+AGENT = "agent"
+
+
+@dataclass
+class RouteDecision:
+    path: str
+    confidence: float
+    intent: Intent
+    reasons: List[str] = field(default_factory=list)
+
+
+class ChatRouter:
+    """
+    확신도 = 카테고리 일치 + 가격 조건 + 짧은 메시지 - 에이전트가 필요한 표현
+    threshold 이상이면 카탈로그, 미만이면 에이전트
+    """
+
+    def __init__(
+        self,
+        matcher: IntentMatcher,
+        threshold: float = 0.6,
+        category_weight: float = 0.5,
+        price_weight: float = 0.3,
+        short_message_weight: float = 0.2,
+        escalation_penalty: float = 0.5,
+        max_short_length: int = 40
+    ):
+        self.matcher = matcher
+        self.threshold = threshold
+        self.category_weight = category_weight
+        self.price_weight = price_weight
+        self.short_message_weight = short_message_weight
+        self.escalation_penalty = escalation_penalty
+        self.max_short_length = max_short_length
+        self._lock = threading.Lock()
+        # 경로별 요청 수와 누적 처리 시간
+        self._counts: Dict[str, int] = {CATALOG: 0, AGENT: 0}
+        self._latency: Dict[str, float] = {CATALOG: 0.0, AGENT: 0.0}
+        # 에이전트로 보내려 했지만 카탈로그로 답한 횟수 / 카탈로그에서 찾지 못해 에이전트로 넘긴 횟수
+        self.agent_unavailable = 0
+        self.catalog_misses = 0
+
+    def route(self, message: str) -> RouteDecision:
+        """메시지의 확신도를 계산하여 처리 경로 결정"""
+        intent = self.matcher.match(message)
+        confidence = 0.0
+        reasons = []
+
+        if intent.categories:
+            confidence += self.category_weight
+            reasons.append("category")
+        if intent.min_price is not None or intent.max_price is not None:
+            confidence += self.price_weight
+            reasons.append("price")
+        if len(message) <= self.max_short_length:
+            confidence += self.short_message_weight
+            reasons.append("short")
+        if intent.escalation_keywords:
+            confidence -= self.escalation_penalty
+            reasons.append("escalation:" + ",".join(intent.escalation_keywords))
+
+        confidence = round(min(1.0, max(0.0, confidence)), 4)
+        path = CATALOG if confidence >= self.threshold else AGENT
+        return RouteDecision(path=path, confidence=confidence, intent=intent, reasons=reasons)
+
+    def record(self, path: str, elapsed: float):
+        """실제로 응답한 경로와 처리 시간 기록"""
+        with self._lock:
+            self._counts[path] += 1
+            self._latency[path] += elapsed
+
+    def record_agent_unavailable(self):
+        with self._lock:
+            self.agent_unavailable += 1
+
+    def record_catalog_miss(self):
+        with self._lock:
+            self.catalog_misses += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                "threshold": self.threshold,
+                "requests": total,
+                "paths": {
+                    path: {
+                        "count": count,
+                        "share": round(count / total, 4) if total else 0.0,
+                        "avg_latency_ms": round(self._latency[path] / count * 1000, 3) if count else None
+                    }
+                    for path, count in self._counts.items()
+                },
+                "agent_unavailable": self.agent_unavailable,
+                "catalog_misses": self.catalog_misses
+            }
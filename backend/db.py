@@ -1,64 +1,323 @@
+import asyncio
 import os
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Dict, List, Optional
+
 from dotenv import load_dotenv
 
+from read_cache import ReadThroughCache
+from search_index import SearchIndex, word_terms
+
+# httpx는 첫 요청 시점에 불러옴 (서버 시작 시간 단축)
+if TYPE_CHECKING:
+    import httpx
+
 load_dotenv()
 
 # Supabase 설정
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-# Supabase 클라이언트 초기화
-def get_supabase_client() -> Client:
-    """Supabase 클라이언트 인스턴스 반환"""
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError("SUPABASE_URL과 SUPABASE_KEY 환경변수가 필요합니다")
-    
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+# 연결 풀 / 타임아웃 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+# 검색 후보로 가져올 최대 상품 수와 후보 조건에 쓰는 필드
+SEARCH_CANDIDATE_LIMIT = int(os.getenv("SEARCH_CANDIDATE_LIMIT", "1000"))
+SEARCH_FIELDS = ("name", "category", "description")
+
+# 읽기 캐시 설정 (상품 목록은 (카테고리, 최대 가격)별, 선호도는 사용자별)
+products_cache = ReadThroughCache(
+    maxsize=int(os.getenv("PRODUCTS_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("PRODUCTS_CACHE_TTL", "30"))
+)
+users_cache = ReadThroughCache(
+    maxsize=int(os.getenv("USERS_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USERS_CACHE_TTL", "60"))
+)
+
+
+class SupabaseREST:
+    """
+    Supabase(PostgREST) 비동기 HTTP 클라이언트
+    연결 풀을 공유하여 여러 조회를 동시에 보낼 수 있고, 첫 요청 시점에 연결을 만듦
+    transport를 넘기면 로컬 대역 서버나 httpx.MockTransport로 테스트 가능
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        pool_size: int = DB_POOL_SIZE,
+        timeout: float = DB_TIMEOUT,
+        connect_timeout: float = DB_CONNECT_TIMEOUT,
+        transport: Optional["httpx.AsyncBaseTransport"] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=f"{self.base_url}/rest/v1",
+                headers={"apikey": self.api_key, "Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                transport=self.transport
+            )
+        return self._client
+
+    async def select(self, table: str, params: Dict[str, str]) -> List[Dict]:
+        response = await self.client.get(f"/{table}", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def insert(
+        self,
+        table: str,
+        rows: List[Dict],
+        upsert: bool = False,
+        ignore_duplicates: bool = False,
+        returning: bool = False
+    ) -> Optional[List[Dict]]:
+        """
+        upsert=True면 같은 키의 행을 갱신, ignore_duplicates=True면 같은 키의 행은 건너뜀
+        returning=True면 실제로 저장된 행을 돌려줌
+        """
+        prefer = ["return=representation" if returning else "return=minimal"]
+        if upsert:
+            prefer.append("resolution=merge-duplicates")
+        elif ignore_duplicates:
+            prefer.append("resolution=ignore-duplicates")
+        response = await self.client.post(f"/{table}", json=rows, headers={"Prefer": ",".join(prefer)})
+        response.raise_for_status()
+        return response.json() if returning else None
+
+    async def update(
+        self,
+        table: str,
+        params: Dict[str, str],
+        values: Dict,
+        returning: bool = False
+    ) -> Optional[List[Dict]]:
+        """returning=True면 갱신된 행을 돌려줌 (조건에 맞는 행이 없으면 빈 목록)"""
+        prefer = "return=representation" if returning else "return=minimal"
+        response = await self.client.patch(f"/{table}", params=params, json=values, headers={"Prefer": prefer})
+        response.raise_for_status()
+        return response.json() if returning else None
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# 전역 클라이언트 인스턴스 (첫 조회 시 생성)
+_rest_client: Optional[SupabaseREST] = None
+
+
+def get_rest_client() -> SupabaseREST:
+    """Supabase REST 클라이언트 인스턴스 반환"""
+    global _rest_client
+    if _rest_client is None:
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            raise ValueError("SUPABASE_URL과 SUPABASE_KEY 환경변수가 필요합니다")
+        _rest_client = SupabaseREST(SUPABASE_URL, SUPABASE_KEY)
+    return _rest_client
+
+
+def configure(base_url: str, api_key: str = "", **options) -> SupabaseREST:
+    """전역 클라이언트를 다른 서버나 transport로 교체 (로컬 대역 서버, 테스트용)"""
+    global _rest_client
+    _rest_client = SupabaseREST(base_url, api_key, **options)
+    return _rest_client
+
+
+def warm_up():
+    """클라이언트를 미리 만들어 둠 (httpx import 포함, 백그라운드 준비 단계에서 스레드로 호출)"""
+    get_rest_client().client
+
+
+async def close():
+    """연결 풀 정리 (앱 종료 시 호출)"""
+    if _rest_client is not None:
+        await _rest_client.aclose()
+
+
+def invalidate_products():
+    """상품이 추가/변경되면 호출 (캐시된 상품 목록 전체 무효화)"""
+    products_cache.clear()
+
+
+def invalidate_user_preferences(user_id: str):
+    """사용자 선호도가 바뀌면 호출"""
+    users_cache.invalidate(user_id)
 
-# 전역 클라이언트 인스턴스
-supabase_client = None
 
-try:
-    supabase_client = get_supabase_client()
-    print("✅ Supabase 연결 성공")
-except Exception as e:
-    print(f"❌ Supabase 연결 실패: {e}")
+def cache_stats() -> Dict:
+    return {"products": products_cache.stats(), "users": users_cache.stats()}
+
+
+def _in_filter(values: List[str]) -> str:
+    """PostgREST in.(...) 필터 (값에 쉼표가 있어도 안전하도록 큰따옴표로 감쌈)"""
+    quoted = ('"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"' for v in values)
+    return f"in.({','.join(quoted)})"
+
 
 # 데이터베이스 유틸리티 함수들
 async def get_products(category: str = None, max_price: int = None):
     """상품 목록 조회"""
     try:
-        query = supabase_client.table("products").select("*")
-        
+        params = {"select": "*"}
+
         if category:
-            query = query.eq("category", category)
+            params["category"] = f"eq.{category}"
         if max_price:
-            query = query.lte("price", max_price)
-            
-        response = query.execute()
-        return response.data
+            params["price"] = f"lte.{max_price}"
+
+        # 캐시된 목록을 호출한 쪽에서 수정해도 다른 요청에 영향이 없도록 복사본 반환
+        rows = await products_cache.get(
+            (category, max_price),
+            lambda: get_rest_client().select("products", params)
+        )
+        return list(rows)
     except Exception as e:
         print(f"상품 조회 오류: {e}")
         return []
 
+async def get_product(product_id: str):
+    """ID로 상품 조회"""
+    try:
+        rows = await get_rest_client().select("products", {"select": "*", "id": f"eq.{product_id}", "limit": "1"})
+        return rows[0] if rows else None
+    except Exception as e:
+        print(f"상품 조회 오류: {e}")
+        return None
+
+async def get_products_by_ids(product_ids: List[str], chunk_size: int = 500) -> Dict[str, Dict]:
+    """여러 상품을 id IN (...) 조회로 한꺼번에 가져옴 (chunk_size개 단위로 나누어 동시에 조회)"""
+    products = {}
+    try:
+        client = get_rest_client()
+        chunks = await asyncio.gather(*(
+            client.select("products", {"select": "*", "id": _in_filter(product_ids[start:start + chunk_size])})
+            for start in range(0, len(product_ids), chunk_size)
+        ))
+        for rows in chunks:
+            for product in rows:
+                products[product["id"]] = product
+    except Exception as e:
+        print(f"상품 일괄 조회 오류: {e}")
+    return products
+
 async def get_user_preferences(user_id: str):
     """사용자 선호도 조회"""
     try:
-        response = supabase_client.table("users").select("*").eq("id", user_id).execute()
-        if response.data:
-            return response.data[0]
+        rows = await users_cache.get(
+            user_id,
+            lambda: get_rest_client().select("users", {"select": "*", "id": f"eq.{user_id}", "limit": "1"})
+        )
+        if rows:
+            return rows[0]
         return None
     except Exception as e:
         print(f"사용자 선호도 조회 오류: {e}")
         return None
 
-async def search_products(query: str):
-    """키워드로 상품 검색"""
+async def get_users_preferences(user_ids: List[str], chunk_size: int = 500) -> Dict[str, Dict]:
+    """
+    여러 사용자의 선호도를 id IN (...) 조회로 한꺼번에 가져옴
+    URL 길이 제한 때문에 chunk_size명 단위로 나누어 동시에 조회
+    """
+    users = {}
     try:
-        # 상품명에서 키워드 검색
-        response = supabase_client.table("products").select("*").ilike("name", f"%{query}%").execute()
-        return response.data
+        client = get_rest_client()
+        chunks = await asyncio.gather(*(
+            client.select("users", {"select": "*", "id": _in_filter(user_ids[start:start + chunk_size])})
+            for start in range(0, len(user_ids), chunk_size)
+        ))
+        for rows in chunks:
+            for user in rows:
+                users[user["id"]] = user
+    except Exception as e:
+        print(f"사용자 선호도 일괄 조회 오류: {e}")
+    return users
+
+async def get_interactions(since: Optional[str] = None) -> List[Dict]:
+    """상호작용 이벤트 조회 (since 이후, ISO 8601 시각)"""
+    try:
+        params = {"select": "user_id,product_id,interaction_type,created_at"}
+        if since:
+            params["created_at"] = f"gte.{since}"
+        return await get_rest_client().select("user_interactions", params)
+    except Exception as e:
+        print(f"상호작용 조회 오류: {e}")
+        return []
+
+async def insert_interactions(rows: List[Dict]):
+    """
+    상호작용 이벤트 일괄 저장 (insert 한 번으로 전송)
+    이벤트 파이프라인이 실패 건수를 집계할 수 있도록 오류는 그대로 전달
+    """
+    if not rows:
+        return
+    await get_rest_client().insert("user_interactions", rows)
+
+async def upsert_products(products: List[Dict]):
+    """상품 일괄 저장 (같은 ID가 있으면 갱신), 오류는 그대로 전달"""
+    if not products:
+        return
+    await get_rest_client().insert("products", products, upsert=True)
+    invalidate_products()
+
+async def update_user_preferences(user_id: str, preferences: Dict):
+    """
+    사용자 선호도 저장 (없는 사용자면 ID를 이름으로 새로 만듦), 오류는 그대로 전달
+    이미 있는 사용자의 이름을 덮어쓰지 않도록 갱신을 먼저 시도하고, 갱신된 행이 없을 때만 삽입
+    """
+    client = get_rest_client()
+    params = {"id": f"eq.{user_id}"}
+    values = {"preferences": preferences}
+    try:
+        if await client.update("users", params, values, returning=True):
+            return
+        inserted = await client.insert(
+            "users", [{"id": user_id, "name": user_id, **values}], ignore_duplicates=True, returning=True
+        )
+        if not inserted:
+            # 그 사이 다른 요청이 같은 사용자를 만들었으면 다시 갱신
+            await client.update("users", params, values)
+    finally:
+        invalidate_user_preferences(user_id)
+
+async def search_products(query: str, limit: Optional[int] = None):
+    """
+    키워드로 상품 검색 (SimpleDB/SQLite와 같은 토큰화와 단어 매칭 규칙)
+    질의 토큰이 하나라도 들어간 상품을 후보로 가져온 뒤 SearchIndex로 단어별 일치 여부와 순위를 계산
+    """
+    terms = list(dict.fromkeys(term for word in query.split() for term in word_terms(word)))
+    if not terms:
+        return []
+    try:
+        # 토큰은 한글/영문/숫자로만 이루어져 PostgREST 필터 문법과 겹치지 않음
+        conditions = ",".join(f"{field}.ilike.*{term}*" for term in terms for field in SEARCH_FIELDS)
+        rows = await get_rest_client().select("products", {
+            "select": "*",
+            "or": f"({conditions})",
+            "limit": str(SEARCH_CANDIDATE_LIMIT)
+        })
     except Exception as e:
         print(f"상품 검색 오류: {e}")
-        return [] 
\ No newline at end of file
+        return []
+
+    index = SearchIndex()
+    for doc_id, product in enumerate(rows):
+        index.add(doc_id, product)
+    return index.search(query, mode="or", limit=limit)
@@ -0,0 +1,344 @@
+"""
+상호작용 이벤트 수집 파이프라인
+조회/좋아요/구매 이벤트를 제한된 크기의 큐에 넣고, 크기 또는 시간 기준으로 묶어 저장소(sink)에 일괄 기록
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from logger_config import log_error
+
+# user_interactions.interaction_type 허용값
+EVENT_TYPES = ("view", "like", "purchase")
+
+# 기록 작업에 종료를 알리는 큐 항목
+_STOP = object()
+
+
+class EventQueueFull(Exception):
+    """큐가 가득 차 이벤트를 더 받을 수 없음 (accepted: 그 전까지 받은 개수)"""
+
+    def __init__(self, accepted: int = 0):
+        super().__init__("이벤트 큐가 가득 찼습니다")
+        self.accepted = accepted
+
+
+def validate_event(raw: Dict) -> Dict:
+    """이벤트를 user_interactions 행 형태로 검증/정규화 (실패 시 ValueError)"""
+    if not isinstance(raw, dict):
+        raise ValueError("이벤트는 JSON 객체여야 합니다")
+
+    for field in ("user_id", "product_id", "interaction_type"):
+        if not raw.get(field):
+            raise ValueError(f"필수 필드 누락: {field}")
+
+    if raw["interaction_type"] not in EVENT_TYPES:
+        raise ValueError(f"interaction_type은 {', '.join(EVENT_TYPES)} 중 하나여야 합니다")
+
+    created_at = raw.get("created_at")
+    if created_at:
+        try:
+            created_at = datetime.fromisoformat(str(created_at)).isoformat()
+        except ValueError:
+            raise ValueError(f"created_at 형식이 올바르지 않습니다: {created_at}")
+    else:
+        created_at = datetime.now(timezone.utc).isoformat()
+
+    return {
+        "user_id": str(raw["user_id"]),
+        "product_id": str(raw["product_id"]),
+        "interaction_type": raw["interaction_type"],
+        "created_at": created_at,
+    }
+
+
+def event_timestamp(created_at: Optional[str]) -> Optional[float]:
+    """created_at(ISO 8601)을 유닉스 시각으로 변환 (없으면 None)"""
+    return datetime.fromisoformat(created_at).timestamp() if created_at else None
+
+
+def _since_filter(events: Iterable[Dict], since: Optional[str]) -> List[Dict]:
+    """since(ISO 8601) 이후 이벤트만 (시간대 표기가 달라도 시각으로 비교)"""
+    if not since:
+        return list(events)
+    start = event_timestamp(since)
+    return [e for e in events if (event_timestamp(e.get("created_at")) or 0) >= start]
+
+
+class JsonlEventSink:
+    """JSON-lines 파일 저장소 (로컬 개발용)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def _append(self, events: List[Dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events))
+
+    async def write(self, events: List[Dict]):
+        await asyncio.to_thread(self._append, events)
+
+    def _read(self, since: Optional[str]) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            # 기록 도중 중단되어 잘린 줄은 건너뜀
+            events = []
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return _since_filter(events, since)
+
+    async def read(self, since: Optional[str] = None) -> List[Dict]:
+        """기록된 이벤트 조회 (since 이후, ISO 8601 시각)"""
+        return await asyncio.to_thread(self._read, since)
+
+
+class SqliteEventSink:
+    """database_setup.sql의 user_interactions 테이블을 흉내 낸 SQLite 저장소"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_interactions (
+                  id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  user_id TEXT,
+                  product_id TEXT,
+                  interaction_type TEXT NOT NULL,
+                  created_at TEXT
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_user_interactions_user_id ON user_interactions(user_id)"
+            )
+
+    def _insert(self, events: List[Dict]):
+        with sqlite3.connect(self.path) as conn:
+            conn.executemany(
+                "INSERT INTO user_interactions (user_id, product_id, interaction_type, created_at) "
+                "VALUES (:user_id, :product_id, :interaction_type, :created_at)",
+                events
+            )
+
+    async def write(self, events: List[Dict]):
+        await asyncio.to_thread(self._insert, events)
+
+    def _select(self, since: Optional[str]) -> List[Dict]:
+        with sqlite3.connect(self.path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT user_id, product_id, interaction_type, created_at FROM user_interactions"
+            ).fetchall()
+        return _since_filter((dict(row) for row in rows), since)
+
+    async def read(self, since: Optional[str] = None) -> List[Dict]:
+        """기록된 이벤트 조회 (since 이후, ISO 8601 시각)"""
+        return await asyncio.to_thread(self._select, since)
+
+
+class SupabaseEventSink:
+    """Supabase user_interactions 테이블 저장소 (db.py)"""
+
+    async def write(self, events: List[Dict]):
+        from db import insert_interactions
+        await insert_interactions(events)
+
+    async def read(self, since: Optional[str] = None) -> List[Dict]:
+        from db import get_interactions
+        return await get_interactions(since)
+
+
+def create_event_sink(kind: Optional[str] = None):
+    """EVENT_SINK(jsonl/sqlite/supabase) 설정에 맞는 저장소 생성"""
+    kind = kind or os.getenv("EVENT_SINK", "jsonl")
+    if kind == "jsonl":
+        return JsonlEventSink(os.getenv("EVENT_SINK_PATH", os.path.join("events", "user_interactions.jsonl")))
+    if kind == "sqlite":
+        return SqliteEventSink(os.getenv("EVENT_SINK_PATH", os.path.join("events", "user_interactions.db")))
+    if kind == "supabase":
+        return SupabaseEventSink()
+    raise ValueError(f"지원하지 않는 이벤트 저장소입니다: {kind}")
+
+
+class EventPipeline:
+    """
+    제한된 크기의 큐 + 배치 기록기
+    batch_size개가 모이거나 flush_interval초가 지나면 한 번에 기록하고,
+    큐가 가득 차면 enqueue_timeout초까지 기다린 뒤 EventQueueFull로 거부 (backpressure).
+    기록에 실패하면 retry_backoff초부터 두 배씩(최대 max_backoff초) 늘려 max_retries번까지 다시 시도
+    """
+
+    def __init__(
+        self,
+        sink,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 0.0,
+        on_flush: Optional[Callable[[List[Dict]], None]] = None,
+        max_retries: int = 3,
+        retry_backoff: float = 0.1,
+        max_backoff: float = 2.0
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.on_flush = on_flush
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._flush_latencies: deque = deque(maxlen=1000)
+        self.published = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed = 0
+        self.retries = 0
+
+    async def publish(self, events: List[Dict]) -> int:
+        """이벤트를 큐에 넣고 받은 개수 반환 (큐가 가득 차면 EventQueueFull)"""
+        free = self._queue.maxsize - self._queue.qsize()
+        if free >= len(events):
+            for event in events:
+                self._queue.put_nowait(event)
+            self.published += len(events)
+            return len(events)
+
+        if self.enqueue_timeout <= 0:
+            self.rejected += len(events)
+            raise EventQueueFull(accepted=0)
+
+        deadline = time.monotonic() + self.enqueue_timeout
+        for accepted, event in enumerate(events):
+            try:
+                await asyncio.wait_for(self._queue.put(event), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self.published += accepted
+                self.rejected += len(events) - accepted
+                raise EventQueueFull(accepted=accepted)
+        self.published += len(events)
+        return len(events)
+
+    async def _next_batch(self) -> Tuple[List[Dict], bool]:
+        """
+        첫 이벤트를 기다린 뒤 batch_size개 또는 flush_interval초까지 모음
+        종료 신호를 받으면 그때까지 모은 이벤트와 함께 (batch, True) 반환
+        """
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    async def _write(self, batch: List[Dict]):
+        """실패하면 지수 백오프로 max_retries번까지 다시 기록 (마지막 오류는 그대로 전달)"""
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.sink.write(batch)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                log_error("EVENT_FLUSH_RETRY", str(e), {"events": len(batch), "attempt": attempt + 1})
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+    async def _flush(self, batch: List[Dict]):
+        start_time = time.perf_counter()
+        try:
+            await self._write(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            log_error("EVENT_FLUSH_ERROR", str(e), {"events": len(batch)})
+            return
+        finally:
+            self._flush_latencies.append(time.perf_counter() - start_time)
+
+        self.flushed += len(batch)
+        self.batches += 1
+        if self.on_flush:
+            try:
+                self.on_flush(batch)
+            except Exception as e:
+                log_error("EVENT_ON_FLUSH_ERROR", str(e), {"events": len(batch)})
+
+    async def _run(self):
+        while True:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+            if stopping:
+                return
+
+    def start(self):
+        """백그라운드 기록 작업 시작 (이벤트 루프 안에서 호출)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        기록 작업에 종료 신호를 보내고, 모으던 배치와 진행 중인 기록이 끝날 때까지 기다린 뒤
+        큐에 남은 이벤트를 모두 기록
+        """
+        if self._task:
+            if not self._task.done():
+                # 큐가 가득 차 있어도 기록 작업이 비워 가므로 자리가 날 때까지 기다림
+                await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                event = self._queue.get_nowait()
+                if event is not _STOP:
+                    batch.append(event)
+            if batch:
+                await self._flush(batch)
+
+    def stats(self) -> Dict:
+        latencies = sorted(self._flush_latencies)
+        return {
+            "queued": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "published": self.published,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failed": self.failed,
+            "retries": self.retries,
+            "flush_latency": {
+                "last": round(self._flush_latencies[-1], 6) if latencies else None,
+                "avg": round(sum(latencies) / len(latencies), 6) if latencies else None,
+                "p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 6) if latencies else None,
+                "max": round(latencies[-1], 6) if latencies else None,
+            },
+        }
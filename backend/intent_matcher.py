@@ -0,0 +1,230 @@
+"""
+채팅 의도 매칭
+카테고리 키워드와 가격 표현을 Aho-Corasick 오토마톤으로 메시지 한 번 순회에 모두 찾음
+"""
+
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_KEYWORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_keywords.json")
+
+
+@dataclass
+class Intent:
+    """메시지에서 찾은 의도"""
+    categories: List[str] = field(default_factory=list)
+    min_price: Optional[int] = None
+    max_price: Optional[int] = None
+    matched_keywords: List[str] = field(default_factory=list)
+    # 키워드 검색만으로는 답하기 어려운 표현 (비교, 선물 고민 등)
+    escalation_keywords: List[str] = field(default_factory=list)
+    # 가격 조건으로 반영된 표현(금액, 한정어, 적용된 가격 힌트)을 뺀 소문자 메시지 (상품 검색어로 사용)
+    search_text: str = ""
+
+
+def _magnitude(number: int) -> int:
+    """단위 없는 금액의 자릿수 단위 (예: 5000 -> 1000)"""
+    unit = 1
+    while number and number % (unit * 10) == 0:
+        unit *= 10
+    return unit
+
+
+class _Automaton:
+    """Aho-Corasick 오토마톤 (문자 하나당 상수 시간 전이)"""
+
+    def __init__(self, patterns: Dict[str, list]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[str, tuple]]] = [[]]
+
+        for pattern, payloads in patterns.items():
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].extend((pattern, payload) for payload in payloads)
+
+        # 너비 우선으로 실패 링크 계산
+        pending = deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, next_state in self.goto[state].items():
+                pending.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state].extend(self.output[self.fail[next_state]])
+
+    def step(self, state: int, ch: str) -> int:
+        while state and ch not in self.goto[state]:
+            state = self.fail[state]
+        return self.goto[state].get(ch, 0)
+
+
+class IntentMatcher:
+    """
+    키워드 설정 파일로부터 한 번 컴파일해 두고 재사용하는 의도 매처
+    카테고리 키워드, 가격 힌트("저렴" 등), 금액 표현("3만원 이하", "5천원대"), 에이전트로 넘길 표현을 한 번의 순회로 인식
+    """
+
+    def __init__(self, config: Dict):
+        self._category_order = {c: i for i, c in enumerate(config.get("categories", {}))}
+        self._units: Dict[str, int] = config.get("price_units", {})
+
+        patterns: Dict[str, list] = {}
+        for category, keywords in config.get("categories", {}).items():
+            for keyword in keywords:
+                patterns.setdefault(keyword.lower(), []).append(("category", category))
+        for rank, hint in enumerate(config.get("price_hints", [])):
+            patterns.setdefault(hint["keyword"].lower(), []).append(("price_hint", (rank, hint["max_price"])))
+        for qualifier, kind in config.get("price_qualifiers", {}).items():
+            patterns.setdefault(qualifier, []).append(("qualifier", kind))
+        for keyword in config.get("escalation_keywords", []):
+            patterns.setdefault(keyword.lower(), []).append(("escalation", keyword))
+
+        self._automaton = _Automaton(patterns)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_KEYWORDS_FILE) -> "IntentMatcher":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, message: str) -> Intent:
+        """
+        메시지에서 카테고리와 가격 조건 추출
+        matched_keywords에는 실제로 의도에 반영된 키워드만 담음 (적용된 가격 힌트, 금액에 붙은 한정어 등)
+        """
+        text = message.lower()
+        intent = Intent()
+        categories = set()
+        best_hint: Optional[Tuple[int, int, str, int]] = None
+        # 금액 표현: (금액, 단위 크기, 금액이 끝난 위치, 숫자 없이 단위로 시작했는지, 시작 위치) 목록과
+        # 각 금액에 붙은 (한정어 종류, 한정어, 한정어가 끝난 위치)
+        amounts: List[Tuple[int, int, int, bool, int]] = []
+        qualifiers: Dict[int, Tuple[str, str, int]] = {}
+
+        number: Optional[int] = None
+        amount = 0
+        amount_start = 0
+        last_unit = 1
+        amount_end = -1
+        # 숫자 없이 단위로 시작한 금액 (예: "만원대"는 1만원대), "원"으로 끝날 때만 금액으로 인정
+        implicit = False
+        previous = ""
+        state = 0
+
+        for i, ch in enumerate(text):
+            # 숫자와 단위 누적 (예: "1만5천원", "2만 원", "1만 5천원")
+            if ch.isdigit():
+                if previous.isspace() and number is not None:
+                    # 공백으로 떨어진 숫자는 이어 붙이지 않음
+                    number = None
+                if number is None and not amount:
+                    amount_start = i
+                number = (number or 0) * 10 + int(ch)
+            elif ch == "," and number is not None:
+                pass
+            elif ch.isspace() and (number is not None or amount):
+                # 숫자/단위/"원" 사이 공백은 금액을 끊지 않음
+                pass
+            elif ch in self._units and (number is not None or not amount):
+                if number is None:
+                    number, implicit, amount_start = 1, True, i
+                last_unit = self._units[ch]
+                amount += number * last_unit
+                number = None
+                amount_end = i
+            elif ch == "원" and (number is not None or amount):
+                if number is not None:
+                    amount += number
+                    last_unit = _magnitude(number)
+                amounts.append((amount, last_unit, i, implicit, amount_start))
+                number, amount, implicit = None, 0, False
+            else:
+                if amount and not implicit:
+                    amounts.append((amount + (number or 0), last_unit, amount_end, False, amount_start))
+                number, amount, implicit = None, 0, False
+            previous = ch
+
+            state = self._automaton.step(state, ch)
+            for keyword, (kind, value) in self._automaton.output[state]:
+                if kind == "category":
+                    categories.add(value)
+                    intent.matched_keywords.append(keyword)
+                elif kind == "price_hint":
+                    if best_hint is None or value[0] < best_hint[0]:
+                        best_hint = (*value, keyword, i + 1)
+                elif kind == "escalation":
+                    if value not in intent.escalation_keywords:
+                        intent.escalation_keywords.append(value)
+                elif kind == "qualifier" and amounts:
+                    # 한정어는 바로 앞 금액 뒤에 공백만 두고 붙어 있을 때만 적용
+                    start = i - len(keyword) + 1
+                    if not text[amounts[-1][2] + 1:start].strip():
+                        qualifiers[len(amounts) - 1] = (value, keyword, i + 1)
+
+        if amount and not implicit:
+            amounts.append((amount + (number or 0), last_unit, amount_end, False, amount_start))
+
+        intent.categories = sorted(categories, key=self._category_order.get)
+
+        # 숫자 없는 금액은 한정어가 붙은 경우만 사용 ("만원대", "천원 이하"), 그 외 "만원"은 가격 힌트로 처리
+        consumed: List[Tuple[int, int]] = []
+        for index, (value, unit, end, implicit_amount, start) in enumerate(amounts):
+            qualifier = qualifiers.get(index)
+            if implicit_amount and qualifier is None:
+                continue
+            kind = qualifier[0] if qualifier else "max"
+            if kind == "range":
+                self._tighten(intent, value, value + unit - 1)
+            elif kind == "min":
+                self._tighten(intent, value, None)
+            elif kind == "above":
+                self._tighten(intent, value + 1, None)
+            elif kind == "below":
+                self._tighten(intent, None, value - 1)
+            else:
+                self._tighten(intent, None, value)
+            if qualifier:
+                intent.matched_keywords.append(qualifier[1])
+            consumed.append((start, qualifier[2] if qualifier else end + 1))
+
+        # 구체적인 금액이 없을 때만 가격 힌트 적용
+        if not consumed and best_hint is not None:
+            intent.max_price = best_hint[1]
+            intent.matched_keywords.append(best_hint[2])
+            consumed.append((best_hint[3] - len(best_hint[2]), best_hint[3]))
+
+        # 반영된 표현은 붙어 있는 조사/어미까지 단어 끝까지 뺌 (예: "저렴한", "이하로")
+        pieces, position = [], 0
+        for start, end in consumed:
+            pieces.append(text[position:start])
+            while end < len(text) and not text[end].isspace():
+                end += 1
+            position = end
+        pieces.append(text[position:])
+        intent.search_text = " ".join(" ".join(pieces).split())
+        return intent
+
+    @staticmethod
+    def _tighten(intent: Intent, min_price: Optional[int], max_price: Optional[int]):
+        if min_price is not None:
+            intent.min_price = min_price if intent.min_price is None else max(intent.min_price, min_price)
+        if max_price is not None:
+            intent.max_price = max_price if intent.max_price is None else min(intent.max_price, max_price)
+
+
+def load_intent_matcher() -> IntentMatcher:
+    """INTENT_KEYWORDS_FILE(기본값: backend/intent_keywords.json) 설정으로 매처 생성"""
+    return IntentMatcher.from_file(os.getenv("INTENT_KEYWORDS_FILE", DEFAULT_KEYWORDS_FILE))
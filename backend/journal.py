@@ -0,0 +1,137 @@
+"""
+SimpleDB 쓰기용 추가 전용(append-only) 저널
+각 쓰기 연산을 JSON 한 줄로 기록하고 fsync 정책에 따라 디스크에 반영
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+# fsync 정책
+# always: 매 기록마다 fsync / interval: fsync_interval초마다 최대 한 번 (기록 후 추가 쓰기가 없어도 타이머로 반영) / never: OS에 맡김
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class Journal:
+    def __init__(self, path: str, fsync_policy: str = "always", fsync_interval: float = 1.0):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"지원하지 않는 fsync 정책입니다: {fsync_policy}")
+        
+        self.path = path
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        # interval 정책에서 아직 fsync하지 않은 기록이 있는지, 예약된 fsync 타이머
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._file = open(self.path, "ab")
+
+    def append(self, ops: List[Dict]):
+        """연산 목록을 한 번의 쓰기로 기록"""
+        payload = "".join(
+            json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n" for op in ops
+        ).encode("utf-8")
+        
+        with self._lock:
+            self._file.write(payload)
+            self._file.flush()
+            self._maybe_fsync()
+
+    def _maybe_fsync(self):
+        if self.fsync_policy == "always":
+            os.fsync(self._file.fileno())
+        elif self.fsync_policy == "interval":
+            elapsed = time.monotonic() - self._last_fsync
+            if elapsed >= self.fsync_interval:
+                self._fsync()
+            else:
+                # 다음 쓰기를 기다리지 않고 간격이 지나면 백그라운드에서 반영
+                self._dirty = True
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.fsync_interval - elapsed, self._flush_pending)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+
+    def _fsync(self):
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+
+    def _flush_pending(self):
+        """예약된 fsync 실행 (타이머 스레드)"""
+        with self._lock:
+            self._flush_timer = None
+            if self._dirty and not self._file.closed:
+                self._fsync()
+
+    def _cancel_flush_timer(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def tell(self) -> int:
+        """현재까지 기록된 바이트 위치"""
+        with self._lock:
+            return self._file.tell()
+
+    def truncate_before(self, offset: int):
+        """
+        offset 이전 내용을 버리고 이후 기록만 남김 (스냅샷 반영 후 호출)
+        임시 파일에 남은 기록을 쓰고 rename으로 원자적으로 교체
+        """
+        with self._lock:
+            self._file.flush()
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                remainder = f.read()
+            
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(remainder)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            self._cancel_flush_timer()
+            self._dirty = False
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+
+    def close(self):
+        """남은 기록을 디스크에 반영하고 파일 닫기"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._cancel_flush_timer()
+            self._file.flush()
+            if self.fsync_policy != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def replay(path: str) -> Iterator[Dict]:
+    """
+    저널 연산을 기록 순서대로 반환
+    기록 도중 중단되어 잘린 마지막 줄은 버리고 파일을 마지막 정상 위치로 자름
+    """
+    if not os.path.exists(path):
+        return
+    
+    valid_end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                op = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            valid_end += len(line)
+            yield op
+    
+    if valid_end < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_end)
@@ -0,0 +1,306 @@
+"""
+로그 검색용 영속 역색인 (SQLite FTS5)
+롤오버된 파일(.log.1~)까지 로그 한 줄을 레코드 하나로 색인하고, 파일마다 ((로그 이름, inode), 읽은 바이트 위치)를 기록하여
+검색할 때마다 새로 쓰인 부분만 이어서 색인함 (롤오버는 이름만 바뀌고 inode는 그대로이므로 다시 읽지 않음)
+inode는 삭제된 파일의 번호가 재사용될 수 있으므로 파일 앞부분의 해시로 같은 파일인지 확인
+토큰화와 질의 매칭은 상품 검색과 같음 (한글 바이그램 + 영문/숫자 단어, 단어 토큰의 절반 이상 일치, search_index)
+시각은 UTC ISO 문자열로 맞춰 저장하므로 서머타임/시간대가 바뀌거나 UTC로 쓴 JSON 로그가 섞여도 문자열 순서 = 시간 순서
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from log_viewer import LOG_DIR, parse_log_line, rotation_chain
+from search_index import fts_query, tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_files (
+  log_name TEXT NOT NULL,
+  inode INTEGER NOT NULL,
+  path TEXT NOT NULL,
+  offset INTEGER NOT NULL DEFAULT 0,
+  line_count INTEGER NOT NULL DEFAULT 0,
+  -- 파일 앞 head_size바이트의 해시 (inode 재사용 확인용)
+  head_size INTEGER NOT NULL DEFAULT 0,
+  head_hash TEXT NOT NULL DEFAULT '',
+  PRIMARY KEY (log_name, inode)
+);
+
+CREATE TABLE IF NOT EXISTS log_lines (
+  id INTEGER PRIMARY KEY,
+  log_name TEXT NOT NULL,
+  inode INTEGER NOT NULL,
+  line_no INTEGER NOT NULL,
+  timestamp TEXT,
+  level TEXT,
+  line TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_log_lines_name_time ON log_lines(log_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_log_lines_name_level_time ON log_lines(log_name, level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_log_lines_name_inode ON log_lines(log_name, inode);
+
+-- 토큰화한 줄 텍스트 색인 (rowid = log_lines.id)
+CREATE VIRTUAL TABLE IF NOT EXISTS log_lines_fts USING fts5(tokens);
+"""
+
+# 스키마 버전 (PRAGMA user_version, 바뀌면 색인을 버리고 다시 만듦)
+SCHEMA_VERSION = 2
+
+# 한 트랜잭션에 색인할 최대 줄 수
+BATCH_LINES = 10000
+
+# 같은 파일인지 확인할 때 해시하는 앞부분 크기
+HEAD_SIZE = 1024
+
+
+def _head_hash(f, size: int) -> str:
+    """파일 앞 size바이트의 해시"""
+    f.seek(0)
+    return hashlib.blake2b(f.read(size), digest_size=16).hexdigest()
+
+
+def _normalize_timestamp(value) -> Optional[str]:
+    """
+    텍스트 형식(2025-01-01 12:00:00,123)과 JSON 형식 시각을 UTC ISO 문자열(2025-01-01T03:00:00.123+00:00)로 맞춤
+    시간대가 없는 시각은 서버 현지 시각으로 봄 (로그 포매터가 현지 시각으로 씀), 해석할 수 없으면 None
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace(",", ".", 1))
+    except ValueError:
+        return None
+    # 시간대 없는 시각의 astimezone()은 그 시각의 현지 오프셋(서머타임 포함)을 적용
+    return parsed.astimezone(timezone.utc).isoformat(timespec="milliseconds")
+
+
+class LogIndex:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(LOG_DIR, "log_index.db")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # 색인은 로그 파일에서 언제든 다시 만들 수 있으므로 예전 스키마는 버림
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS log_files; DROP TABLE IF EXISTS log_lines; DROP TABLE IF EXISTS log_lines_fts;"
+            )
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def refresh(self, log_name: str) -> int:
+        """로그(롤오버 파일 포함)에서 아직 색인하지 않은 줄을 색인, 새로 색인한 줄 수 반환"""
+        with self._lock:
+            chain = rotation_chain(log_name)
+            live_inodes = []
+            indexed = 0
+            # 오래된 파일부터 색인하여 id 순서가 시간 순서와 같도록 함
+            for path in reversed(chain):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                live_inodes.append(stat.st_ino)
+                indexed += self._index_file(log_name, path, stat)
+            self._prune(log_name, live_inodes)
+            return indexed
+
+    def _index_file(self, log_name: str, path: str, stat: os.stat_result) -> int:
+        inode = stat.st_ino
+        row = self._conn.execute(
+            "SELECT path, offset, line_count, head_size, head_hash FROM log_files WHERE log_name = ? AND inode = ?",
+            (log_name, inode)
+        ).fetchone()
+        offset, line_no = (row["offset"], row["line_count"]) if row else (0, 0)
+
+        with open(path, "rb") as f:
+            # 기록보다 파일이 작아졌거나(잘림) 앞부분이 달라졌으면(삭제된 파일의 inode 재사용) 처음부터 다시 색인
+            if row is not None and (
+                offset > stat.st_size
+                or (row["head_size"] and _head_hash(f, row["head_size"]) != row["head_hash"])
+            ):
+                self._delete_inode(log_name, inode)
+                row, offset, line_no = None, 0, 0
+            if row is None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO log_files (log_name, inode, path) VALUES (?, ?, ?)",
+                        (log_name, inode, path)
+                    )
+            elif offset == stat.st_size:
+                # 새 내용 없음 (롤오버로 이름만 바뀌었으면 경로만 갱신)
+                if row["path"] != path:
+                    with self._conn:
+                        self._conn.execute(
+                            "UPDATE log_files SET path = ? WHERE log_name = ? AND inode = ?", (path, log_name, inode)
+                        )
+                return 0
+            return self._index_lines(log_name, path, inode, f, offset, line_no, row)
+
+    def _index_lines(self, log_name: str, path: str, inode: int, f, offset: int, line_no: int, row) -> int:
+        """offset부터 완성된 줄을 배치 단위로 색인 (배치마다 읽은 위치와 앞부분 해시 갱신)"""
+        head_size = row["head_size"] if row else 0
+        head_hash = row["head_hash"] if row else ""
+        indexed = 0
+        f.seek(offset)
+        while True:
+            lines = f.readlines(BATCH_LINES * 256)
+            # 아직 쓰는 중인(개행 없는) 마지막 줄은 다음에 색인
+            if lines and not lines[-1].endswith(b"\n"):
+                lines.pop()
+            if not lines:
+                break
+
+            rows = []
+            for raw in lines:
+                line_no += 1
+                text = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                record = parse_log_line(text) or {}
+                rows.append((
+                    log_name, inode, line_no,
+                    _normalize_timestamp(record.get("timestamp")), record.get("level"), text
+                ))
+                offset += len(raw)
+
+            # 앞부분 해시는 HEAD_SIZE바이트가 찰 때까지 색인한 내용으로 갱신
+            if head_size < HEAD_SIZE:
+                head_size = min(offset, HEAD_SIZE)
+                head_hash = _head_hash(f, head_size)
+                f.seek(offset)
+
+            with self._conn:
+                for values in rows:
+                    rowid = self._conn.execute(
+                        "INSERT INTO log_lines (log_name, inode, line_no, timestamp, level, line) VALUES (?, ?, ?, ?, ?, ?)",
+                        values
+                    ).lastrowid
+                    self._conn.execute(
+                        "INSERT INTO log_lines_fts (rowid, tokens) VALUES (?, ?)",
+                        (rowid, " ".join(tokenize(values[5])))
+                    )
+                self._conn.execute(
+                    "UPDATE log_files SET path = ?, offset = ?, line_count = ?, head_size = ?, head_hash = ? "
+                    "WHERE log_name = ? AND inode = ?",
+                    (path, offset, line_no, head_size, head_hash, log_name, inode)
+                )
+            indexed += len(rows)
+        return indexed
+
+    def _delete_inode(self, log_name: str, inode: int):
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM log_lines_fts WHERE rowid IN (SELECT id FROM log_lines WHERE log_name = ? AND inode = ?)",
+                (log_name, inode)
+            )
+            self._conn.execute("DELETE FROM log_lines WHERE log_name = ? AND inode = ?", (log_name, inode))
+            self._conn.execute("DELETE FROM log_files WHERE log_name = ? AND inode = ?", (log_name, inode))
+
+    def _prune(self, log_name: str, live_inodes: List[int]):
+        """롤오버로 삭제된 파일의 색인 제거"""
+        placeholders = ",".join("?" * len(live_inodes)) or "NULL"
+        stale = self._conn.execute(
+            f"SELECT inode FROM log_files WHERE log_name = ? AND inode NOT IN ({placeholders})",
+            [log_name, *live_inodes]
+        ).fetchall()
+        for row in stale:
+            self._delete_inode(log_name, row["inode"])
+
+    def search(
+        self,
+        log_name: str,
+        query: str = "",
+        level: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        mode: str = "and",
+        page: int = 1,
+        page_size: int = 50
+    ) -> Dict:
+        """
+        색인을 갱신한 뒤 최근 줄부터 검색
+        query는 상품 검색과 같이 단어 단위로 mode="and"면 모든 단어, "or"면 하나 이상의 단어가 일치
+        level, since/until(ISO 8601 시각, since 이상 until 미만, 시간대가 없으면 현지 시각)로 범위를 좁힘
+        결과의 timestamp는 UTC ISO 문자열
+        """
+        self.refresh(log_name)
+
+        sql = " FROM log_lines l"
+        where = ["l.log_name = ?"]
+        params: List = [log_name]
+        match = fts_query(query, mode) if query else None
+        if query and match is None:
+            return {"total": 0, "page": page, "page_size": page_size, "results": []}
+        if match:
+            # 일치하는 rowid 집합을 한 번만 구하도록 하위 질의로 (조인하면 줄마다 FTS 질의를 반복할 수 있음)
+            where.append("l.id IN (SELECT rowid FROM log_lines_fts WHERE log_lines_fts MATCH ?)")
+            params.append(match)
+        if level:
+            where.append("l.level = ?")
+            params.append(level.upper())
+        for name, op, value in (("since", ">=", since), ("until", "<", until)):
+            if not value:
+                continue
+            bound = _normalize_timestamp(value)
+            if bound is None:
+                raise ValueError(f"{name}은(는) ISO 8601 시각이어야 합니다: {value}")
+            where.append(f"l.timestamp {op} ?")
+            params.append(bound)
+        sql += " WHERE " + " AND ".join(where)
+
+        page = max(1, page)
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*)" + sql, params).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT l.inode, l.line_no, l.timestamp, l.level, l.line,"
+                " (SELECT path FROM log_files WHERE log_name = l.log_name AND inode = l.inode) AS path" + sql +
+                " ORDER BY l.id DESC LIMIT ? OFFSET ?",
+                [*params, page_size, (page - 1) * page_size]
+            ).fetchall()
+
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "results": [
+                {
+                    "file": os.path.basename(row["path"]) if row["path"] else None,
+                    "line_number": row["line_no"],
+                    "timestamp": row["timestamp"],
+                    "level": row["level"],
+                    "line": row["line"]
+                }
+                for row in rows
+            ]
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            files = [dict(row) for row in self._conn.execute("SELECT log_name, path, offset, line_count FROM log_files")]
+            lines = self._conn.execute("SELECT COUNT(*) FROM log_lines").fetchone()[0]
+        return {"path": self.path, "lines": lines, "files": files}
+
+
+# 전역 로그 색인 (처음 검색할 때 생성)
+_log_index: Optional[LogIndex] = None
+_log_index_lock = threading.Lock()
+
+
+def get_log_index() -> LogIndex:
+    global _log_index
+    if _log_index is None:
+        with _log_index_lock:
+            if _log_index is None:
+                _log_index = LogIndex(os.getenv("LOG_INDEX_PATH") or None)
+    return _log_index
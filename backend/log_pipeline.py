@@ -0,0 +1,155 @@
+"""
+비동기 로깅 파이프라인
+요청 처리 스레드는 로그 레코드를 크기가 제한된 큐에 넣기만 하고,
+백그라운드 스레드가 한 번에 여러 개를 꺼내 로거별 핸들러(파일/콘솔)에 쓴 뒤 핸들러마다 한 번만 flush
+"""
+
+import atexit
+import copy
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Dict, List, Optional
+
+POLICIES = ("drop", "block")
+
+# 리스너 종료 신호
+_STOP = object()
+
+
+def _emit_batch(handler: logging.StreamHandler, records: List[logging.LogRecord]):
+    """레코드 여러 개를 쓰고 마지막에 한 번만 flush (롤오버 검사는 레코드마다)"""
+    handler.acquire()
+    try:
+        for record in records:
+            try:
+                if isinstance(handler, RotatingFileHandler) and handler.shouldRollover(record):
+                    handler.doRollover()
+                handler.stream.write(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+        handler.flush()
+    finally:
+        handler.release()
+
+
+class _PipelineHandler(QueueHandler):
+    """로거에 붙는 핸들러 (메시지만 미리 만들어 두고 큐 정책에 따라 넣음)"""
+
+    def __init__(self, pipeline: "LogPipeline"):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        메시지 인자를 미리 적용하고 예외 정보는 문자열(exc_text)로 바꿔 둠
+        (기본 prepare는 traceback을 메시지에 합치고 exc_info를 지우므로 JSON 형식의 exception 필드가 사라짐)
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        self.pipeline.enqueue(record)
+
+
+class LogPipeline:
+    """
+    큐가 가득 찼을 때 policy="drop"이면 바로 버리고, policy="block"이면 block_timeout초까지 기다린 뒤 버림
+    버린 레코드 수는 로거별로 셈
+    """
+
+    def __init__(self, max_queue: int = 10000, policy: str = "drop", block_timeout: float = 1.0, batch_size: int = 256):
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 로그 큐 정책입니다: {policy}")
+        self.queue: "queue.Queue" = queue.Queue(max_queue)
+        self.max_queue = max_queue
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.handler = _PipelineHandler(self)
+        self._handlers: Dict[str, List[logging.StreamHandler]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped: Dict[str, int] = {}
+
+    def register(self, name: str, handlers: List[logging.StreamHandler]):
+        """로거 이름별로 실제로 쓸 핸들러 등록"""
+        self._handlers[name] = handlers
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.name] = self.dropped.get(record.name, 0) + 1
+            return
+        with self._lock:
+            self.enqueued += 1
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-pipeline", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self, timeout: float = 5.0):
+        """큐에 남은 레코드를 모두 쓴 뒤 리스너 종료"""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = any(record is _STOP for record in batch)
+            self._write([record for record in batch if record is not _STOP])
+            if stopping:
+                return
+
+    def _write(self, records: List[logging.LogRecord]):
+        # 핸들러별로 모아 입력 순서대로 씀
+        groups: Dict[logging.StreamHandler, List[logging.LogRecord]] = {}
+        for record in records:
+            for handler in self._handlers.get(record.name, ()):
+                if record.levelno >= handler.level and handler.filter(record):
+                    groups.setdefault(handler, []).append(record)
+        for handler, handler_records in groups.items():
+            _emit_batch(handler, handler_records)
+
+        with self._lock:
+            self.written += len(records)
+            self.batches += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "queue_size": self.queue.qsize(),
+                "max_queue": self.max_queue,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+                "dropped": sum(self.dropped.values()),
+                "dropped_by_logger": dict(self.dropped)
+            }
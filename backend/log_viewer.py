@@ -3,14 +3,81 @@
 웹에서 로그를 확인할 수 있는 API들
 """
 
+import asyncio
 import os
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import AsyncIterator, BinaryIO, List, Dict, Optional
 from pathlib import Path
 
 LOG_DIR = "logs"
 
+# 끝에서부터 거꾸로 읽을 때의 블록 크기
+TAIL_BLOCK_SIZE = 64 * 1024
+
+def _log_path(filename: str) -> str:
+    return os.path.join(LOG_DIR, os.path.basename(filename))
+
+def rotation_chain(filename: str) -> List[str]:
+    """현재 파일과 롤오버된 파일(.log.1, .log.2, ...)을 최신 순으로 반환"""
+    path = _log_path(filename)
+    chain = [path] if os.path.exists(path) else []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        chain.append(f"{path}.{index}")
+        index += 1
+    return chain
+
+def _tail(f: BinaryIO, lines: int, end: Optional[int] = None) -> List[bytes]:
+    """
+    파일 끝(end)에서부터 블록 단위로 거꾸로 읽어 마지막 lines줄만 반환 (개행 포함)
+    필요한 블록만 읽으므로 파일 크기와 관계없이 메모리 사용량이 일정함
+    """
+    position = f.seek(0, os.SEEK_END) if end is None else end
+    chunks = []
+    newlines = 0
+    # 첫 블록의 맨 앞 줄은 잘렸을 수 있으므로 lines개보다 개행이 하나 더 많을 때까지 읽음
+    while position > 0 and newlines <= lines:
+        size = min(TAIL_BLOCK_SIZE, position)
+        position -= size
+        f.seek(position)
+        chunk = f.read(size)
+        chunks.append(chunk)
+        newlines += chunk.count(b"\n")
+
+    parts = b"".join(reversed(chunks)).split(b"\n")
+    result = [part + b"\n" for part in parts[:-1]]
+    if parts[-1]:
+        result.append(parts[-1])
+    return result[-lines:] if lines > 0 else []
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace")
+
+def parse_log_line(line: str) -> Optional[Dict]:
+    """
+    로그 한 줄을 레코드로 변환
+    JSON 형식(LOG_FORMAT=json) 줄은 그대로 디코딩하고, 기존 텍스트 줄은
+    timestamp/logger/level/message만 나눔 (빈 줄이나 깨진 줄은 None)
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    parts = line.split(" - ", 3)
+    if len(parts) < 4:
+        return None
+    return {"timestamp": parts[0], "logger": parts[1], "level": parts[2], "message": parts[3]}
+
+def read_log_records(filename: str, lines: int = 100, rotated: bool = True) -> List[Dict]:
+    """로그 파일의 마지막 N줄을 레코드로 읽기"""
+    records = (parse_log_line(line) for line in read_log_file(filename, lines, rotated))
+    return [record for record in records if record is not None]
+
 def get_log_files() -> List[str]:
     """사용 가능한 로그 파일 목록 반환"""
     log_path = Path(LOG_DIR)
@@ -19,42 +86,105 @@ def get_log_files() -> List[str]:
     
     return [f.name for f in log_path.glob("*.log")]
 
-def read_log_file(filename: str, lines: int = 100) -> List[str]:
-    """로그 파일의 마지막 N줄 읽기"""
-    log_file = os.path.join(LOG_DIR, filename)
-    
-    if not os.path.exists(log_file):
+def read_log_file(filename: str, lines: int = 100, rotated: bool = True) -> List[str]:
+    """
+    로그 파일의 마지막 N줄 읽기
+    rotated=True면 롤오버된 파일(.log.1~)까지 하나의 로그로 이어서 읽음 (lines <= 0이면 전체)
+    """
+    if rotated:
+        chain = rotation_chain(filename)
+    else:
+        chain = [path for path in [_log_path(filename)] if os.path.exists(path)]
+    if not chain:
         return []
     
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            all_lines = f.readlines()
-            return all_lines[-lines:] if lines > 0 else all_lines
+        if lines <= 0:
+            result = []
+            for path in reversed(chain):
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    result.extend(f.readlines())
+            return result
+        
+        result: List[bytes] = []
+        for path in chain:
+            needed = lines - len(result)
+            if needed <= 0:
+                break
+            with open(path, 'rb') as f:
+                result = _tail(f, needed) + result
+        return [_decode(line) for line in result]
     except Exception as e:
         return [f"로그 파일 읽기 오류: {str(e)}"]
 
-def search_logs(filename: str, keyword: str, lines: int = 50) -> List[str]:
-    """로그에서 키워드 검색"""
-    log_file = os.path.join(LOG_DIR, filename)
-    
-    if not os.path.exists(log_file):
-        return []
-    
+async def follow_log_file(filename: str, lines: int = 10, poll_interval: float = 0.5) -> AsyncIterator[str]:
+    """
+    마지막 N줄을 먼저 보내고, 이후 파일에 새로 쓰이는 줄을 계속 생성 (tail -F)
+    롤오버로 파일이 바뀌면 이전 파일의 남은 줄을 마저 보낸 뒤 새 파일을 처음부터 읽음
+    """
+    path = _log_path(filename)
+    f = None
+    inode = None
+    buffer = b""
     try:
-        results = []
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                if keyword.lower() in line.lower():
-                    results.append(f"[Line {line_num}] {line.strip()}")
-                    if len(results) >= lines:
+        while True:
+            if f is None:
+                try:
+                    f = open(path, 'rb')
+                except FileNotFoundError:
+                    await asyncio.sleep(poll_interval)
+                    continue
+                inode = os.fstat(f.fileno()).st_ino
+                if lines is not None:
+                    end = f.seek(0, os.SEEK_END)
+                    initial = _tail(f, lines + 1, end)
+                    # 아직 쓰는 중인(개행 없는) 마지막 줄은 이어서 읽을 내용과 합침
+                    if initial and not initial[-1].endswith(b"\n"):
+                        buffer = initial.pop()
+                    for line in initial[-lines:] if lines > 0 else []:
+                        yield _decode(line).rstrip("\n")
+                    f.seek(end)
+                    lines = None
+            
+            chunk = f.read(TAIL_BLOCK_SIZE)
+            if chunk:
+                *complete, buffer = (buffer + chunk).split(b"\n")
+                for line in complete:
+                    yield _decode(line)
+                continue
+            
+            # 더 읽을 내용이 없으면 롤오버/잘림 여부 확인
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            if stat is not None and stat.st_ino != inode:
+                # 확인하는 사이 이전 파일에 쓰인 줄까지 끝까지 읽은 뒤 닫음
+                while True:
+                    chunk = f.read(TAIL_BLOCK_SIZE)
+                    if not chunk:
                         break
-        return results
-    except Exception as e:
-        return [f"로그 검색 오류: {str(e)}"]
+                    *complete, buffer = (buffer + chunk).split(b"\n")
+                    for line in complete:
+                        yield _decode(line)
+                if buffer:
+                    yield _decode(buffer)
+                    buffer = b""
+                f.close()
+                f = None
+                continue
+            if stat is not None and stat.st_size < f.tell():
+                f.seek(0)
+                buffer = b""
+                continue
+            await asyncio.sleep(poll_interval)
+    finally:
+        if f is not None:
+            f.close()
 
 def get_log_stats(filename: str) -> Dict:
     """로그 파일 통계 정보"""
-    log_file = os.path.join(LOG_DIR, filename)
+    log_file = _log_path(filename)
     
     if not os.path.exists(log_file):
         return {"error": "파일이 존재하지 않습니다"}
@@ -75,7 +205,13 @@ def get_log_stats(filename: str) -> Dict:
         with open(log_file, 'r', encoding='utf-8') as f:
             for line in f:
                 stats["total_lines"] += 1
-                if "ERROR" in line:
+                if line.startswith("{"):
+                    level = (parse_log_line(line) or {}).get("level")
+                    if level == "ERROR":
+                        stats["error_count"] += 1
+                    elif level == "INFO":
+                        stats["info_count"] += 1
+                elif "ERROR" in line:
                     stats["error_count"] += 1
                 elif "INFO" in line:
                     stats["info_count"] += 1
@@ -95,7 +231,18 @@ def parse_chat_logs() -> List[Dict]:
     try:
         with open(chat_log_file, 'r', encoding='utf-8') as f:
             for line in f:
-                if "CHAT - INFO" in line:
+                if line.startswith("{"):
+                    # JSON 형식은 필드를 그대로 사용
+                    record = parse_log_line(line)
+                    if record and record.get("logger") == "CHAT":
+                        interactions.append({
+                            "timestamp": record["timestamp"],
+                            "user_id": record.get("user_id"),
+                            "message": record.get("message"),
+                            "products_count": record.get("products_count"),
+                            "request_id": record.get("request_id")
+                        })
+                elif "CHAT - INFO" in line:
                     # 로그 파싱
                     parts = line.split(" | ")
                     if len(parts) >= 4:
@@ -3,17 +3,80 @@
 API 요청, 응답, 오류 등을 파일로 저장하여 나중에 분석 가능
 """
 
+import json
 import logging
 import os
+import threading
+from contextvars import ContextVar
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
+from typing import Optional
 
-# 로그 디렉토리 생성
+from log_pipeline import LogPipeline
+
+# 로그 디렉토리 (첫 로그를 남길 때 생성)
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
+
+# 비동기 로깅 설정 (요청 처리 중에는 큐에 넣기만 하고 파일/콘솔 쓰기는 백그라운드 스레드에서 묶어서 처리)
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop")  # drop 또는 block
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv("LOG_QUEUE_BLOCK_TIMEOUT", "1"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+
+# 로그 형식: text(기존 한 줄 텍스트) 또는 json(한 줄에 JSON 레코드 하나, 필드 타입 유지)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+if LOG_FORMAT not in ("text", "json"):
+    raise ValueError(f"지원하지 않는 로그 형식입니다: {LOG_FORMAT}")
+
+# 현재 처리 중인 요청 ID (미들웨어에서 설정, 이 요청에서 남기는 모든 로그에 포함)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+class _RequestIdFilter(logging.Filter):
+    """로그를 남기는 시점(요청 처리 중)의 요청 ID를 레코드에 기록"""
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+class JsonLinesFormatter(logging.Formatter):
+    """레코드 하나를 JSON 한 줄로 기록 (log_* 함수가 extra["fields"]로 넘긴 필드는 타입 그대로)"""
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "logger": record.name,
+            "level": record.levelname,
+            "request_id": getattr(record, "request_id", None)
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        else:
+            entry["message"] = record.getMessage()
+        # 비동기 파이프라인을 거친 레코드는 예외 정보가 exc_text 문자열로만 남아 있음
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+_log_pipeline: Optional[LogPipeline] = None
+
+def get_log_pipeline() -> LogPipeline:
+    """전역 로깅 파이프라인 (처음 호출 시 리스너 스레드 시작)"""
+    global _log_pipeline
+    if _log_pipeline is None:
+        _log_pipeline = LogPipeline(
+            max_queue=LOG_QUEUE_SIZE,
+            policy=LOG_QUEUE_POLICY,
+            block_timeout=LOG_QUEUE_BLOCK_TIMEOUT,
+            batch_size=LOG_BATCH_SIZE
+        )
+        _log_pipeline.start()
+    return _log_pipeline
 
 def setup_logger(name: str, log_file: str, level=logging.INFO):
     """로거 설정"""
+    os.makedirs(LOG_DIR, exist_ok=True)
     
     # 파일 핸들러 (5MB마다 롤오버, 최대 5개 파일 보관)
     file_handler = RotatingFileHandler(
@@ -26,9 +89,12 @@ def setup_logger(name: str, log_file: str, level=logging.INFO):
     console_handler = logging.StreamHandler()
     
     # 포맷터 설정
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    if LOG_FORMAT == "json":
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
     
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
@@ -36,29 +102,67 @@ def setup_logger(name: str, log_file: str, level=logging.INFO):
     # 로거 생성
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    logger.addFilter(_RequestIdFilter())
+    if LOG_ASYNC:
+        pipeline = get_log_pipeline()
+        pipeline.register(name, [file_handler, console_handler])
+        logger.addHandler(pipeline.handler)
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
     
     return logger
 
-# 다양한 용도의 로거들
-api_logger = setup_logger('API', 'api_requests.log')
-chat_logger = setup_logger('CHAT', 'chat_interactions.log')
-error_logger = setup_logger('ERROR', 'errors.log', logging.ERROR)
-system_logger = setup_logger('SYSTEM', 'system.log')
+# 다양한 용도의 로거들 (이름 -> (파일, 레벨)), import 시점이 아니라 처음 사용할 때 파일 핸들러를 엶
+LOGGERS = {
+    'API': ('api_requests.log', logging.INFO),
+    'CHAT': ('chat_interactions.log', logging.INFO),
+    'ERROR': ('errors.log', logging.ERROR),
+    'SYSTEM': ('system.log', logging.INFO),
+}
+
+_setup_lock = threading.Lock()
+
+def log_pipeline_stats() -> dict:
+    """비동기 로깅 큐 상태와 버린 레코드 수"""
+    if not LOG_ASYNC:
+        return {"async": False}
+    return {"async": True, **get_log_pipeline().stats()}
+
+def get_logger(name: str) -> logging.Logger:
+    """설정된 로거 반환 (처음 호출 시 핸들러 생성)"""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        with _setup_lock:
+            if not logger.handlers:
+                log_file, level = LOGGERS[name]
+                setup_logger(name, log_file, level)
+    return logger
 
 def log_api_request(method: str, path: str, user_id: str = None, data: dict = None):
     """API 요청 로깅"""
-    api_logger.info(f"{method} {path} | User: {user_id} | Data: {data}")
+    get_logger('API').info(
+        f"{method} {path} | User: {user_id} | Data: {data}",
+        extra={"fields": {"method": method, "path": path, "user_id": user_id, "data": data}}
+    )
 
 def log_chat_interaction(user_id: str, message: str, response: str, products_count: int = 0):
     """채팅 상호작용 로깅"""
-    chat_logger.info(f"User: {user_id} | Message: '{message}' | Products: {products_count} | Response: '{response[:100]}...'")
+    get_logger('CHAT').info(
+        f"User: {user_id} | Message: '{message}' | Products: {products_count} | Response: '{response[:100]}...'",
+        extra={"fields": {"user_id": user_id, "message": message, "products_count": products_count, "response": response[:100]}}
+    )
 
 def log_error(error_type: str, error_message: str, context: dict = None):
     """오류 로깅"""
-    error_logger.error(f"{error_type}: {error_message} | Context: {context}")
+    get_logger('ERROR').error(
+        f"{error_type}: {error_message} | Context: {context}",
+        extra={"fields": {"error_type": error_type, "error_message": error_message, "context": context}}
+    )
 
 def log_system_event(event: str, details: dict = None):
     """시스템 이벤트 로깅"""
-    system_logger.info(f"{event} | Details: {details}")
\ No newline at end of file
+    get_logger('SYSTEM').info(
+        f"{event} | Details: {details}",
+        extra={"fields": {"event": event, "details": details}}
+    )
\ No newline at end of file
@@ -1,12 +1,33 @@
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from startup import startup_profiler
+
+with startup_profiler.phase("fastapi"):
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, StreamingResponse
+    from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+import importlib
+import json
 import os
+import sys
 import time
+import uuid
 from dotenv import load_dotenv
-from simple_db import simple_db
-from logger_config import log_api_request, log_chat_interaction, log_error, log_system_event
-from log_viewer import get_log_files, read_log_file, search_logs, get_log_stats, parse_chat_logs
+with startup_profiler.phase("storage"):
+    import db
+    from bulk_import import import_products, iter_csv_rows, iter_ndjson_rows
+    from repository import add_listener as add_repository_listener, get_repository
+    from events import EventPipeline, EventQueueFull, create_event_sink, validate_event
+with startup_profiler.phase("chat"):
+    from intent_matcher import load_intent_matcher
+    from chat_router import AGENT, CATALOG, ChatRouter
+    from response_cache import ResponseCache, normalize_message
+    from recommendation_store import RecommendationStore
+with startup_profiler.phase("logging"):
+    from logger_config import log_api_request, log_chat_interaction, log_error, log_pipeline_stats, log_system_event, request_id_var
+    from log_viewer import follow_log_file, get_log_files, read_log_file, read_log_records, get_log_stats, parse_chat_logs
+    from log_index import get_log_index
 
 # 환경변수 로드
 load_dotenv()
@@ -36,26 +57,130 @@ app.add_middleware(
 async def log_requests(request: Request, call_next):
     start_time = time.time()
     
-    # 요청 정보 로깅
-    log_api_request(
-        method=request.method,
-        path=str(request.url.path),
-        user_id=None,  # 나중에 사용자 인증 시 추가
-        data=None
-    )
-    
-    response = await call_next(request)
-    
-    # 응답 시간 계산
-    process_time = time.time() - start_time
-    log_system_event("API_RESPONSE", {
-        "path": str(request.url.path),
-        "status_code": response.status_code,
-        "process_time": f"{process_time:.4f}s"
-    })
+    # 요청 ID (클라이언트가 X-Request-ID를 보내면 그대로 사용), 이 요청에서 남기는 모든 로그에 포함
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    try:
+        # 요청 정보 로깅
+        log_api_request(
+            method=request.method,
+            path=str(request.url.path),
+            user_id=None,  # 나중에 사용자 인증 시 추가
+            data=None
+        )
+        
+        response = await call_next(request)
+        
+        # 응답 시간 계산 (초 단위 숫자)
+        process_time = time.time() - start_time
+        log_system_event("API_RESPONSE", {
+            "path": str(request.url.path),
+            "status_code": response.status_code,
+            "process_time": round(process_time, 4)
+        })
+    finally:
+        request_id_var.reset(token)
     
+    response.headers["X-Request-ID"] = request_id
     return response
 
+def get_recommendation_engine():
+    """추천 엔진 반환 (numpy를 쓰는 추천 모듈은 처음 사용할 때 또는 백그라운드 준비 단계에서 불러옴)"""
+    from recommendation import get_recommendation_engine
+    return get_recommendation_engine()
+
+# 채팅 의도 매처 (시작 시 키워드 설정을 한 번만 컴파일)
+with startup_profiler.phase("intent_matcher"):
+    intent_matcher = load_intent_matcher()
+
+# 채팅 라우터 (확신도가 threshold 이상인 요청만 카탈로그에서 바로 응답, 나머지는 에이전트로)
+chat_router = ChatRouter(
+    intent_matcher,
+    threshold=float(os.getenv("CHAT_ROUTER_THRESHOLD", "0.6")),
+    max_short_length=int(os.getenv("CHAT_ROUTER_MAX_SHORT_LENGTH", "40"))
+)
+
+# 채팅 응답 캐시 (카탈로그 버전이 바뀌면 자동으로 무효화)
+chat_response_cache = ResponseCache(
+    maxsize=int(os.getenv("CHAT_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("CHAT_CACHE_TTL", "300"))
+)
+
+# 사용자별 추천 결과 저장소 (선호도/카탈로그 변경 시 해당 사용자만 재계산)
+recommendation_store = RecommendationStore(
+    get_recommendation_engine,
+    top_n=int(os.getenv("RECOMMENDATION_STORE_TOP_N", "20")),
+    refresh_interval=float(os.getenv("RECOMMENDATION_STORE_REFRESH_INTERVAL", "5")),
+    ttl=float(os.getenv("RECOMMENDATION_STORE_TTL", "600"))
+)
+
+def on_repository_change(ops: list):
+    """저장소(추천 엔진이 읽는 것과 같은 DATA_BACKEND) 쓰기 반영 후 추천 저장소 무효화 및 추천 엔진 갱신"""
+    engine = get_recommendation_engine()
+    added = []
+    for op in ops:
+        if op["op"] == "add_product":
+            engine.on_product_added(op["product"])
+            added.append(op["product"])
+        elif op["op"] == "update_user_preferences":
+            recommendation_store.invalidate_user(op["user_id"])
+    if added:
+        recommendation_store.invalidate_products(added)
+
+add_repository_listener(on_repository_change)
+
+def on_events_flushed(events: list):
+    """기록된 상호작용 이벤트를 인기 상품 리더보드에 반영"""
+    get_recommendation_engine().record_interactions(events)
+
+# 상호작용 이벤트 수집 파이프라인 (EVENT_SINK: jsonl/sqlite/supabase)
+event_pipeline = EventPipeline(
+    create_event_sink(),
+    max_queue=int(os.getenv("EVENT_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("EVENT_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("EVENT_FLUSH_INTERVAL", "1")),
+    enqueue_timeout=float(os.getenv("EVENT_ENQUEUE_TIMEOUT", "0.1")),
+    on_flush=on_events_flushed
+)
+
+async def warm_up_recommendation_engine():
+    """추천 모듈 import는 스레드에서, 엔진 생성과 인덱스 구축(정렬 등 무거운 부분은 스레드에서)은 이벤트 루프에서"""
+    await asyncio.to_thread(importlib.import_module, "recommendation")
+    await get_recommendation_engine().warm_up()
+
+async def warm_up_repository():
+    repository = await asyncio.to_thread(get_repository)
+    await repository.warm_up()
+
+def warm_up_agent():
+    """LangChain import와 에이전트 초기화 (스레드에서 실행)"""
+    if create_chat_agent() is None:
+        raise RuntimeError("에이전트를 사용할 수 없습니다 (패키지 또는 API 키 확인)")
+
+# 서버가 요청을 받기 시작한 뒤 백그라운드에서 미리 불러올 구성 요소 (에이전트는 없어도 서비스 가능)
+startup_profiler.add_component("repository", warm_up_repository)
+startup_profiler.add_component("recommendation_engine", warm_up_recommendation_engine)
+if os.getenv("AGENT_WARM_UP", "true").lower() == "true":
+    startup_profiler.add_component("agent", warm_up_agent, required=False)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    recommendation_store.start()
+    event_pipeline.start()
+    startup_profiler.start_warm_up(on_complete=lambda report: log_system_event("STARTUP", report))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await startup_profiler.stop()
+    await recommendation_store.stop()
+    await event_pipeline.stop()
+    await get_repository().close()
+    await db.close()
+    # 에이전트를 사용한 적이 있으면 사용자별 대화 기록 저장
+    agent_module = sys.modules.get("agent.agent")
+    if agent_module and agent_module.agent_instance:
+        await agent_module.agent_instance.close()
+
 # 요청/응답 모델
 class ChatRequest(BaseModel):
     message: str
@@ -65,6 +190,11 @@ class ChatResponse(BaseModel):
     response: str
     products: list = []
 
+class BatchRecommendationRequest(BaseModel):
+    user_ids: List[str]
+    limit: int = 5
+    output_file: Optional[str] = None
+
 # 기본 라우트
 @app.get("/")
 async def root():
@@ -75,46 +205,48 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "benefit-station-ai"}
 
+# 준비 상태 확인 (프로세스가 살아 있는지만 보는 /health와 달리, 백그라운드 준비가 끝나야 200)
+@app.get("/ready")
+async def readiness_check():
+    report = startup_profiler.report()
+    if not report["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", **report})
+    return {"status": "ready", **report}
+
+# 시작 시간 측정 결과 (import 단계별, 구성 요소 준비 시간)
+@app.get("/api/startup/report")
+async def get_startup_report():
+    return startup_profiler.report()
 
 
-def get_products_by_keyword(keyword: str):
-    """키워드로 상품 필터링 - JSON 기반 DB 사용"""
+
+async def get_products_by_keyword(keyword: str, intent=None):
+    """키워드로 상품 필터링 (DATA_BACKEND 저장소 사용)"""
     keyword = keyword.lower()
     results = []
     
-    # 카테고리별 키워드 매핑
-    category_keywords = {
-        'food': ['식사', '먹', '음식', '커피', '스타벅스', '배달'],
-        'health': ['건강', '헬스', '운동', '검진', '요가'],
-        'life': ['생활', '넷플릭스', '할인', '김치냉장고'],
-        'education': ['교육', '강의', '학습'],
-        'shopping': ['쇼핑', '구매']
-    }
+    # 카테고리 키워드와 가격 표현을 한 번에 인식 (라우터가 이미 인식했으면 재사용)
+    if intent is None:
+        intent = intent_matcher.match(keyword)
     
-    # 키워드에 해당하는 카테고리 찾기
-    target_categories = []
-    for category, keywords_list in category_keywords.items():
-        if any(word in keyword for word in keywords_list):
-            target_categories.append(category)
+    repository = get_repository()
     
     # 카테고리별로 상품 검색
-    for category in target_categories:
-        category_products = simple_db.get_products(category=category)
+    for category in intent.categories:
+        category_products = await repository.get_products(category=category, max_price=intent.max_price)
         results.extend(category_products)
     
-    # 키워드로 직접 검색도 추가
-    search_results = simple_db.search_products(keyword)
-    results.extend(search_results)
+    # 키워드로 직접 검색도 추가 (문장 전체가 아니라 단어 중 하나라도 일치하면 점수순으로 포함)
+    # 가격 조건으로 반영된 표현("3만원 이하", "저렴한")은 빼고 검색 ("만원"으로 "2만원권"이 걸리지 않도록 함)
+    if intent.search_text:
+        search_results = await repository.search_products(intent.search_text, limit=5)
+        results.extend(search_results)
     
     # 가격 필터링
-    max_price = None
-    if '만원' in keyword or '저렴' in keyword:
-        max_price = 30000
-    elif '천원' in keyword:
-        max_price = 10000
-    
-    if max_price:
-        results = [p for p in results if p.get('price', 0) <= max_price]
+    if intent.max_price is not None:
+        results = [p for p in results if p.get('price', 0) <= intent.max_price]
+    if intent.min_price is not None:
+        results = [p for p in results if p.get('price', 0) >= intent.min_price]
     
     # 중복 제거
     seen = set()
@@ -126,45 +258,87 @@ def get_products_by_keyword(keyword: str):
     
     return unique_results[:5]  # 최대 5개만 반환
 
+async def build_chat_reply(message: str, intent=None):
+    """
+    키워드 기반 추천 결과와 응답 본문 생성
+    (상품을 찾았는지 여부, 추천 상품 목록, 사용자 메시지를 제외한 응답 본문)을 반환
+    """
+    recommended_products = await get_products_by_keyword(message, intent)
+    
+    if recommended_products:
+        category_names = {
+            'food': '식음료',
+            'health': '건강',
+            'life': '생활',
+            'education': '교육',
+            'shopping': '쇼핑'
+        }
+        
+        reply_body = f"총 {len(recommended_products)}개의 상품을 추천드립니다:\n"
+        
+        for i, product in enumerate(recommended_products, 1):
+            category_kr = category_names.get(product['category'], product['category'])
+            reply_body += f"{i}. {product['name']} ({category_kr}) - {product['price']:,}원 (평점: ⭐{product['rating']})\n"
+        
+        reply_body += "\n더 구체적인 조건이 있으시면 말씀해주세요!"
+        return True, recommended_products, reply_body
+    
+    reply_body = "다음과 같은 키워드로 다시 시도해보세요:\n"
+    reply_body += "• 식사, 커피, 음식 관련\n• 건강, 운동, 헬스 관련\n• 생활, 넷플릭스, 할인 관련\n• 교육, 강의 관련"
+    return False, (await get_repository().get_products())[:3], reply_body  # 기본 추천
+
+async def cached_chat_reply(message: str, intent=None):
+    """build_chat_reply 결과를 카탈로그 버전별로 캐시하여 재사용 (같은 메시지는 카탈로그가 바뀌지 않았다면 다시 계산하지 않음)"""
+    catalog_version = get_repository().catalog_version
+    cached = chat_response_cache.get(message, catalog_version)
+    if cached is None:
+        cached = await build_chat_reply(message, intent)
+        chat_response_cache.set(message, catalog_version, cached)
+    return cached
+
 # 채팅 엔드포인트
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
     AI 에이전트와의 채팅 인터페이스
-    현재는 키워드 기반 간단한 추천 시스템으로 구현
+    단순한 카테고리/가격 질문은 키워드 기반 추천으로 바로 답하고, 애매한 요청만 에이전트가 처리
     """
     try:
-        message = request.message.lower()
+        start_time = time.perf_counter()
         
         # 요청 로깅
         log_api_request("POST", "/api/chat", request.user_id, {"message": request.message})
         
-        # 키워드 기반 상품 추천
-        recommended_products = get_products_by_keyword(message)
+        message = normalize_message(request.message)
+        decision = chat_router.route(message)
+        path = decision.path
+        chat_agent = await load_chat_agent() if path == AGENT else None
+        if path == AGENT and chat_agent is None:
+            chat_router.record_agent_unavailable()
+            path = CATALOG
         
-        if recommended_products:
-            categories = list(set(p['category'] for p in recommended_products))
-            category_names = {
-                'food': '식음료',
-                'health': '건강',
-                'life': '생활',
-                'education': '교육',
-                'shopping': '쇼핑'
-            }
+        if path == CATALOG:
+            found, recommended_products, reply_body = await cached_chat_reply(message, decision.intent)
             
-            response_text = f"'{request.message}'에 대한 추천 상품을 찾았어요! 🎉\n\n"
-            response_text += f"총 {len(recommended_products)}개의 상품을 추천드립니다:\n"
-            
-            for i, product in enumerate(recommended_products, 1):
-                category_kr = category_names.get(product['category'], product['category'])
-                response_text += f"{i}. {product['name']} ({category_kr}) - {product['price']:,}원 (평점: ⭐{product['rating']})\n"
-            
-            response_text += "\n더 구체적인 조건이 있으시면 말씀해주세요!"
+            # 카탈로그에서 찾지 못하면 에이전트에게 넘김
+            if not found:
+                chat_agent = await load_chat_agent()
+                if chat_agent:
+                    chat_router.record_catalog_miss()
+                    path = AGENT
+        
+        if path == AGENT:
+            response_text, agent_products = await chat_agent.chat_with_products(request.message, request.user_id)
+            recommended_products = agent_products
+            if not recommended_products:
+                # 도구가 상품을 찾지 않은 답변은 카탈로그 추천 결과를 함께 보여줌 (카탈로그에서 먼저 찾아봤다면 캐시 재사용)
+                _, recommended_products, _ = await cached_chat_reply(message, decision.intent)
+        elif found:
+            response_text = f"'{request.message}'에 대한 추천 상품을 찾았어요! 🎉\n\n" + reply_body
         else:
-            response_text = f"'{request.message}'에 대한 상품을 찾지 못했어요. 😅\n\n"
-            response_text += "다음과 같은 키워드로 다시 시도해보세요:\n"
-            response_text += "• 식사, 커피, 음식 관련\n• 건강, 운동, 헬스 관련\n• 생활, 넷플릭스, 할인 관련\n• 교육, 강의 관련"
-            recommended_products = simple_db.get_products()[:3]  # 기본 추천
+            response_text = f"'{request.message}'에 대한 상품을 찾지 못했어요. 😅\n\n" + reply_body
+        
+        chat_router.record(path, time.perf_counter() - start_time)
         
         # 채팅 상호작용 로깅
         log_chat_interaction(
@@ -187,19 +361,155 @@ async def chat(request: ChatRequest):
         })
         raise HTTPException(status_code=500, detail=f"채팅 처리 중 오류가 발생했습니다: {str(e)}")
 
+# LangChain 패키지를 불러오지 못한 경우 매 요청마다 다시 시도하지 않음
+_agent_import_failed = False
+
+def create_chat_agent():
+    """LangChain import와 에이전트 생성 (이벤트 루프를 막으므로 스레드에서 호출)"""
+    global _agent_import_failed
+    if _agent_import_failed:
+        return None
+    try:
+        from agent.agent import get_agent
+    except ImportError as e:
+        _agent_import_failed = True
+        log_error("AGENT_IMPORT_ERROR", str(e))
+        return None
+    chat_agent = get_agent()
+    return chat_agent if chat_agent.agent else None
+
+async def load_chat_agent():
+    """
+    LangChain 에이전트 반환 (패키지나 API 키가 없어 사용할 수 없으면 None)
+    이미 만들어졌으면 바로 반환하고, 아니면 import/생성을 스레드에서 실행 (백그라운드 준비가 끝나지 않은 경우)
+    """
+    if _agent_import_failed:
+        return None
+    agent_module = sys.modules.get("agent.agent")
+    if agent_module and agent_module.agent_instance is not None:
+        chat_agent = agent_module.agent_instance
+        return chat_agent if chat_agent.agent else None
+    return await asyncio.to_thread(create_chat_agent)
+
+async def keyword_reply_events(message: str, intent=None):
+    """키워드 기반 응답을 에이전트 스트림과 같은 이벤트 형식으로 생성"""
+    _, products, reply_body = await build_chat_reply(normalize_message(message), intent)
+    yield {"event": "token", "data": {"token": reply_body}}
+    yield {"event": "done", "data": {"response": reply_body, "products": products}}
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+
+# 채팅 스트리밍 엔드포인트 (Server-Sent Events)
+@app.post("/api/chat/stream")
+async def chat_stream(request: Request, chat_request: ChatRequest):
+    """
+    에이전트 응답을 token/tool_start/tool_end/done 이벤트로 스트리밍
+    첫 이벤트까지의 시간(TTFB)과 전체 시간을 따로 기록하고, 클라이언트가 연결을 끊으면 에이전트 실행을 취소
+    """
+    start_time = time.perf_counter()
+    log_api_request("POST", "/api/chat/stream", chat_request.user_id, {"message": chat_request.message})
+    
+    # /api/chat과 같은 라우팅 (확신도가 높으면 카탈로그 응답을 바로 스트리밍)
+    decision = chat_router.route(normalize_message(chat_request.message))
+    chat_agent = await load_chat_agent() if decision.path == AGENT else None
+    if decision.path == AGENT and chat_agent is None:
+        chat_router.record_agent_unavailable()
+    path = AGENT if chat_agent else CATALOG
+    source = (
+        chat_agent.stream_chat(chat_request.message, chat_request.user_id)
+        if chat_agent else keyword_reply_events(chat_request.message, decision.intent)
+    )
+    
+    async def event_stream():
+        first_event_at = None
+        status = "completed"
+        try:
+            async for event in source:
+                if await request.is_disconnected():
+                    status = "disconnected"
+                    break
+                now = time.perf_counter()
+                if first_event_at is None:
+                    first_event_at = now
+                if event["event"] == "done":
+                    event["data"]["ttfb_ms"] = round((first_event_at - start_time) * 1000, 1)
+                    event["data"]["total_ms"] = round((now - start_time) * 1000, 1)
+                elif event["event"] == "error":
+                    status = "error"
+                yield format_sse(event)
+        except (asyncio.CancelledError, GeneratorExit):
+            # 클라이언트가 연결을 끊어 응답 작업이 취소되었거나 스트림이 닫힘
+            status = "disconnected"
+            raise
+        except Exception as e:
+            status = "error"
+            log_error("CHAT_STREAM_ERROR", str(e), {"user_id": chat_request.user_id, "path": path})
+            yield format_sse({"event": "error", "data": {"message": "응답 생성 중 오류가 발생했습니다"}})
+        finally:
+            # 에이전트 스트림을 닫아 실행 중인 작업 취소
+            await source.aclose()
+            chat_router.record(path, time.perf_counter() - start_time)
+            log_system_event("CHAT_STREAM", {
+                "user_id": chat_request.user_id,
+                "path": path,
+                "confidence": decision.confidence,
+                "status": status,
+                "ttfb_ms": round((first_event_at - start_time) * 1000, 1) if first_event_at else None,
+                "total_ms": round((time.perf_counter() - start_time) * 1000, 1)
+            })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# 채팅 라우터 통계
+@app.get("/api/chat/router/stats")
+async def get_chat_router_stats():
+    """경로별(카탈로그/에이전트) 요청 수와 평균 처리 시간"""
+    return chat_router.stats()
+
+# 채팅 응답 캐시 통계
+@app.get("/api/chat/cache/stats")
+async def get_chat_cache_stats():
+    """채팅 응답 캐시 적중/미스 통계"""
+    return {**chat_response_cache.stats(), "catalog_version": get_repository().catalog_version}
+
+# DB 읽기 캐시 통계
+@app.get("/api/db/cache/stats")
+async def get_db_cache_stats():
+    """상품/사용자 선호도 읽기 캐시 통계 (동시 미스 병합 횟수 포함)"""
+    return db.cache_stats()
+
 # 상품 목록 조회
 @app.get("/api/products")
 async def get_products():
     """전체 상품 목록 조회"""
-    products = simple_db.get_products()
+    products = await get_repository().get_products()
     return {"products": products}
 
+# 인기 상품 조회
+@app.get("/api/products/trending")
+async def get_trending_products(limit: int = 5, category: Optional[str] = None):
+    """시간 감쇠 인기 상품 (전체 또는 카테고리별)"""
+    products = await get_recommendation_engine().get_trending_products(limit, category)
+    return {"category": category, "products": products}
+
+# 유사 상품 조회
+@app.get("/api/products/{product_id}/similar")
+async def get_similar_products(product_id: str, limit: int = 3):
+    """상품 카드의 유사 상품 위젯용 조회"""
+    products = await get_recommendation_engine().get_similar_products(product_id, limit)
+    return {"product_id": product_id, "products": products}
+
 # 새 상품 추가 엔드포인트
 @app.post("/api/products")
 async def add_product(product: dict):
     """새 상품 추가"""
     try:
-        simple_db.add_product(product)
+        await get_repository().add_products([product])
         
         # 상품 추가 로깅
         log_system_event("PRODUCT_ADDED", {
@@ -214,6 +524,150 @@ async def add_product(product: dict):
         log_error("PRODUCT_ADD_ERROR", str(e), {"product": product})
         raise HTTPException(status_code=500, detail=f"상품 추가 중 오류: {str(e)}")
 
+# 상품 대량 등록 엔드포인트
+@app.post("/api/products/bulk")
+async def bulk_add_products(request: Request, batch_size: int = 1000):
+    """
+    NDJSON(application/x-ndjson) 또는 CSV(text/csv) 스트림으로 상품 대량 등록
+    행별 검증 오류와 처리량 통계를 반환
+    """
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size는 1 이상이어야 합니다")
+    
+    content_type = request.headers.get("content-type", "")
+    source_format = "csv" if "csv" in content_type else "ndjson"
+    row_reader = iter_csv_rows if source_format == "csv" else iter_ndjson_rows
+    
+    try:
+        stats = await import_products(row_reader(request.stream()), get_repository(), batch_size)
+    except Exception as e:
+        log_error("PRODUCT_BULK_ADD_ERROR", str(e), {"format": source_format})
+        raise HTTPException(status_code=500, detail=f"상품 대량 등록 중 오류: {str(e)}")
+    
+    log_system_event("PRODUCTS_BULK_ADDED", {
+        "format": source_format,
+        "received": stats["received"],
+        "imported": stats["imported"],
+        "failed": stats["failed"],
+        "elapsed_seconds": stats["elapsed_seconds"]
+    })
+    
+    return {"format": source_format, **stats}
+
+# 상호작용 이벤트 수집 엔드포인트
+@app.post("/api/events", status_code=202)
+async def ingest_events(request: Request):
+    """
+    조회/좋아요/구매 이벤트 수집 (단일 이벤트 또는 {"events": [...]})
+    큐가 가득 차면 503과 Retry-After로 재시도를 요청
+    """
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON 형식이 올바르지 않습니다")
+    
+    raw_events = payload.get("events") if isinstance(payload, dict) and "events" in payload else payload
+    if not isinstance(raw_events, list):
+        raw_events = [raw_events]
+    
+    events, errors = [], []
+    for index, raw in enumerate(raw_events):
+        try:
+            events.append(validate_event(raw))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+    
+    try:
+        accepted = await event_pipeline.publish(events)
+    except EventQueueFull as e:
+        log_error("EVENT_QUEUE_FULL", str(e), {"received": len(raw_events), "accepted": e.accepted})
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "1"},
+            content={"detail": str(e), "accepted": e.accepted, "rejected": len(events) - e.accepted, "errors": errors}
+        )
+    
+    return {"accepted": accepted, "failed": len(errors), "errors": errors}
+
+@app.get("/api/events/stats")
+async def get_event_stats():
+    """이벤트 파이프라인 통계 (큐 길이, 기록 건수, 기록 지연 시간)"""
+    return event_pipeline.stats()
+
+# 개인 맞춤 추천 조회 (미리 계산된 결과 재사용)
+@app.get("/api/recommendations/{user_id}")
+async def get_user_recommendations(user_id: str, limit: int = 5):
+    """사용자별 개인 맞춤 추천"""
+    products = await recommendation_store.get_or_compute(user_id, limit)
+    return {"user_id": user_id, "products": products}
+
+@app.get("/api/recommendations/store/stats")
+async def get_recommendation_store_stats():
+    """추천 저장소 통계"""
+    return recommendation_store.stats()
+
+# 일괄 추천 파일 저장 시 한 번에 기록할 줄 수
+EXPORT_WRITE_LINES = 1000
+
+# 여러 사용자 일괄 추천 엔드포인트
+@app.post("/api/recommendations/batch")
+async def batch_recommendations(request: BatchRecommendationRequest):
+    """
+    여러 사용자의 개인 맞춤 추천을 한 번에 계산
+    output_file이 없으면 NDJSON으로 스트리밍하고, 있으면 RECOMMENDATION_EXPORT_DIR 아래 파일로 저장 후 통계 반환
+    """
+    engine = get_recommendation_engine()
+    results = engine.iter_batch_recommendations(request.user_ids, limit=request.limit)
+    
+    if not request.output_file:
+        async def stream_results():
+            async for user_id, products in results:
+                yield json.dumps({"user_id": user_id, "products": products}, ensure_ascii=False) + "\n"
+        
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+    
+    # 경로는 버리고 파일 이름만 사용 ("dir/"처럼 이름이 없으면 거부)
+    filename = os.path.basename(request.output_file)
+    if filename in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="output_file에 파일 이름이 필요합니다")
+    export_dir = os.getenv("RECOMMENDATION_EXPORT_DIR", "exports")
+    output_path = os.path.join(export_dir, filename)
+    
+    start_time = time.time()
+    users_written = 0
+    try:
+        # 파일 쓰기는 스레드에서 실행하고, 줄을 모아 EXPORT_WRITE_LINES줄마다 한 번에 기록
+        await asyncio.to_thread(os.makedirs, export_dir, exist_ok=True)
+        f = await asyncio.to_thread(open, output_path, 'w', encoding='utf-8')
+        try:
+            lines = []
+            async for user_id, products in results:
+                lines.append(json.dumps({"user_id": user_id, "products": products}, ensure_ascii=False) + "\n")
+                users_written += 1
+                if len(lines) >= EXPORT_WRITE_LINES:
+                    await asyncio.to_thread(f.write, "".join(lines))
+                    lines.clear()
+            if lines:
+                await asyncio.to_thread(f.write, "".join(lines))
+        finally:
+            await asyncio.to_thread(f.close)
+    except Exception as e:
+        log_error("BATCH_RECOMMENDATION_ERROR", str(e), {"output_file": output_path})
+        raise HTTPException(status_code=500, detail=f"일괄 추천 생성 중 오류: {str(e)}")
+    
+    elapsed = time.time() - start_time
+    log_system_event("BATCH_RECOMMENDATIONS_EXPORTED", {
+        "output_file": output_path,
+        "users": users_written,
+        "elapsed_seconds": round(elapsed, 4)
+    })
+    
+    return {
+        "output_file": output_path,
+        "users": users_written,
+        "elapsed_seconds": round(elapsed, 4)
+    }
+
 # 로그 관리 API들
 @app.get("/api/logs")
 async def get_logs():
@@ -221,14 +675,29 @@ async def get_logs():
     files = get_log_files()
     return {"log_files": files}
 
+@app.get("/api/logs/pipeline/stats")
+async def get_log_pipeline_stats():
+    """비동기 로깅 큐 크기, 배치 크기, 버린 레코드 수 (로거별)"""
+    return log_pipeline_stats()
+
 @app.get("/api/logs/{filename}")
-async def get_log_content(filename: str, lines: int = 100):
-    """특정 로그 파일 내용 조회"""
+async def get_log_content(filename: str, lines: int = 100, structured: bool = False, rotated: bool = True):
+    """
+    특정 로그 파일 내용 조회 (structured=true면 줄 대신 파싱한 레코드 반환)
+    rotated=true면 롤오버된 파일까지 이어서 마지막 N줄을 읽음
+    """
     if not filename.endswith('.log'):
         filename += '.log'
     
-    content = read_log_file(filename, lines)
     stats = get_log_stats(filename)
+    if structured:
+        return {
+            "filename": filename,
+            "records": read_log_records(filename, lines, rotated),
+            "stats": stats
+        }
+    
+    content = read_log_file(filename, lines, rotated)
     
     return {
         "filename": filename,
@@ -236,18 +705,57 @@ async def get_log_content(filename: str, lines: int = 100):
         "stats": stats
     }
 
+@app.get("/api/logs/{filename}/follow")
+async def follow_log(filename: str, lines: int = 10):
+    """마지막 N줄과 이후 새로 쓰이는 줄을 line 이벤트(Server-Sent Events)로 계속 전송"""
+    if not filename.endswith('.log'):
+        filename += '.log'
+    
+    async def event_stream():
+        async for line in follow_log_file(filename, lines):
+            yield format_sse({"event": "line", "data": {"line": line}})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/logs/{filename}/search")
-async def search_log(filename: str, keyword: str, lines: int = 50):
-    """로그에서 키워드 검색"""
+async def search_log(
+    filename: str,
+    keyword: str = "",
+    lines: int = 50,
+    page: int = 1,
+    level: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    mode: str = "and"
+):
+    """
+    로그에서 키워드 검색 (롤오버된 파일 포함, 최근 줄부터 페이지당 lines개)
+    여러 단어는 mode=and면 모두, or면 하나 이상 포함된 줄을 찾고, level과 since/until(ISO 8601)로 범위를 좁힘
+    """
     if not filename.endswith('.log'):
         filename += '.log'
+    if mode not in ("and", "or"):
+        raise HTTPException(status_code=400, detail="mode는 and 또는 or만 가능합니다")
     
-    results = search_logs(filename, keyword, lines)
+    # 색인 갱신(새로 쓰인 부분만)과 조회는 스레드에서 실행
+    try:
+        found = await asyncio.to_thread(
+            get_log_index().search, filename, keyword, level, since, until, mode, page, lines
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
         "filename": filename,
         "keyword": keyword,
-        "results": results,
-        "count": len(results)
+        "results": found["results"],
+        "count": len(found["results"]),
+        "total": found["total"],
+        "page": found["page"],
+        "page_size": found["page_size"]
     }
 
 @app.get("/api/logs/chat/interactions")
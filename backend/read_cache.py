@@ -0,0 +1,105 @@
+"""
+읽기 캐시 (read-through)
+조회 함수 앞에 두는 LRU + TTL 캐시, 같은 키의 동시 미스는 백엔드 조회 한 번으로 합침 (single-flight)
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class ReadThroughCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # 진행 중인 조회 (키 -> 조회 작업), 무효화되면 목록에서 빠져 결과를 저장하지 않음
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # 무효화는 SimpleDB 쓰기 스레드에서도 호출되므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """
+        캐시 조회, 없거나 만료되었으면 loader로 읽어 저장
+        같은 키를 이미 읽는 중이면 그 결과를 함께 기다림 (loader 오류는 저장하지 않고 대기자 모두에게 전달)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expired += 1
+
+            task = self._inflight.get(key)
+            if task is not None:
+                self.collapsed += 1
+            else:
+                self.misses += 1
+                task = asyncio.get_running_loop().create_task(self._load(key, loader, ttl))
+                self._inflight[key] = task
+
+        # 먼저 요청한 쪽이 취소되어도 나머지 대기자를 위해 조회는 계속 진행
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+        except BaseException:
+            with self._lock:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+            raise
+
+        with self._lock:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+                self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self, key: Hashable):
+        """키 하나 무효화 (진행 중인 조회 결과도 저장하지 않음)"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self):
+        """전체 무효화"""
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.collapsed
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "collapsed": self.collapsed,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.collapsed) / lookups, 4) if lookups else 0.0
+            }
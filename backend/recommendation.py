@@ -3,12 +3,154 @@
 사용자 선호도와 상품 데이터를 기반으로 개인 맞춤 추천을 제공
 """
 
-import random
-from typing import List, Dict, Optional
-from db import get_products, get_user_preferences
+import asyncio
+import hashlib
+from collections import Counter, deque
+from datetime import datetime, timezone
+import os
+import threading
+import time
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+
+import numpy as np
+
+from events import event_timestamp
+from repository import get_repository
+from similarity import SimilarityIndex
+from trending import TrendingLeaderboard
+
+
+def _hash64(text: str) -> int:
+    """문자열의 안정적인 64비트 해시 (프로세스 재시작과 무관)"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """splitmix64 최종 혼합 함수 (uint64 배열)"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def diversity_terms(user_hashes: np.ndarray, product_hashes: np.ndarray) -> np.ndarray:
+    """
+    (사용자, 상품) 쌍마다 [-5, 5) 범위의 결정적 다양성 점수
+    같은 시드/사용자/상품이면 항상 같은 값이므로 캐시된 추천도 재현 가능
+    """
+    mixed = _mix64(user_hashes ^ product_hashes)
+    return (mixed >> np.uint64(11)).astype(np.float64) * (10.0 / 2 ** 53) - 5.0
+
+
+class ProductColumns:
+    """
+    추천 점수 계산용 열 지향(columnar) 상품 데이터
+    평점/가격/카테고리 코드를 NumPy 배열로 보관하고, 상품 dict는 최종 선택된 행만 꺼내 씀
+    """
+
+    def __init__(self, products: List[Dict]):
+        self.products = products
+        self.category_codes_by_name: Dict[str, int] = {}
+        # 상품 ID -> 행 번호 (with_products로 만든 열 데이터끼리 공유, 행은 추가만 되므로 이전 객체에도 영향 없음)
+        self.rows: Dict[str, int] = {}
+        
+        codes = []
+        for row, product in enumerate(products):
+            category = product.get('category', '')
+            code = self.category_codes_by_name.setdefault(category, len(self.category_codes_by_name))
+            codes.append(code)
+            self.rows[str(product.get('id', ''))] = row
+        
+        self.ratings = np.fromiter((p.get('rating') or 0 for p in products), dtype=np.float64, count=len(products))
+        self.prices = np.fromiter((p.get('price') or 0 for p in products), dtype=np.float64, count=len(products))
+        self.category_codes = np.array(codes, dtype=np.int32)
+        self.product_hashes = np.fromiter(
+            (_hash64(str(p.get('id', ''))) for p in products), dtype=np.uint64, count=len(products)
+        )
+        self.base_scores: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def with_products(self, products: List[Dict]) -> "ProductColumns":
+        """
+        상품을 추가(새 ID)하거나 교체(기존 ID)한 새 열 데이터
+        배열은 복사 후 해당 행만 채우므로 이 객체로 계산 중인 요청에는 영향 없음 (base_scores는 호출한 쪽에서 다시 계산)
+        같은 열 데이터에서 여러 번 만들면 rows가 엉키므로 항상 가장 최근 객체에서 한 번씩만 호출
+        """
+        columns = ProductColumns.__new__(ProductColumns)
+        columns.products = list(self.products)
+        columns.category_codes_by_name = dict(self.category_codes_by_name)
+        columns.rows = self.rows
+        
+        changed = []
+        for product in products:
+            product_id = str(product.get('id', ''))
+            row = columns.rows.get(product_id)
+            if row is None:
+                row = columns.rows[product_id] = len(columns.products)
+                columns.products.append(product)
+            else:
+                columns.products[row] = product
+            changed.append((row, product))
+        
+        size = len(columns.products)
+        columns.ratings = np.resize(self.ratings, size)
+        columns.prices = np.resize(self.prices, size)
+        columns.category_codes = np.resize(self.category_codes, size)
+        columns.product_hashes = np.resize(self.product_hashes, size)
+        for row, product in changed:
+            category = product.get('category', '')
+            columns.category_codes[row] = columns.category_codes_by_name.setdefault(
+                category, len(columns.category_codes_by_name)
+            )
+            columns.ratings[row] = product.get('rating') or 0
+            columns.prices[row] = product.get('price') or 0
+            columns.product_hashes[row] = _hash64(str(product.get('id', '')))
+        columns.base_scores = None
+        return columns
+
+    def category_code(self, category: str) -> Optional[int]:
+        return self.category_codes_by_name.get(category)
+
+    def filter_mask(self, category: Optional[str] = None, max_price: Optional[int] = None) -> Optional[np.ndarray]:
+        """카테고리/가격 조건에 맞는 행 마스크 (조건이 없으면 None)"""
+        mask = None
+        if category:
+            code = self.category_code(category)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask = self.category_codes == code
+        if max_price:
+            price_mask = self.prices <= max_price
+            mask = price_mask if mask is None else mask & price_mask
+        return mask
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개 인덱스를 내림차순으로 반환 (전체 정렬 대신 부분 선택)"""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+def _event_key(event: Dict, timestamp: Optional[float]) -> Tuple:
+    """같은 상호작용 이벤트인지 비교하는 키 (저장소마다 시각 표기가 달라도 같은 시각이면 같은 키)"""
+    return (
+        event.get('user_id'),
+        event.get('product_id'),
+        event.get('interaction_type'),
+        round(timestamp, 6) if timestamp is not None else None
+    )
 
 class RecommendationEngine:
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        # 다양성 점수 시드 (같은 시드면 같은 추천 결과)
+        self.seed = int(os.getenv("RECOMMENDATION_SEED", "0")) if seed is None else seed
         self.category_weights = {
             'food': 1.2,
             'health': 1.1,
@@ -16,6 +158,255 @@ class RecommendationEngine:
             'shopping': 0.9,
             'education': 0.8
         }
+        # 열 지향 카탈로그 캐시 (catalog_ttl초마다 또는 invalidate_catalog 호출 시 다시 적재)
+        # 추가된 상품은 모아 두었다가 다음 조회 때 해당 행만 붙이거나 교체
+        self.catalog_ttl = float(os.getenv("RECOMMENDATION_CATALOG_TTL", "60"))
+        self._columns: Optional[ProductColumns] = None
+        self._columns_loaded_at = 0.0
+        self._columns_lock = asyncio.Lock()
+        self._columns_pending: List[Dict] = []
+        self._columns_pending_lock = threading.Lock()
+        # 상품별 유사 상품 인덱스 (서버 준비 단계에서 구축, 추가된 상품은 모아 두었다가 다음 조회 때 스레드에서 반영)
+        self.similarity_k = int(os.getenv("SIMILARITY_TOP_K", "10"))
+        self._similarity: Optional[SimilarityIndex] = None
+        self._similarity_lock = asyncio.Lock()
+        # 인덱스가 없고 구축 중도 아니면 None (반영할 인덱스가 없으므로 모으지 않음)
+        self._similarity_pending: Optional[List[Dict]] = None
+        self._similarity_pending_lock = threading.Lock()
+        # 시간 감쇠 인기 상품 리더보드 (서버 준비 단계에서 구축, 이후 상품/상호작용 이벤트로 증분 갱신)
+        self.trending_half_life = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24")) * 3600
+        self._trending: Optional[TrendingLeaderboard] = None
+        self._trending_lock = asyncio.Lock()
+        # 리더보드가 만들어지기 전에 기록된 상호작용 이벤트 (구축 후 반영, 가장 오래된 것부터 버림)
+        self._trending_pending_events: deque = deque(maxlen=int(os.getenv("TRENDING_PENDING_EVENTS", "100000")))
+        # 구축 중에 추가된 상품 (구축 중이 아니면 None)
+        self._trending_pending_products: Optional[List[Dict]] = None
+        self._trending_pending_lock = threading.Lock()
+    
+    def _user_hash(self, user_id: str) -> np.uint64:
+        return np.uint64(_hash64(f"{self.seed}:{user_id}"))
+    
+    def invalidate_catalog(self):
+        """캐시된 카탈로그 열 데이터 폐기 (다음 조회 때 전체 다시 적재)"""
+        self._columns = None
+    
+    def on_product_added(self, product: Dict):
+        """
+        상품 추가 알림 (인기 상품 리더보드 갱신)
+        저장소 쓰기 스레드에서 호출되므로 열 데이터와 유사 상품 인덱스 갱신은 미루고 상품만 기록
+        """
+        with self._columns_pending_lock:
+            self._columns_pending.append(product)
+        with self._trending_pending_lock:
+            if self._trending is None:
+                if self._trending_pending_products is not None:
+                    self._trending_pending_products.append(product)
+            else:
+                self._trending.add_product(product)
+        with self._similarity_pending_lock:
+            if self._similarity_pending is not None:
+                self._similarity_pending.append(product)
+    
+    def _take_similarity_pending(self) -> List[Dict]:
+        with self._similarity_pending_lock:
+            pending, self._similarity_pending = self._similarity_pending or [], []
+        return pending
+    
+    async def _get_similarity_index(self) -> SimilarityIndex:
+        """
+        유사 상품 인덱스 반환
+        없으면 전체 상품으로 구축하고, 그 뒤로 추가된 상품은 조회할 때 한꺼번에 반영 (모두 스레드에서 실행)
+        """
+        if self._similarity is not None and not self._similarity_pending:
+            return self._similarity
+        
+        async with self._similarity_lock:
+            if self._similarity is None:
+                # 구축 중에 추가된 상품도 모아 두었다가 아래에서 반영 (이미 있는 상품은 add가 무시)
+                with self._similarity_pending_lock:
+                    self._similarity_pending = []
+                products = await get_repository().get_products()
+                self._similarity = await asyncio.to_thread(SimilarityIndex.build, products, self.similarity_k)
+            pending = self._take_similarity_pending()
+            if pending:
+                await asyncio.to_thread(self._similarity.add_all, pending)
+        return self._similarity
+    
+    def record_interactions(self, events: List[Dict]):
+        """
+        기록된 상호작용 이벤트(user_interactions 행)를 인기 상품 리더보드에 반영
+        리더보드가 아직 없으면 모아 두었다가 구축이 끝날 때 반영
+        """
+        with self._trending_pending_lock:
+            if self._trending is None:
+                self._trending_pending_events.extend(events)
+                return
+        for event in events:
+            self._trending.record_interaction(
+                event['product_id'], event['interaction_type'], event_timestamp(event.get('created_at'))
+            )
+    
+    def _build_trending(self, products: List[Dict], interactions: List[Dict]) -> Tuple[TrendingLeaderboard, Counter]:
+        """전체 상품과 저장된 상호작용으로 리더보드 구축 (스레드에서 실행), 반영한 이벤트 키 개수도 반환"""
+        leaderboard = TrendingLeaderboard.build(products, half_life=self.trending_half_life)
+        stored = Counter()
+        for interaction in interactions:
+            timestamp = event_timestamp(interaction.get('created_at'))
+            leaderboard.record_interaction(interaction.get('product_id'), interaction.get('interaction_type'), timestamp)
+            stored[_event_key(interaction, timestamp)] += 1
+        return leaderboard, stored
+    
+    async def _get_trending(self) -> TrendingLeaderboard:
+        """
+        인기 상품 리더보드 반환 (없으면 전체 상품과 최근 상호작용으로 구축, 정렬은 스레드에서)
+        반감기의 10배보다 오래된 상호작용은 기여도가 0.1% 미만이므로 읽지 않음
+        """
+        if self._trending is not None:
+            return self._trending
+        
+        async with self._trending_lock:
+            if self._trending is not None:
+                return self._trending
+            
+            with self._trending_pending_lock:
+                self._trending_pending_products = []
+            try:
+                repository = get_repository()
+                since = datetime.fromtimestamp(time.time() - self.trending_half_life * 10, tz=timezone.utc)
+                products, interactions = await asyncio.gather(
+                    repository.get_products(),
+                    repository.get_interactions(since.isoformat())
+                )
+                leaderboard, stored = await asyncio.to_thread(self._build_trending, products, interactions)
+                
+                with self._trending_pending_lock:
+                    # 구축 중에 추가된 상품과 구축 전에 모아 둔 이벤트 반영 (저장소에서 이미 읽은 이벤트는 건너뜀)
+                    leaderboard.add_products(self._trending_pending_products)
+                    for event in self._trending_pending_events:
+                        timestamp = event_timestamp(event.get('created_at'))
+                        key = _event_key(event, timestamp)
+                        if stored[key]:
+                            stored[key] -= 1
+                            continue
+                        leaderboard.record_interaction(event['product_id'], event['interaction_type'], timestamp)
+                    self._trending_pending_events.clear()
+                    self._trending = leaderboard
+            finally:
+                with self._trending_pending_lock:
+                    self._trending_pending_products = None
+        return self._trending
+    
+    async def warm_up(self):
+        """요청 전에 인기 상품 리더보드와 유사 상품 인덱스를 미리 구축 (서버 준비 단계에서 호출)"""
+        await self._get_trending()
+        await self._get_similarity_index()
+    
+    def _take_columns_pending(self) -> List[Dict]:
+        with self._columns_pending_lock:
+            pending, self._columns_pending = self._columns_pending, []
+        return pending
+    
+    def _columns_fresh(self) -> bool:
+        return (
+            self._columns is not None
+            and time.monotonic() - self._columns_loaded_at <= self.catalog_ttl
+            and not self._columns_pending
+        )
+    
+    async def _get_columns(self) -> ProductColumns:
+        """
+        전체 상품을 열 지향 구조로 적재 (캐시 재사용)
+        동시 요청은 잠금으로 한 번만 적재하고, 적재는 스레드에서 실행.
+        그 뒤로 추가된 상품은 해당 행만 붙이거나 교체
+        """
+        if self._columns_fresh():
+            return self._columns
+        
+        async with self._columns_lock:
+            if self._columns is None or time.monotonic() - self._columns_loaded_at > self.catalog_ttl:
+                # 적재 중에 추가된 상품은 결과에 이미 있을 수 있으나 ID로 교체되므로 중복되지 않음
+                self._take_columns_pending()
+                products = await get_repository().get_products()
+                columns = await asyncio.to_thread(ProductColumns, products)
+                columns.base_scores = self._base_scores(columns)
+                self._columns = columns
+                self._columns_loaded_at = time.monotonic()
+            pending = self._take_columns_pending()
+            if pending:
+                columns = self._columns.with_products(pending)
+                columns.base_scores = self._base_scores(columns)
+                self._columns = columns
+        return self._columns
+    
+    def _base_scores(self, columns: ProductColumns) -> np.ndarray:
+        """
+        사용자와 무관한 점수 부분을 한 번에 계산
+        (평점 × 20 + (카테고리 가중치 - 1) × 20 + 가격 점수 max(0, 50 - 가격/1000))
+        """
+        weight_by_code = np.ones(len(columns.category_codes_by_name), dtype=np.float64)
+        for category, code in columns.category_codes_by_name.items():
+            weight_by_code[code] = self.category_weights.get(category, 1.0)
+        
+        base_score = columns.ratings * 20
+        weight_bonus = (weight_by_code[columns.category_codes] - 1.0) * 20
+        price_score = np.where(columns.prices > 0, np.maximum(0, 50 - columns.prices / 1000), 0)
+        return base_score + weight_bonus + price_score
+    
+    def product_scores(self, user_ids: List[str], preferred_categories: List[List[str]], product: Dict) -> np.ndarray:
+        """상품 하나의 사용자별 개인 맞춤 점수 (_base_scores + _score_columns와 같은 식)"""
+        category = product.get('category', '')
+        price = product.get('price') or 0
+        base = (product.get('rating') or 0) * 20
+        base += (self.category_weights.get(category, 1.0) - 1.0) * 20
+        base += max(0, 50 - price / 1000) if price > 0 else 0
+        bonus = np.array([30.0 if category in categories else 0.0 for categories in preferred_categories])
+        user_hashes = np.array([self._user_hash(user_id) for user_id in user_ids], dtype=np.uint64)
+        product_hash = np.uint64(_hash64(str(product.get('id', ''))))
+        return base + bonus + diversity_terms(user_hashes, product_hash)
+    
+    async def get_preferred_categories(self, user_ids: List[str]) -> Dict[str, List[str]]:
+        """사용자별 선호 카테고리 (선호도가 없으면 빈 목록)"""
+        users = await get_repository().get_users_preferences(user_ids)
+        return {
+            user_id: ((users.get(user_id) or {}).get('preferences') or {}).get('categories', [])
+            for user_id in user_ids
+        }
+    
+    def _score_columns(
+        self,
+        columns: ProductColumns,
+        user_id: str,
+        preferred_categories: List[str],
+        limit: int,
+        category: Optional[str] = None,
+        max_price: Optional[int] = None
+    ) -> List[Dict]:
+        """벡터화된 점수 계산 + 상위 limit개 부분 선택, 선택된 행만 dict로 생성"""
+        rows = None
+        mask = columns.filter_mask(category, max_price)
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+        
+        base = columns.base_scores if rows is None else columns.base_scores[rows]
+        codes = columns.category_codes if rows is None else columns.category_codes[rows]
+        product_hashes = columns.product_hashes if rows is None else columns.product_hashes[rows]
+        
+        # 카테고리 코드별 선호 보너스 테이블로 조회
+        bonus_by_code = np.zeros(len(columns.category_codes_by_name), dtype=np.float64)
+        for preferred in preferred_categories:
+            code = columns.category_code(preferred)
+            if code is not None:
+                bonus_by_code[code] = 30.0
+        category_bonus = bonus_by_code[codes]
+        # 다양성 점수 (사용자/상품별로 결정적)
+        scores = base + category_bonus + diversity_terms(self._user_hash(user_id), product_hashes)
+        
+        winners = top_k_indices(scores, limit)
+        selected = winners if rows is None else rows[winners]
+        return [
+            {**columns.products[row], 'recommendation_score': round(float(scores[i]), 2)}
+            for i, row in zip(winners, selected)
+        ]
     
     async def get_personalized_recommendations(
         self, 
@@ -28,117 +419,157 @@ class RecommendationEngine:
         개인 맞춤 상품 추천
         """
         try:
-            # 사용자 선호도 조회
-            user_prefs = await get_user_preferences(user_id)
+            # 사용자 선호도와 열 지향 카탈로그를 동시에 조회
+            user_prefs, columns = await asyncio.gather(
+                get_repository().get_user_preferences(user_id),
+                self._get_columns()
+            )
             preferred_categories = []
             
             if user_prefs and user_prefs.get('preferences'):
                 preferred_categories = user_prefs['preferences'].get('categories', [])
             
-            # 상품 목록 조회
-            products = await get_products(category=category, max_price=max_price)
-            
-            # 추천 점수 계산
-            scored_products = []
-            for product in products:
-                score = self._calculate_recommendation_score(
-                    product, 
-                    preferred_categories
-                )
-                scored_products.append({
-                    **product,
-                    'recommendation_score': score
-                })
-            
-            # 점수 순으로 정렬
-            scored_products.sort(key=lambda x: x['recommendation_score'], reverse=True)
-            
-            # 상위 N개 반환
-            return scored_products[:limit]
+            # 한 번에 점수 계산 후 상위 N개만 선택
+            return self._score_columns(
+                columns,
+                user_id,
+                preferred_categories,
+                limit,
+                category=category,
+                max_price=max_price
+            )
             
         except Exception as e:
             print(f"추천 생성 오류: {e}")
             return []
     
-    def _calculate_recommendation_score(
-        self, 
-        product: Dict, 
-        preferred_categories: List[str]
-    ) -> float:
+    async def iter_batch_recommendations(
+        self,
+        user_ids: List[str],
+        limit: int = 5,
+        max_matrix_size: int = 4_000_000
+    ) -> AsyncIterator[Tuple[str, List[Dict]]]:
         """
-        상품의 추천 점수 계산
+        여러 사용자의 개인 맞춤 추천을 한 번에 계산하여 (사용자 ID, 추천 목록)을 계산되는 대로 반환
+        선호 카테고리 조합이 같은 사용자끼리 묶어 후보 상품을 한 번만 고르고,
+        사용자 × 후보 상품 점수 행렬을 max_matrix_size 원소 단위로 계산
         """
-        base_score = product.get('rating', 0) * 20  # 평점 기반 점수 (최대 100점)
+        user_ids = list(dict.fromkeys(user_ids))
+        users, columns = await asyncio.gather(
+            get_repository().get_users_preferences(user_ids),
+            self._get_columns()
+        )
         
-        # 카테고리 선호도 보너스
-        category_bonus = 0
-        if product.get('category') in preferred_categories:
-            category_bonus = 30
+        # 선호 카테고리 코드 조합별 사용자 그룹
+        groups: Dict[Tuple[int, ...], List[str]] = {}
+        for user_id in user_ids:
+            preferences = (users.get(user_id) or {}).get('preferences') or {}
+            codes = {columns.category_code(c) for c in preferences.get('categories', [])}
+            codes.discard(None)
+            groups.setdefault(tuple(sorted(codes)), []).append(user_id)
         
-        # 카테고리별 가중치 적용
-        category_weight = self.category_weights.get(product.get('category', ''), 1.0)
-        weight_bonus = (category_weight - 1.0) * 20
+        for codes, group_users in groups.items():
+            candidates, candidate_scores = self._batch_candidates(columns, codes, limit)
+            rows_per_chunk = max(1, max_matrix_size // max(1, len(candidates)))
+            
+            for start in range(0, len(group_users), rows_per_chunk):
+                chunk = group_users[start:start + rows_per_chunk]
+                results = await asyncio.to_thread(
+                    self._score_batch_chunk, columns, candidates, candidate_scores, chunk, limit
+                )
+                for result in results:
+                    yield result
+    
+    def _batch_candidates(
+        self,
+        columns: ProductColumns,
+        preferred_codes: Tuple[int, ...],
+        limit: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        선호 카테고리 조합에 대한 후보 상품과 (다양성 점수를 뺀) 점수
+        다양성 점수 폭이 ±5이므로 limit번째 점수보다 10점 넘게 낮은 상품은 어떤 사용자에게도 상위에 들 수 없음
+        """
+        bonus_by_code = np.zeros(len(columns.category_codes_by_name), dtype=np.float64)
+        bonus_by_code[list(preferred_codes)] = 30.0
+        scores = columns.base_scores + bonus_by_code[columns.category_codes]
         
-        # 가격 점수 (저렴할수록 높은 점수)
-        price = product.get('price', 0)
-        if price > 0:
-            price_score = max(0, 50 - (price / 1000))  # 가격이 낮을수록 높은 점수
+        if limit <= 0 or limit >= len(scores):
+            candidates = np.arange(len(scores))
         else:
-            price_score = 0
+            kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            candidates = np.flatnonzero(scores >= kth - 10)
+        return candidates, scores[candidates]
+    
+    def _score_batch_chunk(
+        self,
+        columns: ProductColumns,
+        candidates: np.ndarray,
+        candidate_scores: np.ndarray,
+        user_ids: List[str],
+        limit: int
+    ) -> List[Tuple[str, List[Dict]]]:
+        """사용자 묶음 × 후보 상품 점수 행렬에서 행별 상위 limit개 선택"""
+        user_hashes = np.array([self._user_hash(user_id) for user_id in user_ids], dtype=np.uint64)
+        matrix = candidate_scores[np.newaxis, :] + diversity_terms(
+            user_hashes[:, np.newaxis], columns.product_hashes[candidates][np.newaxis, :]
+        )
         
-        # 랜덤 요소 추가 (다양성을 위해)
-        random_bonus = random.uniform(-5, 5)
+        k = min(limit, len(candidates))
+        if k <= 0:
+            return [(user_id, []) for user_id in user_ids]
+        if k < len(candidates):
+            top = np.argpartition(-matrix, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(len(candidates)), (len(user_ids), 1))
         
-        total_score = base_score + category_bonus + weight_bonus + price_score + random_bonus
+        top_scores = np.take_along_axis(matrix, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
         
-        return round(total_score, 2)
+        return [
+            (user_id, [
+                {**columns.products[candidates[j]], 'recommendation_score': round(float(score), 2)}
+                for j, score in zip(top[row], top_scores[row])
+            ])
+            for row, user_id in enumerate(user_ids)
+        ]
     
     async def get_similar_products(self, product_id: str, limit: int = 3) -> List[Dict]:
         """
         유사 상품 추천
+        카테고리, 가격대, 평점, 상품명/설명 토큰 기반 유사도로 미리 계산한 이웃 목록에서 조회
         """
         try:
-            # 임시 구현 - 실제로는 더 정교한 유사도 계산 필요
-            products = await get_products()
-            
-            # 현재 상품 제외하고 랜덤하게 선택
-            similar_products = [p for p in products if p.get('id') != product_id]
-            random.shuffle(similar_products)
-            
-            return similar_products[:limit]
+            index = await self._get_similarity_index()
+            return index.similar(product_id, limit)
             
         except Exception as e:
             print(f"유사 상품 추천 오류: {e}")
             return []
     
-    async def get_trending_products(self, limit: int = 5) -> List[Dict]:
+    async def get_trending_products(self, limit: int = 5, category: Optional[str] = None) -> List[Dict]:
         """
-        인기 상품 추천 (평점 및 가격 기준)
+        인기 상품 추천 (평점·가격 기반 인기도 + 시간 감쇠된 상호작용 점수, 카테고리별 조회 가능)
         """
         try:
-            products = await get_products()
-            
-            # 평점과 가격을 고려한 인기도 점수 계산
-            for product in products:
-                rating = product.get('rating', 0)
-                price = product.get('price', 0)
-                
-                # 인기도 점수 = 평점 * 가중치 - 가격 페널티
-                popularity_score = rating * 20 - (price / 10000)
-                product['popularity_score'] = popularity_score
-            
-            # 인기도 순으로 정렬
-            products.sort(key=lambda x: x.get('popularity_score', 0), reverse=True)
-            
-            return products[:limit]
+            leaderboard = await self._get_trending()
+            return leaderboard.top(limit, category)
             
         except Exception as e:
             print(f"인기 상품 조회 오류: {e}")
             return []
 
-# 전역 추천 엔진 인스턴스
-recommendation_engine = RecommendationEngine()
+# 전역 추천 엔진 인스턴스 (처음 사용할 때 생성, 백그라운드 준비 스레드/저장소 쓰기 스레드와 요청이 동시에 만들지 않도록 잠금)
+recommendation_engine: Optional[RecommendationEngine] = None
+_recommendation_engine_lock = threading.Lock()
 
 def get_recommendation_engine():
     """추천 엔진 인스턴스 반환"""
+    global recommendation_engine
+    if recommendation_engine is None:
+        with _recommendation_engine_lock:
+            if recommendation_engine is None:
+                recommendation_engine = RecommendationEngine()
     return recommendation_engine 
\ No newline at end of file
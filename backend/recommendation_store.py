@@ -0,0 +1,176 @@
+"""
+사용자별 추천 결과 저장소
+RecommendationEngine으로 계산한 상위 N개 추천을 사용자별로 보관하고,
+선호도가 바뀐 사용자는 백그라운드에서 다시 계산하고, 상품이 추가되면 영향받는 사용자만 다음 조회 때 계산
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from logger_config import log_error
+
+
+class RecommendationStore:
+    def __init__(self, engine_factory: Callable, top_n: int = 20, refresh_interval: float = 5.0, ttl: float = 600.0):
+        # 추천 엔진은 처음 필요할 때 가져옴 (numpy 등 무거운 모듈을 서버 시작 후로 미룸)
+        self.engine_factory = engine_factory
+        self.top_n = top_n
+        self.refresh_interval = refresh_interval
+        # 저장된 추천의 유효 시간 (초, 다양성 점수 외 시간에 따라 바뀌는 요소도 주기적으로 반영)
+        self.ttl = ttl
+        # 사용자 ID -> (만료 시각, 추천 목록, 선호 카테고리)
+        self._entries: Dict[str, Tuple[float, List[Dict], List[str]]] = {}
+        self._pending: Set[str] = set()
+        # 계산 도중 무효화된 결과를 저장하지 않기 위한 세대 번호
+        self._catalog_generation = 0
+        self._user_generations: Dict[str, int] = {}
+        # 무효화는 SimpleDB 쓰기 스레드에서도 호출되므로 잠금으로 보호
+        self._lock = threading.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshed = 0
+
+    @property
+    def engine(self):
+        return self.engine_factory()
+
+    def get(self, user_id: str, limit: int = 5) -> Optional[List[Dict]]:
+        """저장된 추천 조회 (없거나 만료/무효화된 경우 None)"""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] <= time.monotonic():
+            with self._lock:
+                if self._entries.get(user_id) is entry:
+                    del self._entries[user_id]
+            entry = None
+        if entry is None or limit > self.top_n:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1][:limit]
+
+    async def get_or_compute(self, user_id: str, limit: int = 5) -> List[Dict]:
+        """저장된 추천을 반환하고, 없으면 계산하여 저장"""
+        cached = self.get(user_id, limit)
+        if cached is not None:
+            return cached
+
+        if limit > self.top_n:
+            return await self.engine.get_personalized_recommendations(user_id, limit=limit)
+
+        generation = self._generation(user_id)
+        recommendations, preferred = await asyncio.gather(
+            self.engine.get_personalized_recommendations(user_id, limit=self.top_n),
+            self.engine.get_preferred_categories([user_id])
+        )
+        self._store(user_id, recommendations, preferred[user_id], generation)
+        return recommendations[:limit]
+
+    def _generation(self, user_id: str):
+        with self._lock:
+            return self._catalog_generation, self._user_generations.get(user_id, 0)
+
+    def _store(self, user_id: str, recommendations: List[Dict], categories: List[str], generation) -> bool:
+        """계산을 시작한 뒤 무효화되지 않은 경우에만 저장"""
+        with self._lock:
+            if generation != (self._catalog_generation, self._user_generations.get(user_id, 0)):
+                return False
+            self._entries[user_id] = (time.monotonic() + self.ttl, recommendations, categories)
+            self._pending.discard(user_id)
+            return True
+
+    def invalidate_user(self, user_id: str):
+        """선호도가 바뀐 사용자의 추천 무효화 (백그라운드 재계산 예약)"""
+        with self._lock:
+            self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+            self._pending.add(user_id)
+
+    def invalidate_catalog(self):
+        """저장된 모든 사용자의 추천 무효화 (재계산은 다음 조회 때)"""
+        with self._lock:
+            self._catalog_generation += 1
+            self._entries.clear()
+
+    def invalidate_products(self, products: List[Dict]):
+        """
+        상품 추가/교체 시 그 상품이 상위 top_n에 들어갈 수 있는 사용자의 추천만 무효화
+        (선호 카테고리와 가격/평점으로 계산한 점수가 저장된 마지막 추천 점수 이상이거나, 이미 추천 목록에 있는 상품)
+        상품이 추가될 때마다 사용자를 다시 계산하지 않도록 재계산은 예약하지 않고 다음 조회 때 계산
+        """
+        with self._lock:
+            # 진행 중인 계산은 새 상품을 못 봤을 수 있으므로 저장하지 않음
+            self._catalog_generation += 1
+            user_ids = list(self._entries)
+            if not user_ids:
+                return
+            entries = [self._entries[user_id] for user_id in user_ids]
+            categories = [entry[2] for entry in entries]
+            affected = set()
+            for product in products:
+                scores = self.engine.product_scores(user_ids, categories, product).tolist()
+                for user_id, (_, recommendations, _), score in zip(user_ids, entries, scores):
+                    # 저장된 점수는 소수 둘째 자리로 반올림되어 있으므로 그만큼 여유를 둠
+                    if (
+                        len(recommendations) < self.top_n
+                        or score >= recommendations[-1].get('recommendation_score', 0) - 0.01
+                        or any(r.get('id') == product.get('id') for r in recommendations)
+                    ):
+                        affected.add(user_id)
+            for user_id in affected:
+                del self._entries[user_id]
+
+    async def refresh_pending(self) -> int:
+        """재계산이 예약된 사용자들의 추천을 일괄 계산하여 저장"""
+        with self._lock:
+            user_ids = list(self._pending)
+            generations = {
+                user_id: (self._catalog_generation, self._user_generations.get(user_id, 0))
+                for user_id in user_ids
+            }
+        if not user_ids:
+            return 0
+
+        preferred = await self.engine.get_preferred_categories(user_ids)
+        refreshed = 0
+        async for user_id, recommendations in self.engine.iter_batch_recommendations(user_ids, limit=self.top_n):
+            if self._store(user_id, recommendations, preferred[user_id], generations[user_id]):
+                refreshed += 1
+        self.refreshed += refreshed
+        return refreshed
+
+    async def _run_refresher(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh_pending()
+            except Exception as e:
+                log_error("RECOMMENDATION_STORE_REFRESH_ERROR", str(e))
+
+    def start(self):
+        """백그라운드 갱신 작업 시작 (이벤트 루프 안에서 호출)"""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.get_running_loop().create_task(self._run_refresher())
+
+    async def stop(self):
+        if self._refresher:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "users": len(self._entries),
+                "pending": len(self._pending),
+                "top_n": self.top_n,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshed": self.refreshed
+            }
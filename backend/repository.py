@@ -0,0 +1,258 @@
+"""
+데이터 저장소 인터페이스
+추천 엔진과 에이전트 도구가 JSON(SimpleDB), Supabase, SQLite 중 어느 저장소든 같은 방식으로 읽고 쓰도록 함
+DATA_BACKEND 환경변수(json/supabase/sqlite, 기본값 json)로 선택
+쓰기가 반영되면 add_listener로 등록한 콜백에 변경 연산 목록을 알림 (저장소 종류와 무관하게 캐시 무효화)
+"""
+
+import asyncio
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from logger_config import log_error
+
+# 변경 알림 콜백 (저장소가 만들어지기 전에도 등록할 수 있도록 모듈 단위로 보관)
+_listeners: List[Callable[[List[Dict]], None]] = []
+
+
+def add_listener(listener: Callable[[List[Dict]], None]):
+    """
+    저장소 쓰기가 반영된 뒤 변경 연산 목록을 받을 콜백 등록
+    연산 형식은 SimpleDB 저널과 같음 ({"op": "add_product", "product": ...} / {"op": "update_user_preferences", ...})
+    JSON 저장소는 SimpleDB 쓰기 스레드에서 호출되므로 콜백은 스레드 안전해야 함
+    """
+    _listeners.append(listener)
+
+
+class Repository(ABC):
+    """상품/사용자/상호작용 저장소 (모든 메서드는 이벤트 루프를 막지 않음)"""
+
+    _catalog_version = 0
+
+    @property
+    def catalog_version(self) -> int:
+        """이 저장소로 상품이 추가될 때마다 증가하는 카탈로그 버전 (캐시 무효화용)"""
+        return self._catalog_version
+
+    def _notify(self, ops: List[Dict]):
+        """쓰기 반영 후 카탈로그 버전 갱신 및 변경 알림 (콜백 오류는 기록만 하고 쓰기 결과에 영향 없음)"""
+        if any(op["op"] == "add_product" for op in ops):
+            self._catalog_version += 1
+        for listener in _listeners:
+            try:
+                listener(ops)
+            except Exception as e:
+                log_error("REPOSITORY_LISTENER_ERROR", str(e), {"ops": len(ops)})
+
+    @abstractmethod
+    async def get_products(self, category: str = None, max_price: int = None) -> List[Dict]:
+        """상품 목록 조회"""
+
+    @abstractmethod
+    async def get_product(self, product_id: str) -> Optional[Dict]:
+        """ID로 상품 조회"""
+
+    @abstractmethod
+    async def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Dict]:
+        """여러 상품 조회 (상품 ID -> 상품, 없는 ID는 빠짐)"""
+
+    @abstractmethod
+    async def search_products(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """키워드로 상품 검색"""
+
+    @abstractmethod
+    async def get_user_preferences(self, user_id: str) -> Optional[Dict]:
+        """사용자 선호도 조회"""
+
+    @abstractmethod
+    async def get_users_preferences(self, user_ids: List[str]) -> Dict[str, Dict]:
+        """여러 사용자의 선호도 조회 (사용자 ID -> 사용자)"""
+
+    @abstractmethod
+    async def get_interactions(self, since: Optional[str] = None) -> List[Dict]:
+        """상호작용 이벤트 조회 (since 이후, ISO 8601 시각)"""
+
+    @abstractmethod
+    async def add_products(self, products: List[Dict]):
+        """상품 추가 (반영 후 변경 알림)"""
+
+    @abstractmethod
+    async def update_user_preferences(self, user_id: str, preferences: Dict):
+        """사용자 선호도 업데이트 (반영 후 변경 알림)"""
+
+    async def warm_up(self):
+        """연결 미리 준비 (서버 시작 후 백그라운드에서 호출)"""
+
+    async def close(self):
+        """연결 정리 (앱 종료 시 호출)"""
+
+
+class JsonRepository(Repository):
+    """
+    SimpleDB(JSON 스냅샷 + 저널) 저장소
+    상호작용 이벤트는 SimpleDB에 보관하지 않으므로 이벤트 파이프라인 저장소(EVENT_SINK)에서 읽음
+    변경 알림은 SimpleDB 커밋 콜백으로 받으므로 SimpleDB에 직접 쓴 경우도 포함됨
+    """
+
+    def __init__(self, database=None):
+        if database is None:
+            from simple_db import simple_db as database
+        self.db = database
+        self.db.add_listener(self._notify)
+
+    async def get_products(self, category: str = None, max_price: int = None) -> List[Dict]:
+        return self.db.get_products(category=category, max_price=max_price)
+
+    async def get_product(self, product_id: str) -> Optional[Dict]:
+        return self.db.get_product(product_id)
+
+    async def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Dict]:
+        products = {}
+        for product_id in product_ids:
+            product = self.db.get_product(product_id)
+            if product:
+                products[product_id] = product
+        return products
+
+    async def search_products(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        return self.db.search_products(query, mode="or", limit=limit)
+
+    async def get_user_preferences(self, user_id: str) -> Optional[Dict]:
+        return self.db.get_user(user_id)
+
+    async def get_users_preferences(self, user_ids: List[str]) -> Dict[str, Dict]:
+        users = {}
+        for user_id in user_ids:
+            user = self.db.get_user(user_id)
+            if user:
+                users[user_id] = user
+        return users
+
+    async def get_interactions(self, since: Optional[str] = None) -> List[Dict]:
+        from events import create_event_sink
+        return await create_event_sink().read(since)
+
+    async def add_products(self, products: List[Dict]):
+        await self.db.add_products_async(products)
+
+    async def update_user_preferences(self, user_id: str, preferences: Dict):
+        await self.db.update_user_preferences_async(user_id, preferences)
+
+
+class SupabaseRepository(Repository):
+    """Supabase 저장소 (db.py의 비동기 PostgREST 클라이언트와 읽기 캐시 사용)"""
+
+    def __init__(self):
+        import db
+        self.db = db
+
+    async def get_products(self, category: str = None, max_price: int = None) -> List[Dict]:
+        return await self.db.get_products(category=category, max_price=max_price)
+
+    async def get_product(self, product_id: str) -> Optional[Dict]:
+        return await self.db.get_product(product_id)
+
+    async def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Dict]:
+        return await self.db.get_products_by_ids(product_ids)
+
+    async def search_products(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        return await self.db.search_products(query, limit=limit)
+
+    async def get_user_preferences(self, user_id: str) -> Optional[Dict]:
+        return await self.db.get_user_preferences(user_id)
+
+    async def get_users_preferences(self, user_ids: List[str]) -> Dict[str, Dict]:
+        return await self.db.get_users_preferences(user_ids)
+
+    async def get_interactions(self, since: Optional[str] = None) -> List[Dict]:
+        return await self.db.get_interactions(since)
+
+    async def add_products(self, products: List[Dict]):
+        await self.db.upsert_products(products)
+        if products:
+            self._notify([{"op": "add_product", "product": p} for p in products])
+
+    async def update_user_preferences(self, user_id: str, preferences: Dict):
+        await self.db.update_user_preferences(user_id, preferences)
+        self._notify([{"op": "update_user_preferences", "user_id": user_id, "preferences": preferences}])
+
+    async def warm_up(self):
+        await asyncio.to_thread(self.db.warm_up)
+
+    async def close(self):
+        await self.db.close()
+
+
+class SqliteRepository(Repository):
+    """SQLite 저장소 (조회는 읽기 연결 풀을 쓰는 스레드에서 실행)"""
+
+    def __init__(self, path: Optional[str] = None, read_pool_size: Optional[int] = None):
+        from sqlite_db import SQLiteDB
+        self.db = SQLiteDB(
+            path or os.getenv("SQLITE_DB_PATH", "benefit_station.db"),
+            read_pool_size=read_pool_size or int(os.getenv("SQLITE_READ_POOL_SIZE", "4"))
+        )
+
+    async def get_products(self, category: str = None, max_price: int = None) -> List[Dict]:
+        return await asyncio.to_thread(self.db.get_products, category, max_price)
+
+    async def get_product(self, product_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self.db.get_product, product_id)
+
+    async def get_products_by_ids(self, product_ids: List[str]) -> Dict[str, Dict]:
+        return await asyncio.to_thread(self.db.get_products_by_ids, product_ids)
+
+    async def search_products(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        return await asyncio.to_thread(self.db.search_products, query, "or", limit)
+
+    async def get_user_preferences(self, user_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self.db.get_user, user_id)
+
+    async def get_users_preferences(self, user_ids: List[str]) -> Dict[str, Dict]:
+        return await asyncio.to_thread(self.db.get_users, user_ids)
+
+    async def get_interactions(self, since: Optional[str] = None) -> List[Dict]:
+        return await asyncio.to_thread(self.db.get_interactions, since)
+
+    async def add_products(self, products: List[Dict]):
+        await asyncio.to_thread(self.db.add_products, products)
+        if products:
+            self._notify([{"op": "add_product", "product": p} for p in products])
+
+    async def update_user_preferences(self, user_id: str, preferences: Dict):
+        await asyncio.to_thread(self.db.update_user_preferences, user_id, preferences)
+        self._notify([{"op": "update_user_preferences", "user_id": user_id, "preferences": preferences}])
+
+    async def close(self):
+        self.db.close()
+
+
+_BACKENDS = {
+    "json": JsonRepository,
+    "supabase": SupabaseRepository,
+    "sqlite": SqliteRepository,
+}
+
+
+def create_repository(backend: Optional[str] = None) -> Repository:
+    """DATA_BACKEND 설정에 맞는 저장소 생성"""
+    backend = backend or os.getenv("DATA_BACKEND", "json")
+    if backend not in _BACKENDS:
+        raise ValueError(f"지원하지 않는 저장소입니다: {backend}")
+    return _BACKENDS[backend]()
+
+
+# 전역 저장소 인스턴스 (처음 사용할 때 생성, 백그라운드 준비 스레드와 요청이 동시에 만들지 않도록 잠금)
+_repository: Optional[Repository] = None
+_repository_lock = threading.Lock()
+
+
+def get_repository() -> Repository:
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = create_repository()
+    return _repository
@@ -0,0 +1,161 @@
+"""
+상품 검색용 역색인
+한글은 음절 바이그램, 영문/숫자는 단어 단위로 토큰화하여 name/category/description 필드를 색인
+질의 단어는 토큰의 절반 이상이 일치하면 매칭하므로 조사가 붙은 단어("커피를")도 찾을 수 있음
+단어 안의 음절 하나는 색인하지 않으므로 한 음절 질의("밥")는 한 음절 단어와만 일치 ("원", "만" 같은 음절로 엉뚱한 상품이 걸리지 않도록 함)
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set
+
+# 필드별 가중치 (상품명 일치를 가장 높게 평가)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "category": 2.0,
+    "description": 1.0,
+}
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+# 질의 단어 하나에서 사용할 최대 토큰 수 (SQLite FTS 검색식의 조합 수를 제한)
+MAX_WORD_TERMS = 8
+
+
+def tokenize(text: str) -> List[str]:
+    """텍스트를 색인 토큰 목록으로 변환 (한글 음절 바이그램 + 영문/숫자 단어)"""
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= run[0] <= "힣" and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def word_terms(word: str) -> List[str]:
+    """질의 단어 하나의 검색 토큰 (중복 제거, 최대 MAX_WORD_TERMS개)"""
+    return list(dict.fromkeys(tokenize(word)))[:MAX_WORD_TERMS]
+
+
+def required_matches(term_count: int) -> int:
+    """단어가 일치하려면 포함해야 하는 최소 토큰 수 (절반 이상, 조사/어미 한두 음절 차이 허용)"""
+    return (term_count + 1) // 2
+
+
+def _fts_word(terms: List[str]) -> str:
+    """단어 하나의 검색식 (SearchIndex._match_word와 같이 토큰 중 required_matches개 이상 포함)"""
+    groups = combinations(terms, required_matches(len(terms)))
+    return "(" + " OR ".join("(" + " AND ".join(f'"{term}"' for term in group) + ")" for group in groups) + ")"
+
+
+def fts_query(query: str, mode: str) -> Optional[str]:
+    """
+    질의를 단어 단위 FTS5 검색식으로 변환 (토큰은 큰따옴표로 감싸 문법 문자와 충돌하지 않도록 함)
+    mode="and"는 모든 단어, mode="or"는 하나 이상의 단어가 일치
+    """
+    words = [terms for terms in (word_terms(word) for word in query.split()) if terms]
+    if not words:
+        return None
+    return (" AND " if mode == "and" else " OR ").join(_fts_word(terms) for terms in words)
+
+
+class SearchIndex:
+    """
+    필드 가중치 기반 역색인
+    검색 비용은 카탈로그 크기가 아니라 질의 토큰의 포스팅 길이에 비례
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._docs: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: int, product: Dict):
+        """상품을 색인에 추가 (증분 갱신)"""
+        weights: Dict[str, float] = {}
+        for field, field_weight in FIELD_WEIGHTS.items():
+            value = product.get(field)
+            if not value:
+                continue
+            for term in tokenize(str(value)):
+                weights[term] = weights.get(term, 0.0) + field_weight
+        
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+        self._docs[doc_id] = product
+
+    def _match_word(self, grams: List[str]) -> Set[int]:
+        """단어의 토큰 중 required_matches개 이상을 포함하는 문서 집합"""
+        postings = [p for p in (self._postings.get(gram) for gram in grams) if p]
+        needed = required_matches(len(grams))
+        if len(postings) < needed:
+            return set()
+        if needed == 1:
+            return set().union(*postings)
+        
+        counts = Counter(doc_id for posting in postings for doc_id in posting)
+        return {doc_id for doc_id, count in counts.items() if count >= needed}
+
+    def search(self, query: str, mode: str = "and", limit: Optional[int] = None) -> List[Dict]:
+        """
+        질의 검색
+        공백으로 구분된 단어 단위로 매칭하며 mode="and"는 모든 단어, mode="or"는 하나 이상의 단어를 포함한 문서를 반환.
+        단어는 토큰의 절반 이상을 포함하면 일치 (겹치는 토큰이 많을수록 점수가 높음).
+        점수(토큰 가중치 × IDF) 내림차순, 동점은 색인 순서로 정렬
+        """
+        if mode not in ("and", "or"):
+            raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+        
+        words = [word_terms(word) for word in query.split()]
+        words = [grams for grams in words if grams]
+        if not words:
+            return []
+        
+        candidates: Optional[Set[int]] = None
+        for grams in words:
+            matched = self._match_word(grams)
+            if mode == "and":
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+            else:
+                candidates = matched if candidates is None else candidates | matched
+        
+        if not candidates:
+            return []
+        
+        scores = self._score(candidates, {gram for grams in words for gram in grams})
+        if limit is not None:
+            ranked = heapq.nsmallest(limit, scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        else:
+            ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        return [self._docs[doc_id] for doc_id in ranked]
+
+    def _score(self, candidates: Iterable[int], terms: Set[str]) -> Dict[int, float]:
+        """후보 문서별 점수 계산"""
+        total_docs = len(self._docs)
+        scores = {doc_id: 0.0 for doc_id in candidates}
+        
+        for term in terms:
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + total_docs / len(posting))
+            # 포스팅과 후보 중 작은 쪽을 순회
+            if len(posting) < len(scores):
+                for doc_id, weight in posting.items():
+                    if doc_id in scores:
+                        scores[doc_id] += weight * idf
+            else:
+                for doc_id in scores:
+                    weight = posting.get(doc_id)
+                    if weight:
+                        scores[doc_id] += weight * idf
+        
+        return scores
@@ -0,0 +1,256 @@
+"""
+상품 간 유사도 인덱스
+카테고리, 가격대, 평점, 상품명/설명 토큰으로 유사도를 계산하고 상품별 상위 K개 이웃을 미리 보관
+"""
+
+import bisect
+import heapq
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from search_index import tokenize
+
+# 유사도 구성 요소별 가중치
+CATEGORY_WEIGHT = 0.4
+PRICE_WEIGHT = 0.2
+RATING_WEIGHT = 0.1
+TEXT_WEIGHT = 0.3
+
+
+def price_band(price) -> int:
+    """가격대 (2배 간격 로그 구간)"""
+    return int(math.log2((price or 0) + 1))
+
+
+class SimilarityIndex:
+    """
+    상품별 상위 K개 유사 상품 인덱스
+    후보는 같은 카테고리·가격대에서 평점이 가까운 상품과 드문 토큰을 공유하는 상품으로 최대 max_candidates개까지 제한하고,
+    후보와의 유사도는 NumPy로 한 번에 계산. 전체 구축은 O(n × 후보 수), 상품 추가는 O(후보 수), 조회는 O(K log K)
+    """
+
+    # 전체 구축 시 한 번에 점수를 계산할 상품 수
+    BUILD_BLOCK_SIZE = 256
+
+    def __init__(self, k: int = 10, bucket_candidates: int = 32, max_candidates: int = 100):
+        self.k = k
+        self.bucket_candidates = bucket_candidates
+        self.max_candidates = max_candidates
+        # 상품은 추가 순서대로 행 번호를 받음
+        self._products: List[Dict] = []
+        self._rows: Dict[str, int] = {}
+        self._vocabulary: Dict[str, int] = {}
+        self._category_codes: Dict[str, int] = {}
+        # 행별 특성 배열 (용량이 부족하면 두 배로 늘림)
+        self._codes = np.empty(0, dtype=np.int32)
+        self._bands = np.empty(0, dtype=np.int32)
+        self._ratings = np.empty(0, dtype=np.float64)
+        # 행별 토큰 ID는 하나의 배열에 이어 붙이고 시작 위치/개수로 구분
+        self._token_starts = np.empty(0, dtype=np.int64)
+        self._token_counts = np.empty(0, dtype=np.int64)
+        self._token_data = np.empty(0, dtype=np.int64)
+        self._token_size = 0
+        # (카테고리 코드, 가격대) 버킷별 평점순 정렬 목록
+        self._buckets: Dict[Tuple[int, int], Tuple[List[float], List[int]]] = {}
+        self._token_postings: Dict[int, List[int]] = {}
+        # 행별 이웃 최소 힙 [(유사도, 이웃 행)], 크기는 최대 k
+        self._neighbors: List[List[Tuple[float, int]]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    @classmethod
+    def build(cls, products: List[Dict], k: int = 10) -> "SimilarityIndex":
+        """
+        전체 상품으로 인덱스 구축 (서버 준비 단계나 별도 배치에서 실행)
+        모든 상품을 먼저 등록하고 버킷을 한 번만 정렬한 뒤, 상품마다 전체 인덱스에서 후보를 골라 이웃 계산
+        """
+        index = cls(k=k)
+        with index._lock:
+            for product in products:
+                if product.get("id") is not None and product.get("id") not in index._rows:
+                    index._register(product)
+            for ratings, rows in index._buckets.values():
+                order = sorted(range(len(rows)), key=lambda i: ratings[i])
+                ratings[:] = [ratings[i] for i in order]
+                rows[:] = [rows[i] for i in order]
+            # 여러 상품의 (상품, 후보) 쌍을 묶어 한 번에 점수 계산
+            for start in range(0, len(index._products), cls.BUILD_BLOCK_SIZE):
+                block = range(start, min(start + cls.BUILD_BLOCK_SIZE, len(index._products)))
+                candidates = [index._candidates(row) for row in block]
+                rows = np.repeat(np.array(block, dtype=np.int64), [len(c) for c in candidates])
+                neighbors = np.array([c for group in candidates for c in group], dtype=np.int64)
+                scores = index._score_pairs(rows, neighbors)
+
+                # 상품별로 유사도 내림차순 정렬 후 앞에서 k개
+                order = np.lexsort((-scores, rows))
+                rows, neighbors, scores = rows[order], neighbors[order], scores[order]
+                group_starts = np.searchsorted(rows, rows, side="left")
+                keep = np.arange(len(rows)) - group_starts < index.k
+                for row, neighbor, score in zip(rows[keep].tolist(), neighbors[keep].tolist(), scores[keep].tolist()):
+                    index._neighbors[row].append((score, neighbor))
+            for heap in index._neighbors:
+                heapq.heapify(heap)
+        return index
+
+    def add_all(self, products: List[Dict]):
+        """여러 상품 추가 (이미 있는 상품은 무시)"""
+        for product in products:
+            self.add(product)
+
+    def _register(self, product: Dict) -> int:
+        """상품에 행 번호를 주고 특성/토큰 포스팅 등록 (버킷에는 뒤에 붙이기만 함)"""
+        row = len(self._products)
+        if row == len(self._codes):
+            capacity = max(16, row * 2)
+            self._codes = np.resize(self._codes, capacity)
+            self._bands = np.resize(self._bands, capacity)
+            self._ratings = np.resize(self._ratings, capacity)
+            self._token_starts = np.resize(self._token_starts, capacity)
+            self._token_counts = np.resize(self._token_counts, capacity)
+
+        code = self._category_codes.setdefault(product.get("category"), len(self._category_codes))
+        band = price_band(product.get("price"))
+        rating = float(product.get("rating") or 0)
+        text = f"{product.get('name') or ''} {product.get('description') or ''}"
+        tokens = sorted({self._vocabulary.setdefault(token, len(self._vocabulary)) for token in tokenize(text)})
+
+        end = self._token_size + len(tokens)
+        if end > len(self._token_data):
+            self._token_data = np.resize(self._token_data, max(64, end * 2))
+        self._token_data[self._token_size:end] = tokens
+        self._token_starts[row] = self._token_size
+        self._token_counts[row] = len(tokens)
+        self._token_size = end
+
+        self._products.append(product)
+        self._rows[product["id"]] = row
+        self._codes[row] = code
+        self._bands[row] = band
+        self._ratings[row] = rating
+        self._neighbors.append([])
+
+        ratings, rows = self._buckets.setdefault((code, band), ([], []))
+        ratings.append(rating)
+        rows.append(row)
+        for token in tokens:
+            self._token_postings.setdefault(token, []).append(row)
+        return row
+
+    def _candidates(self, row: int) -> List[int]:
+        code, band, rating = int(self._codes[row]), int(self._bands[row]), self._ratings[row]
+        candidates = set()
+
+        for near_band in (band - 1, band, band + 1):
+            bucket = self._buckets.get((code, near_band))
+            if not bucket:
+                continue
+            ratings, rows = bucket
+            # 평점이 가장 가까운 상품들을 양쪽으로 bucket_candidates개까지
+            pos = bisect.bisect_left(ratings, rating)
+            half = self.bucket_candidates // 2
+            candidates.update(rows[max(0, pos - half):pos + half])
+
+        # 드문 토큰부터 후보에 추가하고, 흔한 토큰은 최근에 추가된 상품만 남은 자리만큼 사용
+        postings = [self._token_postings.get(token) for token in self._row_tokens(row).tolist()]
+        for posting in sorted((p for p in postings if p), key=len):
+            room = self.max_candidates - len(candidates)
+            if room <= 0:
+                break
+            candidates.update(posting[-room:])
+
+        candidates.discard(row)
+        return sorted(candidates)
+
+    def _gather_tokens(self, rows: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """여러 행의 토큰 ID를 행 순서대로 이어 붙인 배열"""
+        owners = np.repeat(np.arange(len(rows)), lengths)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return self._token_data[self._token_starts[rows][owners] + offsets]
+
+    def _score_pairs(self, rows: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """(행, 후보 행) 쌍별 유사도 (0~1)"""
+        scores = np.where(self._codes[candidates] == self._codes[rows], CATEGORY_WEIGHT, 0.0)
+        scores += PRICE_WEIGHT * np.maximum(0.0, 1 - np.abs(self._bands[candidates] - self._bands[rows]) / 2)
+        scores += RATING_WEIGHT * (1 - np.minimum(np.abs(self._ratings[candidates] - self._ratings[rows]), 5) / 5)
+
+        # 상품명/설명 토큰 Jaccard 유사도
+        # 후보의 토큰을 쌍별로 펼친 뒤, 같은 쌍의 기준 행에도 있는 토큰인지 (행, 토큰) 키로 한 번에 확인
+        row_lengths = self._token_counts[rows]
+        candidate_lengths = self._token_counts[candidates]
+        pair_of_token = np.repeat(np.arange(len(candidates)), candidate_lengths)
+        unique_rows = np.unique(rows)
+        vocabulary_size = max(1, len(self._vocabulary))
+        row_keys = (
+            np.repeat(unique_rows, self._token_counts[unique_rows]) * vocabulary_size
+            + self._gather_tokens(unique_rows, self._token_counts[unique_rows])
+        )
+        candidate_keys = rows[pair_of_token] * vocabulary_size + self._gather_tokens(candidates, candidate_lengths)
+        hits = np.isin(candidate_keys, row_keys)
+        shared = np.bincount(pair_of_token, weights=hits, minlength=len(candidates))
+        union = row_lengths + candidate_lengths - shared
+        scores += TEXT_WEIGHT * np.where((row_lengths > 0) & (candidate_lengths > 0), shared / np.maximum(union, 1), 0.0)
+        return scores
+
+    def _row_tokens(self, row: int) -> np.ndarray:
+        start = self._token_starts[row]
+        return self._token_data[start:start + self._token_counts[row]]
+
+    def _top_neighbors(self, candidates: np.ndarray, scores: np.ndarray) -> List[Tuple[float, int]]:
+        """유사도 상위 k개를 최소 힙으로 반환"""
+        if len(candidates) > self.k:
+            top = np.argpartition(-scores, self.k - 1)[:self.k]
+            candidates, scores = candidates[top], scores[top]
+        heap = list(zip(scores.tolist(), candidates.tolist()))
+        heapq.heapify(heap)
+        return heap
+
+    def _offer(self, row: int, score: float, neighbor: int):
+        """row의 이웃 힙에 neighbor를 넣을 자리가 있으면 삽입 (가장 낮은 이웃을 밀어냄)"""
+        heap = self._neighbors[row]
+        if len(heap) < self.k:
+            heapq.heappush(heap, (score, neighbor))
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, neighbor))
+
+    def add(self, product: Dict):
+        """상품 추가 (자신의 이웃을 계산하고 후보 상품들의 이웃 힙도 갱신)"""
+        product_id = product.get("id")
+        if product_id is None:
+            return
+
+        with self._lock:
+            if product_id in self._rows:
+                return
+            row = self._register(product)
+            ratings, rows = self._buckets[(int(self._codes[row]), int(self._bands[row]))]
+            # _register가 뒤에 붙인 항목을 평점 순서 위치로 옮김
+            ratings.pop()
+            rows.pop()
+            pos = bisect.bisect_right(ratings, self._ratings[row])
+            ratings.insert(pos, self._ratings[row])
+            rows.insert(pos, row)
+
+            candidates = np.array(self._candidates(row), dtype=np.int64)
+            scores = self._score_pairs(np.full(len(candidates), row, dtype=np.int64), candidates)
+            self._neighbors[row] = self._top_neighbors(candidates, scores)
+            for candidate, score in zip(candidates.tolist(), scores.tolist()):
+                self._offer(candidate, score, row)
+
+    def similar(self, product_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """유사 상품 목록 (유사도 내림차순)"""
+        with self._lock:
+            row = self._rows.get(product_id)
+            if row is None:
+                return []
+            neighbors = sorted(self._neighbors[row], key=lambda n: (-n[0], n[1]))
+        if limit is not None:
+            neighbors = neighbors[:limit]
+        return [
+            {**self._products[neighbor], "similarity_score": round(score, 4)}
+            for score, neighbor in neighbors
+        ]
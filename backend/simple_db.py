@@ -3,77 +3,414 @@
 JSON 파일 기반으로 데이터 저장/조회
 """
 
+import asyncio
+import bisect
 import json
 import os
-from typing import List, Dict, Optional
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
+
+from journal import Journal, replay
+from logger_config import log_error
+from search_index import SearchIndex
+
+
+class _PriceIndex:
+    """가격 오름차순 정렬 인덱스 (bisect로 가격 상한 조회)"""
+
+    def __init__(self, entries: Iterable[Tuple[Tuple[float, int], Dict]] = ()):
+        """entries: ((가격, 입력 순번), 상품) 목록, 로드 시 한 번만 정렬"""
+        entries = sorted(entries, key=lambda entry: entry[0])
+        self._keys: List[Tuple[float, int]] = [key for key, _ in entries]
+        self._items: List[Dict] = [product for _, product in entries]
+
+    @staticmethod
+    def key(product: Dict, seq: int) -> Tuple[float, int]:
+        return (product.get("price") or 0, seq)
+
+    def add(self, product: Dict, seq: int):
+        """(가격, 입력 순번) 키 위치에 상품 삽입 (로드 이후 증분 추가용)"""
+        key = self.key(product, seq)
+        pos = bisect.bisect_right(self._keys, key)
+        self._keys.insert(pos, key)
+        self._items.insert(pos, product)
+
+    def up_to(self, max_price: int) -> List[Dict]:
+        """max_price 이하 상품을 가격순(동일 가격은 입력순)으로 반환"""
+        pos = bisect.bisect_right(self._keys, (max_price, float("inf")))
+        return self._items[:pos]
+
+
+class _CatalogState:
+    """
+    상품/사용자 데이터와 보조 인덱스
+    쓰기는 바뀐 구조만 제자리에서 갱신하므로 비용이 카탈로그 크기가 아니라 바뀐 데이터에 비례
+    읽기에는 쓰기가 있을 때만 새로 만드는 목록 스냅샷(view)을 공유하여 조회마다 복사하지 않음
+    (읽기/쓰기 동기화는 SimpleDB의 _state_lock이 담당)
+    """
+
+    def __init__(self, products: List[Dict], users: List[Dict]):
+        self.products: List[Dict] = []
+        self.users: List[Dict] = list(users)
+        self.by_id: Dict[str, Dict] = {}
+        self.by_category: Dict[str, List[Dict]] = {}
+        self.search_index = SearchIndex()
+        # 읽기용 목록 스냅샷 (전체 상품은 None 키, 카테고리별 상품은 카테고리 키)
+        self._views: Dict[Optional[str], List[Dict]] = {}
+
+        # 가격 인덱스는 (가격, 순번) 키를 모아 한 번에 정렬 (상품마다 삽입하면 O(n²))
+        price_entries = []
+        category_entries: Dict[str, list] = {}
+        for seq, product in enumerate(products):
+            category = product.get("category")
+            entry = (_PriceIndex.key(product, seq), product)
+
+            self.products.append(product)
+            self.by_id[product.get("id")] = product
+            self.by_category.setdefault(category, []).append(product)
+            self.search_index.add(seq, product)
+            price_entries.append(entry)
+            category_entries.setdefault(category, []).append(entry)
+
+        self.price_index = _PriceIndex(price_entries)
+        self.category_price_index: Dict[str, _PriceIndex] = {
+            category: _PriceIndex(entries) for category, entries in category_entries.items()
+        }
+
+    def add_product(self, product: Dict):
+        """상품 하나를 데이터와 모든 보조 인덱스에 반영"""
+        seq = len(self.products)
+        category = product.get("category")
+
+        self.products.append(product)
+        self.by_id[product.get("id")] = product
+        self.by_category.setdefault(category, []).append(product)
+        self.price_index.add(product, seq)
+        self.category_price_index.setdefault(category, _PriceIndex()).add(product, seq)
+        self.search_index.add(seq, product)
+        self._views.pop(None, None)
+        self._views.pop(category, None)
+
+    def view(self, category: Optional[str] = None) -> List[Dict]:
+        """
+        전체 또는 카테고리별 상품 목록 스냅샷
+        다음 쓰기 전까지 같은 리스트를 모든 읽기가 공유하고, 쓰기는 이 리스트를 수정하지 않고 버림 (copy-on-write)
+        """
+        view = self._views.get(category)
+        if view is None:
+            if category is None:
+                view = list(self.products)
+            elif category in self.by_category:
+                view = list(self.by_category[category])
+            else:
+                return []
+            self._views[category] = view
+        return view
+
+    def set_user_preferences(self, user_id: str, preferences: Dict):
+        """사용자 선호도 반영 (기존 사용자 dict는 수정하지 않고 교체)"""
+        for i, user in enumerate(self.users):
+            if user.get("id") == user_id:
+                self.users[i] = {**user, "preferences": preferences}
+                return
+
+        self.users.append({
+            "id": user_id,
+            "name": f"사용자_{user_id}",
+            "preferences": preferences
+        })
+
+    def apply(self, op: Dict):
+        """저널 연산 하나를 반영"""
+        kind = op.get("op")
+
+        if kind == "add_product":
+            self.add_product(op["product"])
+        elif kind == "update_user_preferences":
+            self.set_user_preferences(op["user_id"], op["preferences"])
+        else:
+            raise ValueError(f"알 수 없는 저널 연산입니다: {kind}")
+
 
 class SimpleDB:
-    def __init__(self, data_file: str = "products_data.json"):
+    """
+    JSON 스냅샷 + 추가 전용 저널 기반 로컬 DB
+    쓰기는 저널에 한 줄씩 기록하고, 일정 횟수마다 백그라운드에서 스냅샷을 새로 써서 저널을 비움.
+    커밋 반영과 읽기는 같은 잠금(_state_lock)으로 보호하므로, 읽기에는 한 커밋의 연산이 모두 보이거나 하나도 보이지 않음.
+    잠금은 메모리 반영 동안만 잡고(저널 기록/fsync 중에는 잡지 않음), 읽기는 인덱스 조회 동안만 잡음.
+    매 커밋마다 카탈로그 전체를 복사해 교체하는 대신 구조를 제자리에서 갱신하고,
+    전체/카테고리 목록은 쓰기 후 첫 조회에서만 스냅샷을 만들어 이후 조회와 공유
+    """
+
+    def __init__(
+        self,
+        data_file: str = "products_data.json",
+        fsync_policy: str = "always",
+        compact_every: int = 1000,
+        max_group_size: int = 1000
+    ):
         self.data_file = data_file
-        self.data = self._load_data()
-    
+        self.journal_file = data_file + ".journal"
+        self.compact_every = compact_every
+        self.max_group_size = max_group_size
+        self._write_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+        self._write_queue: "queue.Queue[Optional[Tuple[List[Dict], Future]]]" = queue.Queue()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_start_lock = threading.Lock()
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+
+        data = self._load_data()
+        self._journal_seq = data.get("journal_seq", 0)
+        self._catalog_version = 0
+        self._state = _CatalogState(data.get("products", []), data.get("users", []))
+        self._ops_since_compaction = self._replay_journal()
+        self._journal = Journal(self.journal_file, fsync_policy=fsync_policy)
+
     def _load_data(self) -> Dict:
-        """JSON 파일에서 데이터 로드"""
+        """JSON 스냅샷 파일에서 데이터 로드"""
         if os.path.exists(self.data_file):
             with open(self.data_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         return {"products": [], "users": []}
-    
-    def _save_data(self):
-        """데이터를 JSON 파일에 저장"""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
-    
+
+    def _replay_journal(self) -> int:
+        """스냅샷 이후에 기록된 저널 연산을 다시 적용하고 적용 개수 반환"""
+        replayed = 0
+        for op in replay(self.journal_file):
+            # 스냅샷에 이미 반영된 연산은 건너뜀 (압축 도중 중단된 경우)
+            if op.get("seq", 0) <= self._journal_seq:
+                continue
+            self._state.apply(op)
+            self._journal_seq = op["seq"]
+            replayed += 1
+        return replayed
+
+    def _commit(self, ops: List[Dict]):
+        """연산을 저널에 먼저 기록한 뒤 메모리 데이터에 반영"""
+        with self._write_lock:
+            for op in ops:
+                self._journal_seq += 1
+                op["seq"] = self._journal_seq
+
+            self._journal.append(ops)
+
+            with self._state_lock:
+                for op in ops:
+                    self._state.apply(op)
+                if any(op["op"] == "add_product" for op in ops):
+                    self._catalog_version += 1
+
+            self._ops_since_compaction += len(ops)
+            should_compact = self._ops_since_compaction >= self.compact_every
+
+        for listener in self._listeners:
+            try:
+                listener(ops)
+            except Exception as e:
+                log_error("SIMPLE_DB_LISTENER_ERROR", str(e), {"ops": len(ops)})
+
+        if should_compact:
+            self.compact_in_background()
+
+    def add_listener(self, listener: Callable[[List[Dict]], None]):
+        """
+        커밋된 연산 목록을 받을 콜백 등록 (캐시 무효화 등)
+        비동기 쓰기는 쓰기 스레드에서 호출되므로 콜백은 스레드 안전해야 함
+        """
+        self._listeners.append(listener)
+
+    def _submit(self, ops: List[Dict]) -> Future:
+        """쓰기 스레드에 연산 전달 (저널 반영 후 완료되는 Future 반환)"""
+        future: Future = Future()
+        self._write_queue.put((ops, future))
+        self._ensure_writer()
+        return future
+
+    def _ensure_writer(self):
+        with self._writer_start_lock:
+            if self._writer_thread is None or not self._writer_thread.is_alive():
+                self._writer_thread = threading.Thread(
+                    target=self._writer_loop, name="simple-db-writer", daemon=True
+                )
+                self._writer_thread.start()
+
+    def _writer_loop(self):
+        """
+        단일 쓰기 스레드
+        대기 중인 요청을 모아 한 번의 저널 기록/fsync와 한 번의 메모리 반영으로 처리 (group commit)
+        """
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                return
+
+            group = [item]
+            group_size = len(item[0])
+            while group_size < self.max_group_size:
+                try:
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write_queue.put(None)
+                    break
+                group.append(item)
+                group_size += len(item[0])
+
+            # 커밋 전에 이미 취소된 요청은 반영하지 않음 (이후로는 취소할 수 없는 상태가 됨)
+            group = [(ops, future) for ops, future in group if future.set_running_or_notify_cancel()]
+            if not group:
+                continue
+
+            error = None
+            try:
+                self._commit([op for ops, _ in group for op in ops])
+            except Exception as e:
+                error = e
+            for _, future in group:
+                # 결과 전달 중 오류가 나도 쓰기 스레드는 계속 동작해야 함
+                try:
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(None)
+                except Exception as e:
+                    log_error("SIMPLE_DB_FUTURE_ERROR", str(e))
+
+    def compact(self):
+        """
+        현재 데이터를 새 스냅샷으로 저장하고 반영된 저널 기록 제거
+        스냅샷은 임시 파일에 쓴 뒤 rename으로 원자적으로 교체
+        """
+        with self._compaction_lock:
+            with self._write_lock:
+                with self._state_lock:
+                    products = list(self._state.products)
+                    users = list(self._state.users)
+                journal_seq = self._journal_seq
+                journal_offset = self._journal.tell()
+                self._ops_since_compaction = 0
+
+            snapshot = {
+                "products": products,
+                "users": users,
+                "journal_seq": journal_seq
+            }
+            tmp_file = self.data_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.data_file)
+
+            with self._write_lock:
+                self._journal.truncate_before(journal_offset)
+
+    def compact_in_background(self):
+        """백그라운드 스레드에서 압축 실행 (이미 실행 중이면 무시)"""
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+
+        self._compaction_thread = threading.Thread(
+            target=self.compact, name="simple-db-compaction", daemon=True
+        )
+        self._compaction_thread.start()
+
+    def close(self):
+        """대기 중인 쓰기와 압축을 마치고 저널 닫기"""
+        if self._writer_thread and self._writer_thread.is_alive():
+            self._write_queue.put(None)
+            self._writer_thread.join()
+        if self._compaction_thread:
+            self._compaction_thread.join()
+        self._journal.close()
+
+    @property
+    def catalog_version(self) -> int:
+        """상품이 추가될 때마다 증가하는 카탈로그 버전 (캐시 무효화용)"""
+        return self._catalog_version
+
     def get_products(self, category: str = None, max_price: int = None) -> List[Dict]:
-        """상품 목록 조회"""
-        products = self.data.get("products", [])
-        
-        # 카테고리 필터링
-        if category:
-            products = [p for p in products if p.get("category") == category]
-        
-        # 가격 필터링
-        if max_price:
-            products = [p for p in products if p.get("price", 0) <= max_price]
-        
-        return products
-    
-    def search_products(self, query: str) -> List[Dict]:
-        """키워드로 상품 검색"""
-        query = query.lower()
-        products = self.data.get("products", [])
-        
-        return [
-            p for p in products 
-            if query in p.get("name", "").lower() or 
-               query in p.get("category", "").lower()
-        ]
-    
+        """
+        상품 목록 조회
+        카테고리만 지정하면 입력순, 가격 상한이 있으면 가격 오름차순(동일 가격은 입력순)으로 반환
+        반환 목록은 다른 조회와 공유할 수 있으므로 수정하지 않아야 함
+        """
+        with self._state_lock:
+            state = self._state
+
+            if category and max_price:
+                price_index = state.category_price_index.get(category)
+                return price_index.up_to(max_price) if price_index else []
+
+            # 카테고리 필터링
+            if category:
+                return state.view(category)
+
+            # 가격 필터링
+            if max_price:
+                return state.price_index.up_to(max_price)
+
+            return state.view()
+
+    def search_products(self, query: str, mode: str = "and", limit: Optional[int] = None) -> List[Dict]:
+        """
+        키워드로 상품 검색 (name/category/description 역색인)
+        mode="and"는 모든 단어, mode="or"는 하나 이상의 단어가 일치하는 상품을 점수순으로 반환
+        """
+        with self._state_lock:
+            return self._state.search_index.search(query, mode=mode, limit=limit)
+
+    def get_product(self, product_id: str) -> Optional[Dict]:
+        """ID로 상품 조회"""
+        with self._state_lock:
+            return self._state.by_id.get(product_id)
+
     def get_user(self, user_id: str) -> Optional[Dict]:
         """사용자 정보 조회"""
-        users = self.data.get("users", [])
-        return next((u for u in users if u.get("id") == user_id), None)
-    
+        with self._state_lock:
+            return next((u for u in self._state.users if u.get("id") == user_id), None)
+
     def add_product(self, product: Dict):
         """새 상품 추가"""
-        self.data.setdefault("products", []).append(product)
-        self._save_data()
-    
+        self._commit([{"op": "add_product", "product": product}])
+
+    def add_products(self, products: List[Dict]):
+        """여러 상품을 한 번의 저널 기록으로 추가 (대량 등록용)"""
+        if products:
+            self._commit([{"op": "add_product", "product": p} for p in products])
+
     def update_user_preferences(self, user_id: str, preferences: Dict):
         """사용자 선호도 업데이트"""
-        users = self.data.setdefault("users", [])
-        user = next((u for u in users if u.get("id") == user_id), None)
-        
-        if user:
-            user["preferences"] = preferences
-        else:
-            users.append({
-                "id": user_id,
-                "name": f"사용자_{user_id}",
-                "preferences": preferences
-            })
-        
-        self._save_data()
+        self._commit([{
+            "op": "update_user_preferences",
+            "user_id": user_id,
+            "preferences": preferences
+        }])
+
+    async def add_product_async(self, product: Dict):
+        """새 상품 추가 (쓰기 스레드에서 처리, 저널 반영 후 반환)"""
+        await asyncio.wrap_future(self._submit([{"op": "add_product", "product": product}]))
+
+    async def add_products_async(self, products: List[Dict]):
+        """여러 상품 추가 (쓰기 스레드에서 처리, 저널 반영 후 반환)"""
+        if products:
+            await asyncio.wrap_future(
+                self._submit([{"op": "add_product", "product": p} for p in products])
+            )
+
+    async def update_user_preferences_async(self, user_id: str, preferences: Dict):
+        """사용자 선호도 업데이트 (쓰기 스레드에서 처리, 저널 반영 후 반환)"""
+        await asyncio.wrap_future(self._submit([{
+            "op": "update_user_preferences",
+            "user_id": user_id,
+            "preferences": preferences
+        }]))
 
 # 전역 인스턴스
-simple_db = SimpleDB()
\ No newline at end of file
+simple_db = SimpleDB(fsync_policy=os.getenv("SIMPLE_DB_FSYNC", "always"))
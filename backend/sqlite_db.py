@@ -0,0 +1,303 @@
+"""
+SQLite 로컬 데이터베이스 (대용량 카탈로그용)
+database_setup.sql과 같은 스키마/인덱스에 상품명·설명 FTS5 색인을 더하고,
+WAL 모드로 쓰기 연결 하나와 읽기 연결 풀을 나누어 읽기가 쓰기를 기다리지 않도록 함
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from search_index import FIELD_WEIGHTS, fts_query, tokenize
+
+# 시각은 Supabase와 같은 ISO 8601(UTC) 문자열로 저장하여 created_at >= since 비교가 문자열 순서로 맞도록 함
+_NOW = "strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now')"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS users (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  email TEXT UNIQUE,
+  preferences TEXT DEFAULT '{{"categories": []}}',
+  created_at TEXT DEFAULT ({_NOW}),
+  updated_at TEXT DEFAULT ({_NOW})
+);
+
+CREATE TABLE IF NOT EXISTS products (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  category TEXT NOT NULL,
+  price INTEGER NOT NULL,
+  rating REAL DEFAULT 0,
+  description TEXT,
+  image_url TEXT,
+  is_active INTEGER DEFAULT 1,
+  created_at TEXT DEFAULT ({_NOW}),
+  updated_at TEXT DEFAULT ({_NOW})
+);
+
+CREATE TABLE IF NOT EXISTS user_interactions (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id TEXT REFERENCES users(id),
+  product_id TEXT REFERENCES products(id),
+  interaction_type TEXT NOT NULL,
+  created_at TEXT DEFAULT ({_NOW})
+);
+
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products(price);
+CREATE INDEX IF NOT EXISTS idx_products_rating ON products(rating);
+CREATE INDEX IF NOT EXISTS idx_products_category_price ON products(category, price);
+CREATE INDEX IF NOT EXISTS idx_user_interactions_user_id ON user_interactions(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_interactions_created_at ON user_interactions(created_at);
+
+-- 한글 바이그램 + 음절로 미리 토큰화한 텍스트 색인 (rowid = products.rowid)
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(name, category, description);
+"""
+
+# FTS 색인 토큰화 방식 버전 (PRAGMA user_version, 바뀌면 열 때 다시 색인)
+FTS_VERSION = 2
+
+_PRODUCT_COLUMNS = ("id", "name", "category", "price", "rating", "description", "image_url", "is_active")
+
+
+def _fts_text(value) -> str:
+    return " ".join(tokenize(str(value))) if value else ""
+
+
+def _product_row(row: sqlite3.Row) -> Dict:
+    product = {key: row[key] for key in row.keys() if row[key] is not None}
+    if "is_active" in product:
+        product["is_active"] = bool(product["is_active"])
+    return product
+
+
+def _user_row(row: sqlite3.Row) -> Dict:
+    user = {key: row[key] for key in row.keys() if row[key] is not None}
+    if "preferences" in user:
+        user["preferences"] = json.loads(user["preferences"])
+    return user
+
+
+class SQLiteDB:
+    def __init__(self, path: str = "benefit_station.db", read_pool_size: int = 4):
+        self.path = path
+        self._write_conn = self._connect()
+        self._write_conn.executescript(SCHEMA)
+        self._write_lock = threading.Lock()
+        self._migrate_fts()
+
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(read_pool_size):
+            conn = self._connect()
+            conn.execute("PRAGMA query_only = ON")
+            self._readers.put(conn)
+
+    def _migrate_fts(self):
+        """예전 토큰화 방식으로 만든 FTS 색인이면 상품 테이블에서 다시 색인"""
+        if self._write_conn.execute("PRAGMA user_version").fetchone()[0] >= FTS_VERSION:
+            return
+        with self._write_lock, self._write_conn as conn:
+            conn.execute("DELETE FROM products_fts")
+            for row in conn.execute("SELECT rowid, name, category, description FROM products").fetchall():
+                conn.execute(
+                    "INSERT INTO products_fts (rowid, name, category, description) VALUES (?, ?, ?, ?)",
+                    (row["rowid"], _fts_text(row["name"]), _fts_text(row["category"]), _fts_text(row["description"]))
+                )
+            conn.execute(f"PRAGMA user_version = {FTS_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """읽기 연결 풀에서 연결 하나를 빌려 씀 (모두 사용 중이면 반납될 때까지 대기)"""
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def close(self):
+        with self._write_lock:
+            self._write_conn.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+
+    # 조회
+    def get_products(self, category: str = None, max_price: int = None) -> List[Dict]:
+        """
+        상품 목록 조회 (SimpleDB와 같은 순서)
+        가격 상한이 있으면 가격 오름차순(동일 가격은 입력순), 없으면 입력순으로 반환
+        """
+        sql = "SELECT * FROM products WHERE is_active = 1"
+        params: List = []
+        if category:
+            sql += " AND category = ?"
+            params.append(category)
+        if max_price:
+            sql += " AND price <= ? ORDER BY price, rowid"
+            params.append(max_price)
+        else:
+            sql += " ORDER BY rowid"
+
+        with self._reader() as conn:
+            return [_product_row(row) for row in conn.execute(sql, params)]
+
+    def get_product(self, product_id: str) -> Optional[Dict]:
+        """ID로 상품 조회"""
+        with self._reader() as conn:
+            row = conn.execute("SELECT * FROM products WHERE id = ?", (product_id,)).fetchone()
+        return _product_row(row) if row else None
+
+    def get_products_by_ids(self, product_ids: List[str], chunk_size: int = 500) -> Dict[str, Dict]:
+        """여러 상품을 id IN (...) 조회로 한꺼번에 가져옴 (변수 개수 제한 때문에 chunk_size개 단위)"""
+        products = {}
+        with self._reader() as conn:
+            for start in range(0, len(product_ids), chunk_size):
+                chunk = product_ids[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(f"SELECT * FROM products WHERE id IN ({placeholders})", chunk):
+                    products[row["id"]] = _product_row(row)
+        return products
+
+    def search_products(self, query: str, mode: str = "and", limit: Optional[int] = None) -> List[Dict]:
+        """
+        키워드로 상품 검색 (FTS5, 필드 가중치는 search_index.FIELD_WEIGHTS와 동일)
+        mode="and"는 모든 단어, mode="or"는 하나 이상의 단어가 일치하는 상품을 점수순으로 반환 (단어 일치 기준은 SearchIndex와 같음)
+        """
+        match = fts_query(query, mode)
+        if match is None:
+            return []
+
+        sql = (
+            "SELECT p.* FROM products_fts f JOIN products p ON p.rowid = f.rowid "
+            "WHERE products_fts MATCH ? AND p.is_active = 1 "
+            "ORDER BY bm25(products_fts, ?, ?, ?), p.rowid"
+        )
+        params: List = [match, FIELD_WEIGHTS["name"], FIELD_WEIGHTS["category"], FIELD_WEIGHTS["description"]]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._reader() as conn:
+            return [_product_row(row) for row in conn.execute(sql, params)]
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """사용자 정보 조회"""
+        with self._reader() as conn:
+            row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        return _user_row(row) if row else None
+
+    def get_users(self, user_ids: List[str], chunk_size: int = 500) -> Dict[str, Dict]:
+        """여러 사용자 정보를 id IN (...) 조회로 한꺼번에 가져옴 (변수 개수 제한 때문에 chunk_size명 단위)"""
+        users = {}
+        with self._reader() as conn:
+            for start in range(0, len(user_ids), chunk_size):
+                chunk = user_ids[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                for row in conn.execute(f"SELECT * FROM users WHERE id IN ({placeholders})", chunk):
+                    users[row["id"]] = _user_row(row)
+        return users
+
+    def get_interactions(self, since: Optional[str] = None) -> List[Dict]:
+        """상호작용 이벤트 조회 (since 이후, ISO 8601 시각)"""
+        sql = "SELECT user_id, product_id, interaction_type, created_at FROM user_interactions"
+        params: List = []
+        if since:
+            sql += " WHERE created_at >= ?"
+            params.append(since)
+        with self._reader() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    # 쓰기
+    def add_products(self, products: List[Dict]):
+        """상품 추가 (같은 ID가 있으면 갱신), 한 트랜잭션으로 처리"""
+        with self._write_lock, self._write_conn as conn:
+            for product in products:
+                values = {column: product.get(column) for column in _PRODUCT_COLUMNS}
+                values["rating"] = values["rating"] or 0
+                values["is_active"] = 1 if values["is_active"] is None else int(bool(values["is_active"]))
+                rowid = conn.execute(
+                    "INSERT INTO products (id, name, category, price, rating, description, image_url, is_active) "
+                    "VALUES (:id, :name, :category, :price, :rating, :description, :image_url, :is_active) "
+                    "ON CONFLICT(id) DO UPDATE SET name = excluded.name, category = excluded.category, "
+                    "price = excluded.price, rating = excluded.rating, description = excluded.description, "
+                    f"image_url = excluded.image_url, is_active = excluded.is_active, updated_at = {_NOW} "
+                    "RETURNING rowid",
+                    values
+                ).fetchone()[0]
+                conn.execute("DELETE FROM products_fts WHERE rowid = ?", (rowid,))
+                conn.execute(
+                    "INSERT INTO products_fts (rowid, name, category, description) VALUES (?, ?, ?, ?)",
+                    (rowid, _fts_text(values["name"]), _fts_text(values["category"]), _fts_text(values["description"]))
+                )
+
+    def add_product(self, product: Dict):
+        """새 상품 추가"""
+        self.add_products([product])
+
+    def add_users(self, users: List[Dict]):
+        """사용자 추가 (같은 ID가 있으면 갱신)"""
+        with self._write_lock, self._write_conn as conn:
+            conn.executemany(
+                "INSERT INTO users (id, name, email, preferences) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, email = excluded.email, "
+                f"preferences = excluded.preferences, updated_at = {_NOW}",
+                [
+                    (
+                        user["id"],
+                        user.get("name") or user["id"],
+                        user.get("email"),
+                        json.dumps(user.get("preferences") or {"categories": []}, ensure_ascii=False)
+                    )
+                    for user in users
+                ]
+            )
+
+    def update_user_preferences(self, user_id: str, preferences: Dict):
+        """사용자 선호도 업데이트 (없는 사용자면 ID를 이름으로 새로 만듦)"""
+        with self._write_lock, self._write_conn as conn:
+            conn.execute(
+                "INSERT INTO users (id, name, preferences) VALUES (?, ?, ?) "
+                f"ON CONFLICT(id) DO UPDATE SET preferences = excluded.preferences, updated_at = {_NOW}",
+                (user_id, user_id, json.dumps(preferences, ensure_ascii=False))
+            )
+
+    def insert_interactions(self, rows: List[Dict]):
+        """상호작용 이벤트 일괄 저장"""
+        with self._write_lock, self._write_conn as conn:
+            conn.executemany(
+                "INSERT INTO user_interactions (user_id, product_id, interaction_type, created_at) "
+                "VALUES (:user_id, :product_id, :interaction_type, :created_at)",
+                rows
+            )
+
+    def import_json(self, data_file: str, batch_size: int = 10000) -> int:
+        """SimpleDB JSON 스냅샷(products_data.json)을 가져옴, 가져온 상품 수 반환"""
+        with open(data_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        products = data.get("products", [])
+        for start in range(0, len(products), batch_size):
+            self.add_products(products[start:start + batch_size])
+        self.add_users(data.get("users", []))
+        return len(products)
+
+
+if __name__ == "__main__":
+    # 사용법: python sqlite_db.py [products_data.json] [benefit_station.db]
+    source = sys.argv[1] if len(sys.argv) > 1 else "products_data.json"
+    target = sys.argv[2] if len(sys.argv) > 2 else os.getenv("SQLITE_DB_PATH", "benefit_station.db")
+    sqlite_db = SQLiteDB(target)
+    print(f"{sqlite_db.import_json(source)}개 상품을 {target}에 저장했습니다")
+    sqlite_db.close()
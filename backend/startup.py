@@ -0,0 +1,114 @@
+"""
+서버 시작 시간 측정과 백그라운드 준비(warm-up)
+main.py의 import 단계별 소요 시간을 기록하고, 무거운 구성 요소(추천 엔진, 저장소, 에이전트)는
+서버가 요청을 받기 시작한 뒤 백그라운드에서 미리 불러옴
+모듈 단위의 자세한 import 시간은 `python -X importtime -c "import main"`으로 확인
+"""
+
+import asyncio
+import inspect
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class _Component:
+    name: str
+    loader: Callable
+    required: bool
+    status: str = "pending"
+    elapsed: Optional[float] = None
+    error: Optional[str] = None
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+        self._components: Dict[str, _Component] = {}
+        self._serving_at: Optional[float] = None
+        self._warmed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """import/초기화 단계 하나의 소요 시간 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases.append((name, time.perf_counter() - start))
+
+    def add_component(self, name: str, loader: Callable, required: bool = True):
+        """
+        백그라운드에서 준비할 구성 요소 등록
+        loader가 동기 함수면 스레드에서 실행 (무거운 import가 이벤트 루프를 막지 않도록 함)
+        required=False인 구성 요소는 실패해도 준비 완료(/ready)를 막지 않음
+        """
+        self._components[name] = _Component(name, loader, required)
+
+    def start_warm_up(self, on_complete: Optional[Callable[[Dict], None]] = None):
+        """서버가 요청을 받을 수 있게 된 시점을 기록하고 준비 작업 시작 (끝나면 on_complete(report) 호출)"""
+        self._serving_at = time.perf_counter()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._warm_up(on_complete))
+
+    async def _warm_up(self, on_complete: Optional[Callable[[Dict], None]]):
+        for component in self._components.values():
+            component.status = "loading"
+            start = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(component.loader):
+                    await component.loader()
+                else:
+                    await asyncio.to_thread(component.loader)
+                component.status = "ready"
+            except Exception as e:
+                component.status = "failed"
+                component.error = str(e)
+            component.elapsed = time.perf_counter() - start
+        self._warmed_at = time.perf_counter()
+        if on_complete:
+            on_complete(self.report())
+
+    async def stop(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def ready(self) -> bool:
+        """준비 작업이 끝났고 필수 구성 요소가 모두 준비됨"""
+        return self._warmed_at is not None and all(
+            c.status == "ready" for c in self._components.values() if c.required
+        )
+
+    def _ms(self, seconds: Optional[float]) -> Optional[float]:
+        return round(seconds * 1000, 1) if seconds is not None else None
+
+    def report(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "imports_ms": {name: self._ms(elapsed) for name, elapsed in self._phases},
+            # 시작 측정 시점부터 요청 수신 가능 / 백그라운드 준비 완료까지
+            "serving_ms": self._ms(self._serving_at - self.started_at if self._serving_at else None),
+            "warmed_ms": self._ms(self._warmed_at - self.started_at if self._warmed_at else None),
+            "components": {
+                c.name: {
+                    "status": c.status,
+                    "required": c.required,
+                    "elapsed_ms": self._ms(c.elapsed),
+                    **({"error": c.error} if c.error else {})
+                }
+                for c in self._components.values()
+            }
+        }
+
+
+# 전역 시작 시간 측정기 (main.py가 가장 먼저 import)
+startup_profiler = StartupProfiler()
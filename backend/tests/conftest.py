@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# 백엔드 모듈은 backend/에서 실행하는 것을 전제로 서로 import하므로 같은 작업 디렉토리와 경로를 사용
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cwd(tmp_path, monkeypatch):
+    """테스트 중 생기는 로그 등 상대 경로 파일은 임시 디렉토리에 씀"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def main_module():
+    """FastAPI 앱 모듈 (처음 import할 때 생기는 로그/이벤트 파일은 그 테스트의 임시 디렉토리에 씀)"""
+    import main
+    return main
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from agent import tools  # noqa: E402
+
+
+class FakeRepository:
+    def __init__(self):
+        self.loops = []
+
+    async def search_products(self, query, limit=None):
+        self.loops.append(asyncio.get_running_loop())
+        return [{"id": "p1", "name": "아메리카노", "price": 4500, "rating": 4.5, "category": "food"}]
+
+
+def test_sync_tool_call_runs_on_server_loop(monkeypatch):
+    repository = FakeRepository()
+    monkeypatch.setattr(tools, "get_repository", lambda: repository)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        with tools.tool_turn() as products:
+            # LangChain이 작업 스레드에서 동기 경로로 호출하는 경우
+            first = await asyncio.to_thread(tools.SearchProductsTool()._run, "커피")
+            second = await asyncio.to_thread(tools.SearchProductsTool()._run, "커피")
+        assert first == second and "아메리카노" in first
+        assert repository.loops == [loop]
+        assert [p["id"] for p in products] == ["p1"]
+
+    asyncio.run(scenario())
+
+
+def test_sync_tool_call_on_server_loop_thread_is_rejected():
+    async def scenario():
+        tools.bind_event_loop()
+        with pytest.raises(RuntimeError):
+            tools.SearchProductsTool()._run("커피")
+
+    asyncio.run(scenario())
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+import recommendation
+from recommendation import RecommendationEngine
+
+
+class FakeRepository:
+    def __init__(self):
+        self.products = [
+            {"id": f"p{i}", "category": ("food", "health")[i % 2], "price": 10000 + i * 1000, "rating": 4.0}
+            for i in range(10)
+        ]
+        self.preferences = {
+            "u1": {"preferences": {"categories": ["food"]}},
+            "u2": {"preferences": {"categories": ["health"]}},
+        }
+
+    async def get_products(self, category=None, max_price=None):
+        return list(self.products)
+
+    async def get_user_preferences(self, user_id):
+        return self.preferences.get(user_id)
+
+    async def get_users_preferences(self, user_ids):
+        return {user_id: self.preferences[user_id] for user_id in user_ids if user_id in self.preferences}
+
+
+def _client(main_module, monkeypatch):
+    monkeypatch.setattr(recommendation, "get_repository", lambda: FakeRepository())
+    engine = RecommendationEngine(seed=1)
+    monkeypatch.setattr(main_module, "get_recommendation_engine", lambda: engine)
+    return TestClient(main_module.app), engine
+
+
+def test_batch_streams_same_results_as_single_user(main_module, monkeypatch):
+    client, engine = _client(main_module, monkeypatch)
+    response = client.post("/api/recommendations/batch", json={"user_ids": ["u1", "u2", "u1", "unknown"], "limit": 3})
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["user_id"] for row in rows) == ["u1", "u2", "unknown"]
+
+    for row in rows:
+        single = asyncio.run(engine.get_personalized_recommendations(row["user_id"], limit=3))
+        assert [p["id"] for p in row["products"]] == [p["id"] for p in single]
+
+
+def test_batch_export_writes_file(main_module, monkeypatch, tmp_path):
+    client, _ = _client(main_module, monkeypatch)
+    monkeypatch.setenv("RECOMMENDATION_EXPORT_DIR", str(tmp_path / "exports"))
+    response = client.post(
+        "/api/recommendations/batch",
+        json={"user_ids": ["u1", "u2"], "limit": 2, "output_file": "../outside/result.ndjson"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["users"] == 2
+    path = tmp_path / "exports" / "result.ndjson"
+    assert response.json()["output_file"] == str(path)
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_batch_export_rejects_missing_file_name(main_module, monkeypatch, tmp_path):
+    client, _ = _client(main_module, monkeypatch)
+    monkeypatch.setenv("RECOMMENDATION_EXPORT_DIR", str(tmp_path / "exports"))
+    for output_file in ("dir/", ".."):
+        response = client.post("/api/recommendations/batch", json={"user_ids": ["u1"], "output_file": output_file})
+        assert response.status_code == 400
+    assert not (tmp_path / "exports").exists()
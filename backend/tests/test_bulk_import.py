@@ -0,0 +1,54 @@
+import asyncio
+
+from bulk_import import import_products, iter_csv_rows, iter_ndjson_rows
+
+
+class FakeRepository:
+    def __init__(self):
+        self.products = {}
+
+    async def get_products_by_ids(self, ids):
+        return {i: self.products[i] for i in ids if i in self.products}
+
+    async def add_products(self, products):
+        self.products.update((p["id"], p) for p in products)
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _import(reader, data):
+    repository = FakeRepository()
+    stats = asyncio.run(import_products(reader(_chunks(data)), repository, batch_size=2))
+    return repository, stats
+
+
+def test_invalid_utf8_line_is_reported_as_row_error():
+    data = (
+        '{"id": "p1", "name": "사과", "category": "food", "price": 1000}\n'.encode()
+        + b'{"id": "p2", "name": "\xff\xfe", "category": "food", "price": 1000}\n'
+        + '{"id": "p3", "name": "배", "category": "food", "price": 2000}'.encode()
+    )
+    repository, stats = _import(iter_ndjson_rows, data)
+
+    assert sorted(repository.products) == ["p1", "p3"]
+    assert stats["imported"] == 2
+    assert stats["failed"] == 1
+    assert stats["errors"][0]["row"] == 2
+    assert "UTF-8" in stats["errors"][0]["error"]
+
+
+def test_csv_with_bom_and_invalid_utf8_row():
+    data = (
+        "﻿id,name,category,price\n".encode()
+        + "p1,사과,food,1000\r\n".encode()
+        + b"p2,\xc3\x28,food,1000\n"
+        + "p1,중복,food,1000\n".encode()
+    )
+    repository, stats = _import(iter_csv_rows, data)
+
+    assert sorted(repository.products) == ["p1"]
+    assert repository.products["p1"]["name"] == "사과"
+    assert [(e["row"], e["id"]) for e in stats["errors"]] == [(2, None), (3, "p1")]
@@ -0,0 +1,49 @@
+import pytest
+
+from chat_router import AGENT, CATALOG, ChatRouter
+from intent_matcher import load_intent_matcher
+
+
+@pytest.fixture(scope="module")
+def router():
+    return ChatRouter(load_intent_matcher())
+
+
+@pytest.mark.parametrize("message, path, confidence, reasons", [
+    # 카테고리 + 짧은 메시지
+    ("커피 추천해줘", CATALOG, 0.7, ["category", "short"]),
+    ("3만원 이하 건강", CATALOG, 1.0, ["category", "price", "short"]),
+    # 가격만 있으면 확신도가 모자람
+    ("2만원 이하로 뭐 없을까", AGENT, 0.5, ["price", "short"]),
+    ("안녕하세요", AGENT, 0.2, ["short"]),
+    # 에이전트가 필요한 표현은 감점
+    ("운동이랑 커피 중 뭐가 좋아?", AGENT, 0.2, ["category", "short", "escalation:뭐가 좋"]),
+])
+def test_route_thresholds(router, message, path, confidence, reasons):
+    decision = router.route(message)
+    assert (decision.path, decision.confidence, decision.reasons) == (path, confidence, reasons)
+
+
+def test_long_message_needs_price_to_stay_on_catalog(router):
+    long_tail = " 그리고 이번 주말에 가족들이랑 같이 쓸 수 있고 포장도 예쁘게 해주는 곳이면 좋겠어요"
+    assert router.route("커피" + long_tail).path == AGENT
+    assert router.route("3만원 이하 커피" + long_tail).path == CATALOG
+
+
+def test_confidence_equal_to_threshold_goes_to_catalog():
+    router = ChatRouter(load_intent_matcher(), threshold=0.7)
+    assert router.route("커피 추천해줘").path == CATALOG
+    router = ChatRouter(load_intent_matcher(), threshold=0.71)
+    assert router.route("커피 추천해줘").path == AGENT
+
+
+def test_stats_report_share_and_latency():
+    router = ChatRouter(load_intent_matcher())
+    router.record(CATALOG, 0.002)
+    router.record(CATALOG, 0.004)
+    router.record(AGENT, 1.0)
+    router.record_catalog_miss()
+    stats = router.stats()
+    assert stats["requests"] == 3
+    assert stats["paths"][CATALOG] == {"count": 2, "share": 0.6667, "avg_latency_ms": 3.0}
+    assert stats["catalog_misses"] == 1
@@ -0,0 +1,54 @@
+import json
+
+from fastapi.testclient import TestClient
+
+
+def _frames(body: str):
+    """SSE 응답 본문을 (이벤트, 데이터) 목록으로 변환"""
+    frames = []
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        lines = block.split("\n")
+        assert lines[0].startswith("event: ") and lines[1].startswith("data: ") and len(lines) == 2
+        frames.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+    return frames
+
+
+def test_format_sse_keeps_one_data_line(main_module):
+    frame = main_module.format_sse({"event": "token", "data": {"token": "첫 줄\n둘째 줄"}})
+    assert frame.endswith("\n\n")
+    assert _frames(frame) == [("token", {"token": "첫 줄\n둘째 줄"})]
+
+
+def test_stream_frames_tokens_then_done(main_module, monkeypatch):
+    async def fake_events(message, intent=None):
+        yield {"event": "token", "data": {"token": "안녕"}}
+        yield {"event": "token", "data": {"token": "하세요"}}
+        yield {"event": "done", "data": {"response": "안녕하세요", "products": []}}
+
+    monkeypatch.setattr(main_module, "keyword_reply_events", fake_events)
+    response = TestClient(main_module.app).post("/api/chat/stream", json={"message": "커피", "user_id": "u1"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = _frames(response.text)
+    assert [event for event, _ in frames] == ["token", "token", "done"]
+    done = frames[-1][1]
+    assert done["response"] == "안녕하세요"
+    assert done["ttfb_ms"] <= done["total_ms"]
+
+
+def test_stream_error_is_logged_and_sent_as_error_event(main_module, monkeypatch):
+    errors = []
+
+    async def failing_events(message, intent=None):
+        yield {"event": "token", "data": {"token": "안녕"}}
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(main_module, "keyword_reply_events", failing_events)
+    monkeypatch.setattr(main_module, "log_error", lambda *args, **kwargs: errors.append(args))
+    response = TestClient(main_module.app).post("/api/chat/stream", json={"message": "커피", "user_id": "u1"})
+
+    assert [event for event, _ in _frames(response.text)] == ["token", "error"]
+    assert errors and errors[0][0] == "CHAT_STREAM_ERROR"
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+import db
+
+
+def _configure(monkeypatch, handler):
+    requests = []
+
+    def recording(request):
+        requests.append(request)
+        return handler(request)
+
+    monkeypatch.setattr(db, "_rest_client", None)
+    db.configure("http://supabase.test", transport=httpx.MockTransport(recording))
+    return requests
+
+
+def _query(request):
+    return parse_qs(urlparse(str(request.url)).query)
+
+
+def test_update_preferences_of_existing_user_only_patches(monkeypatch):
+    requests = _configure(monkeypatch, lambda request: httpx.Response(200, json=[{"id": "u1"}]))
+    asyncio.run(db.update_user_preferences("u1", {"categories": ["food"]}))
+
+    assert [r.method for r in requests] == ["PATCH"]
+    assert _query(requests[0])["id"] == ["eq.u1"]
+    assert json.loads(requests[0].content) == {"preferences": {"categories": ["food"]}}
+
+
+def test_update_preferences_creates_missing_user(monkeypatch):
+    def handler(request):
+        if request.method == "PATCH":
+            return httpx.Response(200, json=[])
+        return httpx.Response(201, json=json.loads(request.content))
+
+    requests = _configure(monkeypatch, handler)
+    asyncio.run(db.update_user_preferences("u1", {"categories": ["food"]}))
+
+    assert [r.method for r in requests] == ["PATCH", "POST"]
+    assert "resolution=ignore-duplicates" in requests[1].headers["Prefer"]
+    assert json.loads(requests[1].content) == [{"id": "u1", "name": "u1", "preferences": {"categories": ["food"]}}]
+
+
+def test_update_preferences_patches_again_after_concurrent_insert(monkeypatch):
+    patched = []
+
+    def handler(request):
+        if request.method == "PATCH":
+            patched.append(request)
+            return httpx.Response(200, json=[] if len(patched) == 1 else [{"id": "u1"}])
+        return httpx.Response(201, json=[])
+
+    requests = _configure(monkeypatch, handler)
+    asyncio.run(db.update_user_preferences("u1", {"categories": ["food"]}))
+    assert [r.method for r in requests] == ["PATCH", "POST", "PATCH"]
+
+
+def test_user_preferences_are_cached_until_updated(monkeypatch):
+    monkeypatch.setattr(db, "users_cache", db.ReadThroughCache(maxsize=10, ttl=60))
+
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, json=[{"id": "u1", "preferences": {}}])
+        return httpx.Response(200, json=[{"id": "u1"}])
+
+    requests = _configure(monkeypatch, handler)
+
+    async def scenario():
+        await db.get_user_preferences("u1")
+        await db.get_user_preferences("u1")
+        await db.update_user_preferences("u1", {"categories": ["food"]})
+        await db.get_user_preferences("u1")
+
+    asyncio.run(scenario())
+    assert [r.method for r in requests] == ["GET", "PATCH", "GET"]
+
+
+def test_upsert_products_merges_duplicates(monkeypatch):
+    requests = _configure(monkeypatch, lambda request: httpx.Response(201))
+    asyncio.run(db.upsert_products([{"id": "p1", "name": "사과"}]))
+
+    assert requests[0].method == "POST"
+    assert requests[0].headers["Prefer"] == "return=minimal,resolution=merge-duplicates"
+
+
+def test_bulk_lookup_quotes_ids_and_splits_chunks(monkeypatch):
+    requests = _configure(monkeypatch, lambda request: httpx.Response(200, json=[]))
+    asyncio.run(db.get_products_by_ids(["a,b", "c", "d"], chunk_size=2))
+
+    assert sorted(_query(r)["id"][0] for r in requests) == ['in.("a,b","c")', 'in.("d")']
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from events import EventPipeline, EventQueueFull, JsonlEventSink, validate_event
+
+
+def _event(i):
+    return {"user_id": f"u{i}", "product_id": f"p{i}", "interaction_type": "view", "created_at": "2026-01-01T00:00:00+00:00"}
+
+
+class RecordingSink:
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.batches = []
+
+    async def write(self, events):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("sink unavailable")
+        self.batches.append(list(events))
+
+
+def test_flushes_by_size_and_interval():
+    async def scenario():
+        sink = RecordingSink()
+        flushed = []
+        pipeline = EventPipeline(sink, batch_size=3, flush_interval=0.05, on_flush=flushed.extend)
+        pipeline.start()
+        await pipeline.publish([_event(i) for i in range(4)])
+        await asyncio.sleep(0.2)
+        assert [len(b) for b in sink.batches] == [3, 1]
+        assert len(flushed) == 4
+        await pipeline.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_waits_for_partial_batch_and_inflight_write():
+    async def scenario():
+        sink = RecordingSink(delay=0.05)
+        pipeline = EventPipeline(sink, batch_size=2, flush_interval=10.0)
+        pipeline.start()
+        await pipeline.publish([_event(i) for i in range(5)])
+        # 첫 배치 기록 중이고 다음 배치를 모으는 중에 종료
+        await asyncio.sleep(0.01)
+        await pipeline.stop()
+        assert sorted(e["user_id"] for b in sink.batches for e in b) == [f"u{i}" for i in range(5)]
+        assert pipeline.stats()["flushed"] == 5
+        assert pipeline.stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_retries_failed_flush_with_backoff():
+    async def scenario():
+        sink = RecordingSink(failures=2)
+        pipeline = EventPipeline(sink, batch_size=10, flush_interval=0.01, retry_backoff=0.001)
+        pipeline.start()
+        await pipeline.publish([_event(0)])
+        await pipeline.stop()
+        assert len(sink.batches) == 1
+        assert pipeline.stats()["retries"] == 2
+        assert pipeline.stats()["failed"] == 0
+
+        sink = RecordingSink(failures=10)
+        pipeline = EventPipeline(sink, batch_size=10, flush_interval=0.01, max_retries=1, retry_backoff=0.001)
+        pipeline.start()
+        await pipeline.publish([_event(0), _event(1)])
+        await pipeline.stop()
+        assert sink.batches == []
+        assert pipeline.stats()["failed"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_events():
+    async def scenario():
+        pipeline = EventPipeline(RecordingSink(), max_queue=2)
+        await pipeline.publish([_event(0), _event(1)])
+        with pytest.raises(EventQueueFull):
+            await pipeline.publish([_event(2)])
+        assert pipeline.stats()["rejected"] == 1
+        await pipeline.stop()
+        assert pipeline.stats()["flushed"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_jsonl_sink_round_trip(tmp_path):
+    async def scenario():
+        sink = JsonlEventSink(str(tmp_path / "events.jsonl"))
+        events = [validate_event(_event(i)) for i in range(3)]
+        await sink.write(events)
+        assert await sink.read() == events
+        assert await sink.read(since="2026-01-02T00:00:00+00:00") == []
+
+    asyncio.run(scenario())
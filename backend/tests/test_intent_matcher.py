@@ -0,0 +1,66 @@
+import pytest
+
+from intent_matcher import load_intent_matcher
+from search_index import SearchIndex
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return load_intent_matcher()
+
+
+@pytest.mark.parametrize("message, min_price, max_price", [
+    ("3만원 이하 건강", None, 30000),
+    ("2만 원 이하", None, 20000),
+    ("2만 원 이상", 20000, None),
+    ("3 만원 미만", None, 29999),
+    ("1만 5천원 이하", None, 15000),
+    ("5천원대", 5000, 5999),
+    ("만원대 커피", 10000, 19999),
+    ("천원 이하", None, 1000),
+    ("3만원 초과 5만원 미만", 30001, 49999),
+    ("1,000원 이하", None, 1000),
+])
+def test_price_expressions(matcher, message, min_price, max_price):
+    intent = matcher.match(message)
+    assert (intent.min_price, intent.max_price) == (min_price, max_price)
+
+
+def test_price_hint_only_without_amount(matcher):
+    assert matcher.match("만원 정도 선물").max_price == 30000
+    assert matcher.match("저렴한 커피").max_price == 30000
+    # 숫자 없는 단위가 다른 단어의 일부이면 금액으로 보지 않음
+    assert matcher.match("만족스러운 음식").max_price is None
+
+
+def test_matched_keywords_only_include_applied_keywords(matcher):
+    # 금액이 있으면 "만원" 힌트는 적용되지 않으므로 보고하지 않음
+    assert matcher.match("3만원 이하 건강").matched_keywords == ["건강", "이하"]
+    assert matcher.match("2만 원 이상").matched_keywords == ["이상"]
+    # 금액과 떨어져 있는 한정어는 적용되지 않음
+    intent = matcher.match("3만원 커피 이하")
+    assert intent.max_price == 30000
+    assert intent.matched_keywords == ["커피"]
+    assert matcher.match("저렴한 커피 2만원").matched_keywords == ["커피"]
+
+
+def test_categories_and_escalation(matcher):
+    intent = matcher.match("운동이랑 커피 중 뭐가 좋아?")
+    assert intent.categories == ["food", "health"]
+    assert intent.escalation_keywords == ["뭐가 좋"]
+
+
+def test_search_text_drops_consumed_price_phrases(matcher):
+    assert matcher.match("3만원 이하 건강").search_text == "건강"
+    assert matcher.match("2만 원 이상인 커피 추천").search_text == "커피 추천"
+    assert matcher.match("저렴한 커피").search_text == "커피"
+    # 적용되지 않은 한정어는 남김
+    assert matcher.match("3만원 커피 이하").search_text == "커피 이하"
+
+
+def test_price_words_do_not_match_vouchers(matcher):
+    index = SearchIndex()
+    index.add(0, {"id": "v1", "name": "배달의민족 2만원권", "category": "food", "description": "배달 상품권"})
+    index.add(1, {"id": "h1", "name": "건강검진 패키지", "category": "health", "description": "종합 검진"})
+    search_text = matcher.match("3만원 이하 건강").search_text
+    assert [p["id"] for p in index.search(search_text, mode="or")] == ["h1"]
@@ -0,0 +1,72 @@
+import json
+import os
+import time
+
+import journal
+from journal import Journal, replay
+
+
+def _write_lines(path, lines):
+    with open(path, "wb") as f:
+        f.write(b"".join(lines))
+
+
+def test_replay_returns_ops_in_order(tmp_path):
+    path = str(tmp_path / "data.journal")
+    j = Journal(path)
+    j.append([{"op": "a", "seq": 1}, {"op": "b", "seq": 2}])
+    j.append([{"op": "c", "seq": 3}])
+    j.close()
+
+    assert [op["seq"] for op in replay(path)] == [1, 2, 3]
+
+
+def test_replay_truncates_torn_last_line(tmp_path):
+    path = str(tmp_path / "data.journal")
+    good = json.dumps({"op": "a", "seq": 1}).encode() + b"\n"
+    _write_lines(path, [good, b'{"op": "b", "se'])
+
+    assert [op["seq"] for op in replay(path)] == [1]
+    assert os.path.getsize(path) == len(good)
+
+
+def test_replay_stops_at_corrupt_line(tmp_path):
+    path = str(tmp_path / "data.journal")
+    good = json.dumps({"op": "a", "seq": 1}).encode() + b"\n"
+    _write_lines(path, [good, b"not json\n", json.dumps({"op": "c", "seq": 3}).encode() + b"\n"])
+
+    assert [op["seq"] for op in replay(path)] == [1]
+    assert os.path.getsize(path) == len(good)
+
+
+def test_replay_missing_file(tmp_path):
+    assert list(replay(str(tmp_path / "missing.journal"))) == []
+
+
+def test_truncate_before_keeps_later_records(tmp_path):
+    path = str(tmp_path / "data.journal")
+    j = Journal(path)
+    j.append([{"op": "a", "seq": 1}])
+    offset = j.tell()
+    j.append([{"op": "b", "seq": 2}])
+    j.truncate_before(offset)
+    j.append([{"op": "c", "seq": 3}])
+    j.close()
+
+    assert [op["seq"] for op in replay(path)] == [2, 3]
+
+
+def test_interval_policy_fsyncs_without_further_appends(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(journal.os, "fsync", lambda fd: synced.append(fd))
+    j = Journal(str(tmp_path / "data.journal"), fsync_policy="interval", fsync_interval=0.1)
+
+    j.append([{"op": "a", "seq": 1}])
+    j.append([{"op": "b", "seq": 2}])
+    assert synced == []
+
+    deadline = time.monotonic() + 2
+    while not synced and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(synced) == 1
+    j.close()
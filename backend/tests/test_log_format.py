@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+
+from log_viewer import get_log_stats, parse_chat_logs, parse_log_line, read_log_records
+from logger_config import JsonLinesFormatter
+
+
+def _record(name, level, message, fields=None, request_id=None, exc_text=None):
+    record = logging.LogRecord(name, level, __file__, 1, message, None, None)
+    if fields is not None:
+        record.fields = fields
+    record.request_id = request_id
+    record.exc_text = exc_text
+    return record
+
+
+def _write_log(filename, lines):
+    os.makedirs("logs", exist_ok=True)
+    with open(os.path.join("logs", filename), "w", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in lines)
+
+
+def test_json_lines_keep_field_types():
+    formatter = JsonLinesFormatter()
+    line = formatter.format(_record(
+        "CHAT", logging.INFO, "요약 메시지",
+        fields={"user_id": "u1", "message": "커피 | 추천", "products_count": 3}, request_id="r1"
+    ))
+    record = parse_log_line(line)
+
+    assert record["logger"] == "CHAT"
+    assert record["level"] == "INFO"
+    assert record["request_id"] == "r1"
+    # 구분자가 들어 있는 메시지와 숫자 필드도 그대로 복원
+    assert record["message"] == "커피 | 추천"
+    assert record["products_count"] == 3
+
+    plain = parse_log_line(formatter.format(_record("SYSTEM", logging.ERROR, "실패", exc_text="Traceback ...")))
+    assert (plain["message"], plain["exception"]) == ("실패", "Traceback ...")
+
+
+def test_text_and_broken_lines():
+    assert parse_log_line("2025-01-01 10:00:00,000 - API - INFO - GET / - 끝") == {
+        "timestamp": "2025-01-01 10:00:00,000", "logger": "API", "level": "INFO", "message": "GET / - 끝"
+    }
+    assert parse_log_line("") is None
+    assert parse_log_line('{"timestamp": "2025-01-01T10:00:00"') is None
+    assert parse_log_line("잘린 줄") is None
+
+
+def test_mixed_text_and_json_log_files():
+    formatter = JsonLinesFormatter()
+    _write_log("chat_interactions.log", [
+        "2025-01-01 10:00:00,000 - CHAT - INFO - User: u1 | Message: '커피' | Products: 2 | Response: '...'",
+        formatter.format(_record("CHAT", logging.INFO, "", fields={"user_id": "u2", "message": "건강", "products_count": 1})),
+        '{"broken": ',
+    ])
+
+    interactions = parse_chat_logs()
+    assert len(interactions) == 2
+    assert (interactions[1]["user_id"], interactions[1]["products_count"]) == ("u2", 1)
+    assert [r["logger"] for r in read_log_records("chat_interactions.log")] == ["CHAT", "CHAT"]
+
+
+def test_stats_count_levels_of_json_lines():
+    formatter = JsonLinesFormatter()
+    _write_log("errors.log", [
+        formatter.format(_record("ERROR", logging.ERROR, "", fields={"error_type": "X", "error_message": "INFO 아님"})),
+        formatter.format(_record("SYSTEM", logging.INFO, "", fields={"event": "ERROR 단어 포함"})),
+        json.dumps({"level": "WARNING"}),
+    ])
+    stats = get_log_stats("errors.log")
+    assert (stats["total_lines"], stats["error_count"], stats["info_count"]) == (3, 1, 1)
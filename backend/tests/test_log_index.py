@@ -0,0 +1,89 @@
+import os
+import time
+
+import pytest
+
+from log_index import LogIndex, _normalize_timestamp
+
+
+def _write(path, lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in lines)
+
+
+@pytest.fixture
+def index(tmp_path):
+    os.makedirs("logs", exist_ok=True)
+    log_index = LogIndex(str(tmp_path / "index.db"))
+    yield log_index
+    log_index.close()
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_refresh_indexes_only_new_lines_across_rollover(index):
+    _write("logs/app.log", [
+        "2025-01-01 10:00:00,000 - app - INFO - 커피 주문",
+        "2025-01-01 10:00:01,000 - app - ERROR - 결제 실패",
+    ])
+    assert index.refresh("app.log") == 2
+    assert index.refresh("app.log") == 0
+
+    # 쓰는 중인(개행 없는) 줄은 완성된 뒤에 색인
+    with open("logs/app.log", "a", encoding="utf-8") as f:
+        f.write("2025-01-01 10:00:02,000 - app - INFO - 건강")
+    assert index.refresh("app.log") == 0
+    _write("logs/app.log", [" 검진 예약"])
+    assert index.refresh("app.log") == 1
+
+    # 롤오버는 이름만 바뀌므로 다시 읽지 않고 새 파일만 색인
+    os.rename("logs/app.log", "logs/app.log.1")
+    _write("logs/app.log", ["2025-01-01 10:00:03,000 - app - INFO - 커피 환불"])
+    assert index.refresh("app.log") == 1
+    assert index.stats()["lines"] == 4
+
+    found = index.search("app.log", "커피")
+    assert [(r["file"], r["line_number"]) for r in found["results"]] == [("app.log", 1), ("app.log.1", 1)]
+
+    # 롤오버로 삭제된 파일의 줄은 색인에서 빠짐
+    os.remove("logs/app.log.1")
+    assert index.search("app.log")["total"] == 1
+
+
+def test_query_matches_words_like_product_search(index):
+    _write("logs/app.log", [
+        "2025-01-01 10:00:00,000 - app - INFO - 커피를 추천했습니다",
+        "2025-01-01 10:00:01,000 - app - INFO - 커스텀 설정",
+        "2025-01-01 10:00:02,000 - app - INFO - 건강검진 예약",
+    ])
+    assert [r["line_number"] for r in index.search("app.log", "커피")["results"]] == [1]
+    # 접두어 일치가 아니므로 한 음절 질의로 "커스텀"까지 걸리지 않음
+    assert index.search("app.log", "커")["total"] == 0
+    assert index.search("app.log", "커피 건강", mode="and")["total"] == 0
+    assert index.search("app.log", "커피 건강", mode="or")["total"] == 2
+
+
+def test_timestamps_are_compared_in_utc(index, new_york):
+    _write("logs/app.log", [
+        # 현지 시각 (겨울 UTC-5, 여름 UTC-4)
+        "2025-01-15 07:00:00,000 - app - INFO - 겨울",
+        "2025-07-15 07:00:00,000 - app - INFO - 여름",
+        '{"timestamp": "2025-07-15T10:30:00+00:00", "logger": "app", "level": "INFO", "message": "UTC"}',
+    ])
+    assert _normalize_timestamp("2025-01-15 07:00:00,000") == "2025-01-15T12:00:00.000+00:00"
+    assert _normalize_timestamp("2025-07-15T07:00:00") == "2025-07-15T11:00:00.000+00:00"
+
+    found = index.search("app.log", since="2025-07-15T10:00:00+00:00")
+    assert [r["line_number"] for r in found["results"]] == [3, 2]
+    found = index.search("app.log", until="2025-07-15T07:00:00")
+    assert [r["line_number"] for r in found["results"]] == [3, 1]
+
+    with pytest.raises(ValueError):
+        index.search("app.log", since="어제")
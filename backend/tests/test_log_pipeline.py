@@ -0,0 +1,78 @@
+import logging
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+from log_pipeline import LogPipeline
+
+
+def _logger(pipeline, name, path, **handler_options):
+    handler = RotatingFileHandler(path, **handler_options)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    pipeline.register(name, [handler])
+    logger = logging.getLogger(name)
+    logger.handlers = [pipeline.handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger, handler
+
+
+def test_records_are_written_in_order_when_stopped(tmp_path):
+    pipeline = LogPipeline(batch_size=4)
+    logger, handler = _logger(pipeline, "test.order", tmp_path / "order.log")
+    pipeline.start()
+    for i in range(10):
+        logger.info("줄 %d", i)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("실패")
+    pipeline.stop()
+    handler.close()
+
+    text = (tmp_path / "order.log").read_text(encoding="utf-8")
+    assert text.splitlines()[:10] == [f"INFO 줄 {i}" for i in range(10)]
+    # 예외 정보는 큐에 넣기 전에 문자열로 만들어 둠
+    assert "ValueError: boom" in text
+    stats = pipeline.stats()
+    assert (stats["enqueued"], stats["written"], stats["dropped"]) == (11, 11, 0)
+    assert stats["batches"] >= 3
+
+
+def test_drop_policy_counts_dropped_records_per_logger(tmp_path):
+    pipeline = LogPipeline(max_queue=2, policy="drop")
+    logger, handler = _logger(pipeline, "test.drop", tmp_path / "drop.log")
+    # 리스너를 시작하기 전이므로 큐가 바로 가득 참
+    for i in range(5):
+        logger.info("줄 %d", i)
+    assert pipeline.stats()["dropped_by_logger"] == {"test.drop": 3}
+
+    pipeline.start()
+    pipeline.stop()
+    handler.close()
+    assert (tmp_path / "drop.log").read_text(encoding="utf-8").splitlines() == ["INFO 줄 0", "INFO 줄 1"]
+
+
+def test_block_policy_waits_then_drops(tmp_path):
+    pipeline = LogPipeline(max_queue=1, policy="block", block_timeout=0.01)
+    logger, handler = _logger(pipeline, "test.block", tmp_path / "block.log")
+    logger.info("첫 줄")
+    logger.info("둘째 줄")
+    assert pipeline.stats()["dropped"] == 1
+    handler.close()
+
+
+def test_rollover_is_checked_per_record(tmp_path):
+    pipeline = LogPipeline(batch_size=100)
+    logger, handler = _logger(pipeline, "test.rotate", tmp_path / "rotate.log", maxBytes=40, backupCount=5)
+    for i in range(6):
+        logger.info("%d번째 레코드", i)
+    pipeline.start()
+    pipeline.stop()
+    handler.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["rotate.log", "rotate.log.1", "rotate.log.2"]
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        LogPipeline(policy="spill")
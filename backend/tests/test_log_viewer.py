@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+import log_viewer
+from log_viewer import read_log_file
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def rotated_log(monkeypatch):
+    os.makedirs("logs", exist_ok=True)
+    # 블록 경계에 줄과 한글 바이트가 걸치도록 블록을 작게 함
+    monkeypatch.setattr(log_viewer, "TAIL_BLOCK_SIZE", 7)
+    _write("logs/app.log.2", "".join(f"오래된 {i}\n" for i in range(3)))
+    _write("logs/app.log.1", "".join(f"이전 {i}\n" for i in range(3)))
+    _write("logs/app.log", "현재 0\n현재 1\n쓰는 중")
+    return "app.log"
+
+
+def test_tail_continues_into_rotated_files(rotated_log):
+    assert read_log_file(rotated_log, 2) == ["현재 1\n", "쓰는 중"]
+    assert read_log_file(rotated_log, 5) == ["이전 1\n", "이전 2\n", "현재 0\n", "현재 1\n", "쓰는 중"]
+    assert read_log_file(rotated_log, 8)[:2] == ["오래된 1\n", "오래된 2\n"]
+    assert len(read_log_file(rotated_log, 100)) == 9
+
+
+def test_tail_without_rotation_and_full_read(rotated_log):
+    assert read_log_file(rotated_log, 5, rotated=False) == ["현재 0\n", "현재 1\n", "쓰는 중"]
+    lines = read_log_file(rotated_log, 0)
+    assert lines[0] == "오래된 0\n"
+    assert lines[-1] == "쓰는 중"
+
+
+def test_missing_current_file_still_reads_rotated_files(rotated_log):
+    os.remove("logs/app.log")
+    assert read_log_file(rotated_log, 2) == ["이전 1\n", "이전 2\n"]
+    assert read_log_file("없는파일.log", 10) == []
+
+
+def test_empty_lines_in_the_middle_are_kept(monkeypatch):
+    os.makedirs("logs", exist_ok=True)
+    monkeypatch.setattr(log_viewer, "TAIL_BLOCK_SIZE", 3)
+    _write("logs/gap.log", "a\n\n\nb\n")
+    assert read_log_file("gap.log", 3) == ["\n", "\n", "b\n"]
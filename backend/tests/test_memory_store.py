@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+from agent.memory_store import SessionMemoryStore
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _count(text):
+    return len(text)
+
+
+def test_window_stays_within_token_budget_and_keeps_last_turn():
+    async def scenario():
+        summaries = []
+
+        async def summarizer(summary, messages):
+            summaries.append(messages)
+            return "요약"
+
+        store = SessionMemoryStore(token_budget=10, token_counter=_count, summarizer=summarizer)
+        for i in range(5):
+            await store.append_turn("u1", f"질문{i}", f"답변{i}")
+        summary, messages = await store.get("u1")
+
+        assert summary == "요약"
+        assert messages[-2:] == [("human", "질문4"), ("ai", "답변4")]
+        assert sum(len(c) for _, c in messages) <= 10
+        assert [m for batch in summaries for m in batch][0] == ("human", "질문0")
+
+        # 예산보다 긴 마지막 턴도 남김
+        await store.append_turn("u2", "아주 긴 질문입니다", "아주 긴 답변입니다")
+        assert len((await store.get("u2"))[1]) == 2
+
+    asyncio.run(scenario())
+
+
+def test_least_recently_used_sessions_are_evicted_and_reloaded(tmp_path):
+    async def scenario():
+        store = SessionMemoryStore(max_sessions=2, persist_dir=str(tmp_path), token_counter=_count)
+        await store.append_turn("u1", "안녕", "반가워요")
+        await store.append_turn("u2", "커피", "추천해요")
+        await store.get("u1")
+        await store.append_turn("u3", "건강", "검진권")
+
+        stats = store.stats()
+        assert stats["sessions"] == 2
+        assert stats["evictions"] == 1
+        assert stats["total_tokens"] == len("안녕반가워요건강검진권")
+
+        # 내보낸 u2는 디스크에서 다시 읽음
+        assert await store.get("u2") == ("", [("human", "커피"), ("ai", "추천해요")])
+
+    asyncio.run(scenario())
+
+
+def test_idle_sessions_expire(tmp_path):
+    async def scenario():
+        clock = FakeClock()
+        store = SessionMemoryStore(idle_ttl=60, persist_dir=str(tmp_path), clock=clock)
+        await store.append_turn("u1", "안녕", "반가워요")
+        clock.now += 120
+        await store.append_turn("u2", "커피", "추천해요")
+        assert store.stats()["sessions"] == 1
+        assert (await store.get("u1"))[1] == [("human", "안녕"), ("ai", "반가워요")]
+
+    asyncio.run(scenario())
+
+
+def test_disk_io_runs_off_the_event_loop_thread(tmp_path):
+    async def scenario():
+        store = SessionMemoryStore(max_sessions=1, persist_dir=str(tmp_path))
+        threads = []
+        original_save, original_load = store._save, store._load
+
+        def save(session):
+            threads.append(threading.current_thread())
+            original_save(session)
+
+        def load(user_id):
+            threads.append(threading.current_thread())
+            return original_load(user_id)
+
+        store._save, store._load = save, load
+        await store.append_turn("u1", "안녕", "반가워요")
+        await store.append_turn("u2", "커피", "추천해요")
+        await store.get("u1")
+        await store.save_all()
+
+        assert threads
+        assert all(thread is not threading.main_thread() for thread in threads)
+
+    asyncio.run(scenario())
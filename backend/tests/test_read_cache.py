@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from read_cache import ReadThroughCache
+
+
+class SlowLoader:
+    def __init__(self, value="v", error=None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.value
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = ReadThroughCache()
+        loader = SlowLoader()
+        waiters = [asyncio.create_task(cache.get("k", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        assert await asyncio.gather(*waiters) == ["v"] * 5
+        assert loader.calls == 1
+        assert await cache.get("k", loader) == "v"
+        stats = cache.stats()
+        assert (stats["misses"], stats["collapsed"], stats["hits"]) == (1, 4, 1)
+
+    asyncio.run(scenario())
+
+
+def test_load_error_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        cache = ReadThroughCache()
+        loader = SlowLoader(error=OSError("down"))
+        waiters = [asyncio.create_task(cache.get("k", loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(r, OSError) for r in results)
+        assert loader.calls == 1
+
+        loader.error = None
+        assert await cache.get("k", loader) == "v"
+        assert loader.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_first_caller_does_not_cancel_the_load():
+    async def scenario():
+        cache = ReadThroughCache()
+        loader = SlowLoader()
+        first = asyncio.create_task(cache.get("k", loader))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get("k", loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        loader.release.set()
+        assert await second == "v"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert loader.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_during_load_discards_the_result():
+    async def scenario():
+        cache = ReadThroughCache()
+        loader = SlowLoader(value="old")
+        waiter = asyncio.create_task(cache.get("k", loader))
+        await asyncio.sleep(0)
+        cache.invalidate("k")
+        loader.release.set()
+        assert await waiter == "old"
+
+        # 무효화 전에 시작한 조회 결과는 저장하지 않으므로 다시 읽음
+        loader.value = "new"
+        assert await cache.get("k", loader) == "new"
+        assert loader.calls == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+
+import recommendation
+from recommendation import ProductColumns, RecommendationEngine
+
+
+def _product(i, category="food", price=10000, rating=4.0):
+    return {"id": f"p{i}", "name": f"상품 {i}", "category": category, "price": price, "rating": rating}
+
+
+def _assert_same_columns(actual, expected):
+    assert [p["id"] for p in actual.products] == [p["id"] for p in expected.products]
+    assert np.array_equal(actual.ratings, expected.ratings)
+    assert np.array_equal(actual.prices, expected.prices)
+    assert np.array_equal(actual.product_hashes, expected.product_hashes)
+    names = {code: name for name, code in actual.category_codes_by_name.items()}
+    expected_names = {code: name for name, code in expected.category_codes_by_name.items()}
+    assert [names[c] for c in actual.category_codes] == [expected_names[c] for c in expected.category_codes]
+
+
+def test_with_products_appends_and_patches_rows():
+    base = [_product(i) for i in range(5)]
+    columns = ProductColumns(base)
+
+    changed = [_product(2, category="health", price=5000, rating=2.5), _product(5, category="life")]
+    updated = columns.with_products(changed)
+
+    _assert_same_columns(updated, ProductColumns([base[0], base[1], changed[0], base[3], base[4], changed[1]]))
+    # 기존 열 데이터는 그대로
+    _assert_same_columns(columns, ProductColumns(base))
+
+
+class FakeRepository:
+    def __init__(self, products):
+        self.products = products
+        self.loads = 0
+
+    async def get_products(self, category=None, max_price=None):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return list(self.products)
+
+
+def test_get_columns_loads_once_and_applies_added_products(monkeypatch):
+    repository = FakeRepository([_product(i) for i in range(3)])
+    monkeypatch.setattr(recommendation, "get_repository", lambda: repository)
+    engine = RecommendationEngine()
+
+    async def scenario():
+        first = await asyncio.gather(*(engine._get_columns() for _ in range(10)))
+        assert repository.loads == 1
+        assert all(columns is first[0] for columns in first)
+
+        engine.on_product_added(_product(3, category="health"))
+        columns = await engine._get_columns()
+        assert repository.loads == 1
+        assert [p["id"] for p in columns.products] == ["p0", "p1", "p2", "p3"]
+        assert len(columns.base_scores) == 4
+        assert len(first[0]) == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,81 @@
+import asyncio
+
+import recommendation
+from recommendation import RecommendationEngine
+from recommendation_store import RecommendationStore
+
+
+class FakeRepository:
+    def __init__(self, products, preferences):
+        self.products = products
+        self.preferences = preferences
+
+    async def get_products(self, category=None, max_price=None):
+        return list(self.products)
+
+    async def get_user_preferences(self, user_id):
+        return self.preferences.get(user_id)
+
+    async def get_users_preferences(self, user_ids):
+        return {user_id: self.preferences[user_id] for user_id in user_ids if user_id in self.preferences}
+
+
+def _setup(monkeypatch, ttl=600.0):
+    products = [
+        {"id": f"{category}{i}", "category": category, "price": 20000 + i * 1000, "rating": rating}
+        for category, rating in (("food", 4.0), ("education", 5.0))
+        for i in range(5)
+    ]
+    preferences = {
+        "food_fan": {"preferences": {"categories": ["food"]}},
+        "edu_fan": {"preferences": {"categories": ["education"]}},
+    }
+    repository = FakeRepository(products, preferences)
+    monkeypatch.setattr(recommendation, "get_repository", lambda: repository)
+    engine = RecommendationEngine(seed=1)
+    store = RecommendationStore(lambda: engine, top_n=3, ttl=ttl)
+    return repository, engine, store
+
+
+def _add(repository, engine, store, product):
+    repository.products.append(product)
+    engine.on_product_added(product)
+    store.invalidate_products([product])
+
+
+def test_product_scores_match_engine_scores(monkeypatch):
+    _, engine, store = _setup(monkeypatch)
+    recommendations = asyncio.run(store.get_or_compute("food_fan", 3))
+    scores = engine.product_scores(["food_fan"] * 3, [["food"]] * 3, recommendations[0])
+    assert round(float(scores[0]), 2) == recommendations[0]["recommendation_score"]
+
+
+def test_invalidates_only_users_the_product_can_reach(monkeypatch):
+    repository, engine, store = _setup(monkeypatch)
+
+    async def scenario():
+        await store.get_or_compute("food_fan", 3)
+        await store.get_or_compute("edu_fan", 3)
+
+        # 선호 카테고리 보너스 없이는 어느 사용자의 상위 3개에도 못 드는 상품
+        _add(repository, engine, store, {"id": "weak", "category": "education", "price": 90000, "rating": 1.0})
+        assert store.get("food_fan", 3) is not None
+        assert store.get("edu_fan", 3) is not None
+
+        # 음식 선호 사용자의 목록에는 들어가는 상품
+        strong = {"id": "strong", "category": "food", "price": 15000, "rating": 4.3}
+        _add(repository, engine, store, strong)
+        assert store.get("food_fan", 3) is None
+        assert store.get("edu_fan", 3) is not None
+
+        recommendations = await store.get_or_compute("food_fan", 3)
+        assert recommendations[0]["id"] == "strong"
+
+    asyncio.run(scenario())
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    _, _, store = _setup(monkeypatch, ttl=0.0)
+    asyncio.run(store.get_or_compute("food_fan", 3))
+    assert store.get("food_fan", 3) is None
+    assert store.stats()["users"] == 0
@@ -0,0 +1,34 @@
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+import db
+from repository import JsonRepository, SupabaseRepository, create_repository
+
+
+def test_default_backend_is_json(monkeypatch):
+    monkeypatch.delenv("DATA_BACKEND", raising=False)
+    assert isinstance(create_repository(), JsonRepository)
+
+
+def test_supabase_search_uses_word_matching(monkeypatch):
+    requests = []
+    candidates = [
+        {"id": "p1", "name": "아메리카노 쿠폰", "category": "food"},
+        {"id": "p2", "name": "노를 젓는 보트 체험", "category": "life"},
+    ]
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=candidates)
+
+    monkeypatch.setattr(db, "_rest_client", None)
+    db.configure("http://supabase.test", transport=httpx.MockTransport(handler))
+
+    products = asyncio.run(SupabaseRepository().search_products("아메리카노를 추천", limit=5))
+
+    assert [p["id"] for p in products] == ["p1"]
+    params = parse_qs(urlparse(str(requests[0].url)).query)
+    assert "name.ilike.*아메*" in params["or"][0]
+    assert "아메리카노를 추천" not in params["or"][0]
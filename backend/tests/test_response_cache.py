@@ -0,0 +1,61 @@
+import asyncio
+
+from response_cache import ResponseCache, normalize_message
+
+
+class FakeRepository:
+    catalog_version = 0
+
+
+def test_equivalent_messages_share_a_key():
+    assert normalize_message("  커피   추천해줘?! ") == normalize_message("커피 추천해줘") == "커피 추천해줘"
+    assert normalize_message("Coffee") == normalize_message("coffee~")
+    assert normalize_message("커피 추천") != normalize_message("커피추천")
+
+
+def test_entries_from_older_catalog_versions_are_not_reused():
+    cache = ResponseCache()
+    cache.set("커피", 1, "답변")
+    assert cache.get("커피", 1) == "답변"
+    assert cache.get("커피", 2) is None
+    # 버전이 다른 항목은 지워지므로 예전 버전으로도 다시 찾지 않음
+    assert cache.get("커피", 1) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_ttl_and_lru_eviction():
+    cache = ResponseCache(maxsize=2, ttl=0.0)
+    cache.set("a", 0, 1)
+    assert cache.get("a", 0) is None
+    assert cache.stats()["expired"] == 1
+
+    cache = ResponseCache(maxsize=2)
+    cache.set("a", 0, 1)
+    cache.set("b", 0, 2)
+    cache.get("a", 0)
+    cache.set("c", 0, 3)
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_chat_reply_is_rebuilt_after_catalog_changes(main_module, monkeypatch):
+    repository = FakeRepository()
+    built = []
+
+    async def build_chat_reply(message, intent=None):
+        built.append(message)
+        return True, [], f"{message} {repository.catalog_version}"
+
+    monkeypatch.setattr(main_module, "chat_response_cache", ResponseCache())
+    monkeypatch.setattr(main_module, "get_repository", lambda: repository)
+    monkeypatch.setattr(main_module, "build_chat_reply", build_chat_reply)
+
+    async def scenario():
+        first = await main_module.cached_chat_reply("커피 추천")
+        assert await main_module.cached_chat_reply("커피 추천") == first
+        repository.catalog_version += 1
+        return await main_module.cached_chat_reply("커피 추천")
+
+    assert asyncio.run(scenario())[2] == "커피 추천 1"
+    assert built == ["커피 추천", "커피 추천"]
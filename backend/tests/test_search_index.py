@@ -0,0 +1,54 @@
+import pytest
+
+from search_index import SearchIndex, tokenize
+
+PRODUCTS = [
+    {"id": "p1", "name": "스타벅스 아메리카노", "category": "food", "price": 4500, "description": "따뜻한 커피 한 잔"},
+    {"id": "p2", "name": "비빔밥 도시락", "category": "food", "price": 8000, "description": "점심 식사 지원"},
+    {"id": "p3", "name": "헬스장 이용권", "category": "health", "price": 50000, "description": "한 달 운동 이용권"},
+    {"id": "p4", "name": "커피 원두 세트", "category": "shopping", "price": 20000, "description": "원두 할인"},
+]
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    for doc_id, product in enumerate(PRODUCTS):
+        index.add(doc_id, product)
+    return index
+
+
+def _ids(products):
+    return [p["id"] for p in products]
+
+
+def test_tokenize_splits_korean_into_bigrams():
+    assert tokenize("비빔밥 Coffee 500g") == ["비빔", "빔밥", "coffee", "500g"]
+
+
+def test_word_with_particle_matches_stem(index):
+    assert set(_ids(index.search("커피를"))) == {"p1", "p4"}
+
+
+def test_single_syllable_matches_only_single_syllable_words(index):
+    # "비빔밥" 안의 "밥"은 색인하지 않음
+    assert _ids(index.search("밥")) == []
+    assert _ids(index.search("잔")) == ["p1"]
+
+
+def test_name_match_ranks_above_description_match(index):
+    assert _ids(index.search("커피")) == ["p4", "p1"]
+
+
+def test_and_mode_requires_every_word(index):
+    assert _ids(index.search("커피 할인")) == ["p4"]
+    assert set(_ids(index.search("커피 이용권", mode="or"))) == {"p1", "p3", "p4"}
+
+
+def test_limit_keeps_best_matches(index):
+    assert _ids(index.search("커피", limit=1)) == ["p4"]
+
+
+def test_unknown_mode_raises(index):
+    with pytest.raises(ValueError):
+        index.search("커피", mode="xor")
@@ -0,0 +1,50 @@
+import pytest
+
+from search_index import SearchIndex
+from sqlite_db import SQLiteDB
+
+PRODUCTS = [
+    {"id": "p1", "name": "스타벅스 아메리카노", "category": "food", "price": 4500, "description": "따뜻한 커피 한 잔"},
+    {"id": "p2", "name": "비빔밥 도시락", "category": "food", "price": 8000, "description": "점심 식사 지원"},
+    {"id": "p3", "name": "헬스장 이용권", "category": "health", "price": 50000, "description": "한 달 운동 이용권"},
+    {"id": "p4", "name": "커피 원두 세트", "category": "shopping", "price": 20000, "description": "원두 할인"},
+    {"id": "p5", "name": "영어 회화 강의", "category": "education", "price": 30000, "description": "온라인 강의"},
+    {"id": "p6", "name": "넷플릭스 구독", "category": "life", "price": 13500, "description": "OTT 구독 할인"},
+    {"id": "p7", "name": "요가 클래스", "category": "health", "price": 40000},
+    {"id": "p8", "name": "Coffee Beans 500g", "category": "shopping", "price": 15000, "description": "Arabica"},
+]
+
+QUERIES = [
+    "커피",
+    "커피를",
+    "밥",
+    "비빔밥",
+    "스타벅스 커피",
+    "헬스",
+    "강의를 듣고 싶어요",
+    "커피 할인",
+    "coffee",
+    "원두 coffee",
+    "구독",
+    "없는상품",
+]
+
+
+@pytest.fixture(scope="module")
+def backends(tmp_path_factory):
+    index = SearchIndex()
+    for doc_id, product in enumerate(PRODUCTS):
+        index.add(doc_id, product)
+    db = SQLiteDB(str(tmp_path_factory.mktemp("sqlite") / "search.db"), read_pool_size=1)
+    db.add_products(PRODUCTS)
+    yield index, db
+    db.close()
+
+
+@pytest.mark.parametrize("mode", ["and", "or"])
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_index_matches_sqlite_fts(backends, query, mode):
+    index, db = backends
+    expected = {p["id"] for p in index.search(query, mode=mode)}
+    assert {p["id"] for p in db.search_products(query, mode=mode)} == expected
+
@@ -0,0 +1,72 @@
+import random
+
+from search_index import tokenize
+from similarity import SimilarityIndex, price_band
+
+WORDS = ["사과", "비타민", "커피", "쿠폰", "영화", "도서", "세트", "치킨"]
+
+
+def _products(n, seed=1):
+    rng = random.Random(seed)
+    # 모든 상품이 "상품권"을 공유하므로 상품 수가 max_candidates 이하이면 모든 상품이 서로의 후보
+    return [
+        {
+            "id": f"p{i}",
+            "name": " ".join(rng.sample(WORDS, 2)) + " 상품권",
+            "description": "",
+            "category": rng.choice("abc"),
+            "price": rng.randint(1000, 100000),
+            "rating": round(rng.uniform(0, 5), 1),
+        }
+        for i in range(n)
+    ]
+
+
+def _reference_score(a, b):
+    score = 0.4 if a["category"] == b["category"] else 0.0
+    score += 0.2 * max(0.0, 1 - abs(price_band(a["price"]) - price_band(b["price"])) / 2)
+    score += 0.1 * (1 - min(abs(a["rating"] - b["rating"]), 5) / 5)
+    tokens_a = set(tokenize(f"{a['name']} {a['description']}"))
+    tokens_b = set(tokenize(f"{b['name']} {b['description']}"))
+    score += 0.3 * len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+    return score
+
+
+def _assert_exact_top_k(index, products, k):
+    by_id = {p["id"]: p for p in products}
+    for product in products:
+        result = index.similar(product["id"])
+        expected = sorted(
+            (_reference_score(product, other) for other in products if other is not product),
+            reverse=True
+        )[:k]
+        assert [r["similarity_score"] for r in result] == [round(s, 4) for s in expected]
+        for r in result:
+            assert r["id"] != product["id"]
+            assert r["similarity_score"] == round(_reference_score(product, by_id[r["id"]]), 4)
+
+
+def test_build_matches_brute_force_top_k():
+    products = _products(60)
+    _assert_exact_top_k(SimilarityIndex.build(products, k=5), products, 5)
+
+
+def test_incremental_add_matches_brute_force_top_k():
+    products = _products(60, seed=2)
+    index = SimilarityIndex.build(products[:20], k=5)
+    for product in products[20:]:
+        index.add(product)
+    _assert_exact_top_k(index, products, 5)
+
+
+def test_limit_unknown_and_duplicate_ids():
+    products = _products(30)
+    index = SimilarityIndex.build(products + products[:3], k=5)
+    assert len(index) == 30
+    index.add(products[0])
+    assert len(index) == 30
+
+    assert index.similar("missing") == []
+    assert len(index.similar("p0", limit=2)) == 2
+    scores = [r["similarity_score"] for r in index.similar("p0")]
+    assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from simple_db import SimpleDB
+
+
+def _product(i, category="food", price=None):
+    return {"id": f"p{i}", "name": f"상품 {i}", "category": category, "price": 1000 * i if price is None else price}
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / "products_data.json")
+
+
+def _ids(products):
+    return [p["id"] for p in products]
+
+
+def test_indexes_follow_commits(data_file):
+    db = SimpleDB(data_file, fsync_policy="never")
+    db.add_products([_product(1, price=3000), _product(2, "health", 1000), _product(3, price=2000)])
+    before = db.get_products(category="food")
+    db.add_product(_product(4, price=500))
+
+    assert _ids(before) == ["p1", "p3"]
+    assert _ids(db.get_products(category="food")) == ["p1", "p3", "p4"]
+    assert _ids(db.get_products(max_price=2000)) == ["p4", "p2", "p3"]
+    assert _ids(db.get_products(category="food", max_price=2000)) == ["p4", "p3"]
+    assert db.get_product("p4")["price"] == 500
+    db.close()
+
+
+
+def test_reads_share_snapshot_until_next_write(data_file):
+    db = SimpleDB(data_file, fsync_policy="never")
+    db.add_products([_product(1), _product(2, "health")])
+    snapshot = db.get_products()
+    category_snapshot = db.get_products(category="food")
+
+    assert db.get_products() is snapshot
+    assert db.get_products(category="food") is category_snapshot
+
+    db.add_product(_product(3))
+    assert _ids(snapshot) == ["p1", "p2"]
+    assert _ids(category_snapshot) == ["p1"]
+    assert _ids(db.get_products()) == ["p1", "p2", "p3"]
+    assert db.get_products(category="missing") == []
+    db.close()
+
+def test_writes_survive_restart_through_journal(data_file):
+    db = SimpleDB(data_file, compact_every=1000)
+    db.add_products([_product(1), _product(2, "health")])
+    db.update_user_preferences("u1", {"categories": ["food"]})
+    db.close()
+
+    reopened = SimpleDB(data_file)
+    assert _ids(reopened.get_products()) == ["p1", "p2"]
+    assert reopened.get_user("u1")["preferences"] == {"categories": ["food"]}
+    reopened.close()
+
+
+def test_compaction_writes_snapshot_and_empties_journal(data_file):
+    db = SimpleDB(data_file, compact_every=1000)
+    db.add_products([_product(i) for i in range(1, 4)])
+    db.compact()
+    db.add_product(_product(4))
+    db.close()
+
+    with open(data_file, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    assert snapshot["journal_seq"] == 3
+    assert _ids(snapshot["products"]) == ["p1", "p2", "p3"]
+    with open(data_file + ".journal", encoding="utf-8") as f:
+        assert [json.loads(line)["seq"] for line in f] == [4]
+
+    reopened = SimpleDB(data_file)
+    assert _ids(reopened.get_products()) == ["p1", "p2", "p3", "p4"]
+    reopened.close()
+
+
+def test_recovery_skips_journal_entries_already_in_snapshot(data_file):
+    # 스냅샷 교체 후 저널을 자르기 전에 중단된 경우
+    db = SimpleDB(data_file, compact_every=1000)
+    db.add_products([_product(1), _product(2)])
+    db.close()
+    with open(data_file + ".journal", "rb") as f:
+        journal_before = f.read()
+
+    db = SimpleDB(data_file, compact_every=1000)
+    db.compact()
+    db.close()
+    with open(data_file + ".journal", "ab") as f:
+        f.write(journal_before)
+
+    reopened = SimpleDB(data_file)
+    assert _ids(reopened.get_products()) == ["p1", "p2"]
+    reopened.close()
+
+
+def test_recovery_ignores_torn_journal_tail(data_file):
+    db = SimpleDB(data_file)
+    db.add_product(_product(1))
+    db.close()
+    with open(data_file + ".journal", "ab") as f:
+        f.write(b'{"op": "add_product", "product": {"id": "p2"')
+
+    reopened = SimpleDB(data_file)
+    assert _ids(reopened.get_products()) == ["p1"]
+    reopened.add_product(_product(3))
+    reopened.close()
+
+    assert _ids(SimpleDB(data_file).get_products()) == ["p1", "p3"]
+
+
+def test_cancelled_write_is_skipped_and_writer_keeps_running(data_file):
+    db = SimpleDB(data_file, fsync_policy="never")
+    # 첫 쓰기가 반영되는 동안 다음 요청들이 큐에서 기다리도록 잠금을 잡아 둠
+    db._write_lock.acquire()
+    try:
+        first = db._submit([{"op": "add_product", "product": _product(1)}])
+        for _ in range(200):
+            if first.running():
+                break
+            threading.Event().wait(0.01)
+        cancelled = db._submit([{"op": "add_product", "product": _product(2)}])
+        assert cancelled.cancel()
+        last = db._submit([{"op": "add_product", "product": _product(3)}])
+    finally:
+        db._write_lock.release()
+
+    first.result(timeout=5)
+    last.result(timeout=5)
+    assert cancelled.cancelled()
+    assert _ids(db.get_products()) == ["p1", "p3"]
+    db.close()
+
+
+def test_async_write_cancelled_by_caller(data_file):
+    db = SimpleDB(data_file, fsync_policy="never")
+
+    async def run():
+        db._write_lock.acquire()
+        try:
+            blocker = asyncio.ensure_future(db.add_product_async(_product(1)))
+            await asyncio.sleep(0.05)
+            task = asyncio.ensure_future(db.add_product_async(_product(2)))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.sleep(0)
+        finally:
+            db._write_lock.release()
+        await blocker
+        await db.add_product_async(_product(3))
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert _ids(db.get_products()) == ["p1", "p3"]
+    db.close()
+
+
+def test_commit_error_fails_only_its_group(data_file, monkeypatch):
+    db = SimpleDB(data_file, fsync_policy="never")
+    original_append = db._journal.append
+    calls = []
+
+    def failing_append(ops):
+        calls.append(ops)
+        if len(calls) == 1:
+            raise OSError("디스크 오류")
+        original_append(ops)
+
+    monkeypatch.setattr(db._journal, "append", failing_append)
+
+    async def run():
+        with pytest.raises(OSError):
+            await db.add_product_async(_product(1))
+        await db.add_product_async(_product(2))
+
+    asyncio.run(run())
+    assert _ids(db.get_products()) == ["p2"]
+    db.close()
+
+
+def test_listener_error_does_not_fail_write(data_file):
+    db = SimpleDB(data_file, fsync_policy="never")
+    seen = []
+
+    def broken(ops):
+        raise RuntimeError("리스너 오류")
+
+    db.add_listener(broken)
+    db.add_listener(seen.append)
+    asyncio.run(db.add_product_async(_product(1)))
+
+    assert _ids(db.get_products()) == ["p1"]
+    assert [op["op"] for ops in seen for op in ops] == ["add_product"]
+    db.close()
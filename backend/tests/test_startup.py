@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from startup import StartupProfiler
+
+
+def _warm_up(profiler):
+    async def scenario():
+        reports = []
+        profiler.start_warm_up(on_complete=reports.append)
+        await profiler._task
+        return reports
+
+    return asyncio.run(scenario())
+
+
+def test_optional_component_failure_does_not_block_readiness():
+    threads = []
+
+    def failing_agent():
+        raise RuntimeError("API 키 없음")
+
+    profiler = StartupProfiler()
+    profiler.add_component("repository", lambda: threads.append(threading.current_thread()))
+    profiler.add_component("agent", failing_agent, required=False)
+    assert not profiler.ready
+
+    reports = _warm_up(profiler)
+
+    assert profiler.ready
+    agent = reports[0]["components"]["agent"]
+    assert (agent["status"], agent["required"], agent["error"]) == ("failed", False, "API 키 없음")
+    # 동기 loader는 이벤트 루프가 아닌 스레드에서 실행
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_required_component_failure_keeps_service_unready():
+    async def failing_repository():
+        raise OSError("db down")
+
+    profiler = StartupProfiler()
+    profiler.add_component("repository", failing_repository)
+    _warm_up(profiler)
+    assert not profiler.ready
+    assert profiler.report()["components"]["repository"]["status"] == "failed"
+
+
+def test_ready_endpoint_returns_503_until_warm_up_finishes(main_module, monkeypatch):
+    release = threading.Event()
+    profiler = StartupProfiler()
+    profiler.add_component("repository", release.wait)
+    monkeypatch.setattr(main_module, "startup_profiler", profiler)
+    client = TestClient(main_module.app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    # 프로세스 상태만 보는 /health는 준비 중에도 200
+    assert client.get("/health").status_code == 200
+
+    release.set()
+    _warm_up(profiler)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["components"]["repository"]["status"] == "ready"
@@ -0,0 +1,110 @@
+import asyncio
+import math
+import random
+
+import recommendation
+from recommendation import RecommendationEngine
+from trending import INTERACTION_WEIGHTS, TrendingLeaderboard, base_popularity
+
+HALF_LIFE = 3600.0
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _products(n, seed=1):
+    rng = random.Random(seed)
+    return [
+        {"id": f"p{i}", "category": rng.choice("abc"), "rating": round(rng.uniform(0, 5), 1), "price": rng.randint(0, 100000)}
+        for i in range(n)
+    ]
+
+
+def _exact_scores(products, events, now):
+    decay_rate = math.log(2) / HALF_LIFE
+    scores = {p["id"]: base_popularity(p) for p in products}
+    for product_id, interaction_type, timestamp in events:
+        scores[product_id] += INTERACTION_WEIGHTS[interaction_type] * math.exp(-decay_rate * (now - timestamp))
+    return scores
+
+
+def test_top_matches_exact_scores_over_time():
+    rng = random.Random(7)
+    clock = FakeClock()
+    products = _products(500)
+    category_of = {p["id"]: p["category"] for p in products}
+    leaderboard = TrendingLeaderboard.build(products, half_life=HALF_LIFE, clock=clock)
+    events = []
+
+    # 반감기의 여러 배에 걸쳐 이벤트를 넣으면서 매번 전체 점수를 다시 계산한 결과와 비교
+    for step in range(3000):
+        clock.now += rng.uniform(0, 30)
+        product_id = f"p{rng.randrange(500)}"
+        interaction_type = rng.choice(list(INTERACTION_WEIGHTS))
+        assert leaderboard.record_interaction(product_id, interaction_type)
+        events.append((product_id, interaction_type, clock.now))
+
+        if step % 300 == 0:
+            exact = _exact_scores(products, events, clock.now)
+            for category in (None, "a"):
+                ids = [pid for pid in exact if category is None or category_of[pid] == category]
+                expected = sorted((round(exact[pid], 6) for pid in ids), reverse=True)[:10]
+                got = leaderboard.top(10, category)
+                assert [round(exact[p["id"]], 6) for p in got] == expected
+                assert [p["popularity_score"] for p in got] == [round(exact[p["id"]], 2) for p in got]
+
+
+def test_build_matches_incremental_adds():
+    products = _products(200)
+    clock = FakeClock()
+    built = TrendingLeaderboard.build(products, half_life=HALF_LIFE, clock=clock)
+    incremental = TrendingLeaderboard(half_life=HALF_LIFE, clock=clock)
+    for product in products:
+        incremental.add_product(product)
+
+    assert [p["id"] for p in built.top(20)] == [p["id"] for p in incremental.top(20)]
+    assert [p["id"] for p in built.top(5, "b")] == [p["id"] for p in incremental.top(5, "b")]
+
+
+def test_unknown_product_or_type_is_ignored():
+    leaderboard = TrendingLeaderboard.build(_products(3), half_life=HALF_LIFE, clock=FakeClock())
+    assert not leaderboard.record_interaction("missing", "view")
+    assert not leaderboard.record_interaction("p0", "share")
+    assert leaderboard.top(5, "missing") == []
+
+
+class FakeRepository:
+    def __init__(self, products, interactions):
+        self.products = products
+        self.interactions = interactions
+
+    async def get_products(self, category=None, max_price=None):
+        return self.products
+
+    async def get_interactions(self, since=None):
+        return self.interactions
+
+
+def test_engine_replays_interactions_recorded_before_build(monkeypatch):
+    products = [
+        {"id": "p1", "category": "food", "rating": 4.0, "price": 0},
+        {"id": "p2", "category": "food", "rating": 4.0, "price": 0},
+    ]
+    stored = {"user_id": "u1", "product_id": "p1", "interaction_type": "purchase", "created_at": "2026-10-18T00:00:00+00:00"}
+    # 저장소에 이미 기록된 이벤트가 다른 시간대 표기로 다시 들어와도 한 번만 반영
+    duplicate = {**stored, "created_at": "2026-10-18T09:00:00+09:00"}
+    pending = {"user_id": "u2", "product_id": "p2", "interaction_type": "purchase", "created_at": "2026-10-18T00:00:01+00:00"}
+    monkeypatch.setattr(recommendation, "get_repository", lambda: FakeRepository(products, [stored]))
+
+    engine = RecommendationEngine(seed=0)
+    engine.record_interactions([duplicate, pending])
+    asyncio.run(engine.warm_up())
+
+    scores = {p["id"]: p["popularity_score"] for p in engine._trending.top(2)}
+    assert scores["p1"] == scores["p2"]
+    assert scores["p1"] > 80
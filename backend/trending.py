@@ -0,0 +1,228 @@
+"""
+인기 상품 리더보드
+상품 등록과 상호작용(조회/좋아요/구매) 이벤트마다 점수를 증분 갱신하고,
+전체 및 카테고리별 정렬 목록을 유지하여 상위 k개를 정렬 목록 앞부분만 읽어 조회
+"""
+
+import bisect
+import heapq
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 상호작용 유형별 가중치 (user_interactions.interaction_type)
+INTERACTION_WEIGHTS = {
+    "view": 1.0,
+    "like": 3.0,
+    "purchase": 10.0,
+}
+
+# 기준 시각 이후 지수가 이 값을 넘으면 상호작용 점수를 다시 정규화 (부동소수점 오버플로 방지)
+_MAX_EXPONENT = 50.0
+
+
+def base_popularity(product: Dict) -> float:
+    """상품 자체의 인기도 (평점 * 가중치 - 가격 페널티)"""
+    return (product.get('rating') or 0) * 20 - (product.get('price') or 0) / 10000
+
+
+class _RankedList:
+    """(-점수, 상품 ID) 오름차순 정렬 목록"""
+
+    def __init__(self):
+        self.keys: List[Tuple[float, str]] = []
+
+    def insert(self, score: float, product_id: str):
+        bisect.insort(self.keys, (-score, product_id))
+
+    def remove(self, score: float, product_id: str):
+        pos = bisect.bisect_left(self.keys, (-score, product_id))
+        if pos < len(self.keys) and self.keys[pos][1] == product_id:
+            del self.keys[pos]
+
+    def extend(self, entries: Iterable[Tuple[float, str]]):
+        """여러 항목을 뒤에 붙인 뒤 한 번만 정렬 (대량 추가용)"""
+        self.keys.extend((-score, product_id) for score, product_id in entries)
+        self.keys.sort()
+
+    def scale(self, factor: float):
+        """모든 점수에 같은 양수를 곱함 (순서가 바뀌지 않으므로 다시 정렬하지 않음)"""
+        self.keys = [(neg_score * factor, product_id) for neg_score, product_id in self.keys]
+
+    def score_at(self, rank: int) -> Optional[float]:
+        return -self.keys[rank][0] if rank < len(self.keys) else None
+
+    def id_at(self, rank: int) -> Optional[str]:
+        return self.keys[rank][1] if rank < len(self.keys) else None
+
+
+class _Board:
+    """전체 또는 카테고리 하나의 기본 인기도 순 목록과 상호작용 점수 순 목록"""
+
+    def __init__(self):
+        self.base = _RankedList()
+        self.interactions = _RankedList()
+
+
+class TrendingLeaderboard:
+    """
+    시간 감쇠 인기도 리더보드
+    점수 = 기본 인기도(감쇠하지 않음) + 시간 감쇠된 상호작용 점수.
+    상호작용 기여도는 forward decay(exp(λ(t - 기준 시각)))로 저장하여 모든 상호작용 점수가 같은 비율로 감쇠하므로
+    상호작용 점수 순 목록은 시간이 지나도 순서가 바뀌지 않고, 이벤트가 들어온 상품만 다시 정렬하면 됨.
+    기본 인기도 순 목록과 상호작용 점수 순 목록을 따로 유지하고, 조회 시 두 목록을 함께 앞에서부터 읽어
+    (threshold algorithm) 현재 시각 점수 기준 정확한 상위 k개를 구함
+    """
+
+    def __init__(self, half_life: float = 86400.0, clock: Callable[[], float] = time.time):
+        self.decay_rate = math.log(2) / half_life
+        self._clock = clock
+        self._landmark = clock()
+        self._products: Dict[str, Dict] = {}
+        self._base: Dict[str, float] = {}
+        # 상품별 상호작용 점수 (기준 시각 단위, 상호작용이 없는 상품은 없음)
+        self._interactions: Dict[str, float] = {}
+        self._overall = _Board()
+        self._by_category: Dict[str, _Board] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    @classmethod
+    def build(
+        cls,
+        products: Iterable[Dict],
+        half_life: float = 86400.0,
+        clock: Callable[[], float] = time.time
+    ) -> "TrendingLeaderboard":
+        """전체 상품으로 리더보드 구축 (목록마다 한 번만 정렬)"""
+        leaderboard = cls(half_life=half_life, clock=clock)
+        leaderboard.add_products(products)
+        return leaderboard
+
+    def _boards_for(self, product_id: str) -> List[_Board]:
+        return [self._overall, self._category_board(self._products[product_id].get('category'))]
+
+    def _category_board(self, category: str) -> _Board:
+        board = self._by_category.get(category)
+        if board is None:
+            board = self._by_category[category] = _Board()
+        return board
+
+    def _forward_weight(self, timestamp: float) -> float:
+        exponent = self.decay_rate * (timestamp - self._landmark)
+        if exponent > _MAX_EXPONENT:
+            self._renormalize(timestamp)
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def _renormalize(self, timestamp: float):
+        """기준 시각을 옮기고 상호작용 점수를 같은 비율로 줄임"""
+        factor = math.exp(-self.decay_rate * (timestamp - self._landmark))
+        self._landmark = timestamp
+        self._interactions = {product_id: score * factor for product_id, score in self._interactions.items()}
+        for board in [self._overall, *self._by_category.values()]:
+            board.interactions.scale(factor)
+
+    def add_products(self, products: Iterable[Dict]):
+        """
+        여러 상품 등록 (이미 있는 상품은 내용만 교체)
+        새 상품은 목록마다 한꺼번에 붙인 뒤 한 번만 정렬
+        """
+        with self._lock:
+            added: List[Tuple[float, str]] = []
+            added_by_category: Dict[str, List[Tuple[float, str]]] = {}
+            for product in products:
+                product_id = product.get('id')
+                if product_id is None:
+                    continue
+                is_new = product_id not in self._products
+                self._products[product_id] = product
+                if not is_new:
+                    continue
+                entry = (base_popularity(product), product_id)
+                self._base[product_id] = entry[0]
+                added.append(entry)
+                added_by_category.setdefault(product.get('category'), []).append(entry)
+
+            ranked = [(self._overall, added)]
+            ranked.extend((self._category_board(category), entries) for category, entries in added_by_category.items())
+            for board, entries in ranked:
+                if not entries:
+                    continue
+                if len(entries) == 1:
+                    board.base.insert(*entries[0])
+                else:
+                    board.base.extend(entries)
+
+    def add_product(self, product: Dict):
+        """상품 등록 (기본 인기도는 등록 시각과 무관한 상수 항으로 반영)"""
+        self.add_products([product])
+
+    def record_interaction(self, product_id: str, interaction_type: str, timestamp: Optional[float] = None) -> bool:
+        """상호작용 이벤트 반영 (알 수 없는 상품/유형이면 False)"""
+        weight = INTERACTION_WEIGHTS.get(interaction_type)
+        if weight is None:
+            return False
+
+        with self._lock:
+            if product_id not in self._products:
+                return False
+            delta = weight * self._forward_weight(self._clock() if timestamp is None else timestamp)
+            old_score = self._interactions.get(product_id)
+            new_score = self._interactions[product_id] = (old_score or 0.0) + delta
+            for board in self._boards_for(product_id):
+                if old_score is not None:
+                    board.interactions.remove(old_score, product_id)
+                board.interactions.insert(new_score, product_id)
+        return True
+
+    def _top_ids(self, board: _Board, limit: int, decay: float) -> List[Tuple[float, str]]:
+        """
+        현재 점수 상위 limit개 (threshold algorithm)
+        두 목록을 같은 깊이까지 읽으며 본 상품의 정확한 점수를 계산하고,
+        아직 보지 않은 상품이 가질 수 있는 최대 점수(두 목록의 현재 깊이 점수 합)보다
+        limit번째 점수가 크거나 같으면 중단
+        """
+        scored: Dict[str, float] = {}
+        best: List[float] = []
+        depth = 0
+        while depth < len(board.base.keys):
+            for product_id in (board.base.id_at(depth), board.interactions.id_at(depth)):
+                if product_id is None or product_id in scored:
+                    continue
+                score = self._base[product_id] + self._interactions.get(product_id, 0.0) * decay
+                scored[product_id] = score
+                if len(best) < limit:
+                    heapq.heappush(best, score)
+                elif score > best[0]:
+                    heapq.heapreplace(best, score)
+
+            # 상호작용 점수는 0 이상이므로 상호작용 목록을 다 읽었으면 남은 상품의 상한은 0
+            threshold = board.base.score_at(depth) + (board.interactions.score_at(depth) or 0.0) * decay
+            if len(best) == limit and best[0] >= threshold:
+                break
+            depth += 1
+
+        return heapq.nsmallest(limit, ((-score, product_id) for product_id, score in scored.items()))
+
+    def top(self, limit: int = 5, category: Optional[str] = None) -> List[Dict]:
+        """
+        현재 시각 기준 인기 상품 상위 limit개
+        공유 상품 dict는 수정하지 않고 popularity_score를 붙인 복사본을 반환
+        """
+        if limit <= 0:
+            return []
+        with self._lock:
+            board = self._overall if category is None else self._by_category.get(category)
+            if board is None:
+                return []
+            now = self._clock()
+            self._forward_weight(now)
+            decay = math.exp(-self.decay_rate * (now - self._landmark))
+            return [
+                {**self._products[product_id], 'popularity_score': round(-neg_score, 2)}
+                for neg_score, product_id in self._top_ids(board, limit, decay)
+            ]